@@ -0,0 +1,131 @@
+"""End-to-end crawl benchmark against the local govinfo stand-in (tests/fake_govinfo.py).
+
+Every scenario crawls the same synthetic collection into a fresh sqlite database through APIClient
+and DB_Handler, and reports wall time, packages per second and the requests the server answered.
+Run from the repository root:
+
+    python -m benchmarks.crawl_benchmark --packages 500 --latency 0.05 --workers 1 4 8
+"""
+import os
+import json
+import time
+import logging
+import argparse
+import tempfile
+from typing import Callable, Dict, Iterator, Tuple
+import requests
+import sqlalchemy
+from hearings_lib.api_client import APIClient
+from hearings_lib.crawler import Crawler
+from hearings_lib.db_handler import DB_Handler
+from hearings_lib.db_models import Base
+from hearings_lib.rate_limiter import RateLimiter
+from hearings_lib.response_cache import ResponseCache
+from tests.fake_govinfo import FakeGovinfoServer
+
+API_KEY = 'benchmark'
+CONGRESS = 114
+
+
+def run_scenario(
+    name: str,
+    server: FakeGovinfoServer,
+    crawl: Callable[[APIClient, DB_Handler], None],
+    **client_options
+) -> Dict:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = sqlalchemy.create_engine(f'sqlite:///{os.path.join(directory, "benchmark.db")}', future=True)
+        Base.metadata.create_all(engine)
+        handler = DB_Handler(engine)
+        server.reset()
+        with requests.Session() as s, APIClient(
+            API_KEY,
+            s,
+            base_url=server.url,
+            # the stand-in has no quota, so the limiter should never be what is measured
+            rate_limiter=RateLimiter(limit=10 ** 9),
+            **client_options
+        ) as client:
+            started = time.perf_counter()
+            crawl(client, handler)
+            elapsed = time.perf_counter() - started
+        engine.dispose()
+
+    summaries = client.metrics.snapshot()['endpoints'].get('packages/summary', {})
+    latency_count = summaries.get('requests', 0)
+    return {
+        'scenario': name,
+        'seconds': round(elapsed, 3),
+        'packages_per_second': round(server.package_count / elapsed, 1),
+        'requests': sum(server.requests.values()),
+        'errors': sum(v for k, v in server.requests.items() if k[1] >= 500),
+        'rate_limited': sum(v for k, v in server.requests.items() if k[1] == 429),
+        'mean_summary_latency': round(summaries.get('latency_sum', 0) / latency_count, 4) if latency_count else None
+    }
+
+
+def scenarios(args: argparse.Namespace, cache_directory: str) -> Iterator[Tuple[str, Callable, Dict]]:
+    def crawl(client, handler):
+        Crawler(client, handler).crawl_congresses([CONGRESS])
+
+    def crawl_pipelined(client, handler):
+        Crawler(client, handler).crawl_pipelined([CONGRESS])
+
+    def crawl_transcripts(client, handler):
+        handler.sync_transcripts(dict(client.iter_transcripts(server_package_ids)))
+
+    server_package_ids = [f'CHRG-{CONGRESS}hhrg{i:05d}' for i in range(args.packages)]
+    for i in args.workers:
+        yield f'crawl, {i} workers', crawl, {'max_workers': i}
+    for i in args.workers:
+        yield f'pipelined crawl, {i} workers', crawl_pipelined, {'max_workers': i}
+    for i in args.workers:
+        yield f'hedged crawl, {i} workers', crawl, {'max_workers': i, 'hedge': True}
+    # the first cached crawl fills the cache, the second is served from it
+    cache = ResponseCache(cache_directory)
+    yield f'crawl, cold cache, {args.workers[-1]} workers', crawl, {'max_workers': args.workers[-1], 'cache': cache}
+    yield f'crawl, warm cache, {args.workers[-1]} workers', crawl, {'max_workers': args.workers[-1], 'cache': cache}
+    for i in args.workers:
+        yield f'transcripts, {i} workers', crawl_transcripts, {'max_workers': i}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--packages', type=int, default=300, help='packages in the synthetic congress')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8], help='max_workers values to compare')
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.01, help='up to this many more seconds per response')
+    parser.add_argument('--slow-rate', type=float, default=0.02, help='fraction of responses that are slow')
+    parser.add_argument('--slow-latency', type=float, default=1.0, help='seconds added to slow responses')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of responses that are 503s')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='fraction of responses that are 429s')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    results = []
+    with FakeGovinfoServer(
+        package_count=args.packages,
+        congresses=(CONGRESS,),
+        latency=args.latency,
+        jitter=args.jitter,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate
+    ) as server, tempfile.TemporaryDirectory() as cache_directory:
+        for name, crawl, options in scenarios(args, cache_directory):
+            results.append(run_scenario(name, server, crawl, **options))
+
+    columns = list(results[0])
+    widths = [max(len(str(i)), *(len(str(j[i])) for j in results)) for i in columns]
+    print('  '.join(i.ljust(w) for i, w in zip(columns, widths)))
+    for result in results:
+        print('  '.join(str(result[i]).ljust(w) for i, w in zip(columns, widths)))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
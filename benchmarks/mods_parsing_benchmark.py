@@ -0,0 +1,87 @@
+"""Micro-benchmark of MODS parsing: ModsPageParser (a tree plus one XPath scan per field) against
+IterparseModsParser (one streaming pass), over the sample documents in tests/sample_mods.
+--scale repeats the congMember elements of each document to stand in for hearings with hundreds of members.
+--processes also measures the throughput of parse_mods_batch with pools of that many processes.
+Run from the repository root:
+
+    python -m benchmarks.mods_parsing_benchmark --iterations 500 --scale 1 10 --processes 1 2 4
+"""
+import os
+import glob
+import json
+import time
+import timeit
+import logging
+import argparse
+from typing import List, Type
+from lxml import etree
+from hearings_lib.mods_page_parser import IterparseModsParser, ModsPageParser, mods_parsing_pool, parse_mods_batch
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_DIRECTORY = os.path.join(REPOSITORY_DIRECTORY, 'tests', 'sample_mods')
+LOGGER = logging.getLogger(__name__)
+
+
+def load_documents(scale: int) -> List[bytes]:
+    documents = []
+    for i in sorted(glob.glob(os.path.join(SAMPLE_DIRECTORY, '*.xml'))):
+        with open(i, 'rb') as f:
+            content = f.read()
+        if scale > 1:
+            root = etree.XML(content)
+            namespace = {'ns': root.nsmap[None]}
+            for extension in root.xpath('//ns:extension[ns:congMember]', namespaces=namespace):
+                members = extension.xpath('./ns:congMember', namespaces=namespace)
+                for _ in range(scale - 1):
+                    extension.extend(etree.fromstring(etree.tostring(j)) for j in members)
+            content = etree.tostring(root)
+        documents.append(content)
+    return documents
+
+
+def measure(parser: Type, documents: List[bytes], iterations: int) -> float:
+    """Microseconds per document, the best of five runs."""
+    seconds = min(timeit.repeat(
+        lambda: [parser(i, LOGGER).create_parsed_mods_page() for i in documents],
+        number=iterations,
+        repeat=5
+    ))
+    return seconds / (iterations * len(documents)) * 1e6
+
+
+def measure_batch(documents: List[bytes], processes: int, batch_size: int) -> float:
+    """Documents per second parsed by parse_mods_batch, not counting the pool's start up."""
+    batch = (documents * (batch_size // len(documents) + 1))[:batch_size]
+    with mods_parsing_pool(processes) as pool:
+        parse_mods_batch(batch[:processes * 4], executor=pool, chunk_size=1)
+        started = time.perf_counter()
+        parse_mods_batch(batch, executor=pool)
+        return batch_size / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--processes', type=int, nargs='*', default=[], help='pool sizes for parse_mods_batch')
+    parser.add_argument('--batch-size', type=int, default=2000, help='documents per parse_mods_batch call')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    for scale in args.scale:
+        documents = load_documents(scale)
+        assert [ModsPageParser(i, LOGGER).create_parsed_mods_page() for i in documents] == \
+            [IterparseModsParser(i, LOGGER).create_parsed_mods_page() for i in documents]
+        iterations = max(1, args.iterations // scale)
+        baseline = measure(ModsPageParser, documents, iterations)
+        streaming = measure(IterparseModsParser, documents, iterations)
+        print(json.dumps({'documents': len(documents), 'scale': scale, 'iterations': iterations}))
+        for name, microseconds in [('ModsPageParser', baseline), ('IterparseModsParser', streaming)]:
+            print(f'{name:<30} {microseconds:10.1f} us/document  {baseline / microseconds:5.2f}x')
+        for processes in args.processes:
+            throughput = measure_batch(documents, processes, max(1, args.batch_size // scale))
+            print(f'{f"parse_mods_batch, {processes} processes":<30} {throughput:10.1f} documents/s')
+
+
+if __name__ == '__main__':
+    main()
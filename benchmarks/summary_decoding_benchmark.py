@@ -0,0 +1,87 @@
+"""Micro-benchmark of summary decoding: JSON decoding plus the date handling of _parse_summary_attributes,
+with the standard library and dateutil against the fast path in hearings_lib.fast_decoding.
+Runs over the sample summary responses in tests/sample_api_responses. Run from the repository root:
+
+    python -m benchmarks.summary_decoding_benchmark --iterations 20000
+"""
+import os
+import glob
+import json
+import timeit
+import argparse
+from typing import Callable, Dict, List
+import requests
+import dateutil.tz
+from dateutil.parser import parse as date_parse
+from hearings_lib import fast_decoding
+from hearings_lib.fast_decoding import decode_json, parse_datetime
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_DIRECTORY = os.path.join(REPOSITORY_DIRECTORY, 'tests', 'sample_api_responses')
+
+
+def load_responses() -> List[requests.Response]:
+    responses = []
+    for i in sorted(glob.glob(os.path.join(SAMPLE_DIRECTORY, '*.json'))):
+        response = requests.Response()
+        response.status_code = 200
+        with open(i, 'rb') as f:
+            response._content = f.read()
+        responses.append(response)
+    return responses
+
+
+def decode_baseline(response: requests.Response) -> Dict:
+    """The decoding _parse_summary_attributes did before the fast path."""
+    summary = response.json()
+    return {
+        'lastModified': date_parse(summary['lastModified']).replace(tzinfo=dateutil.tz.gettz(name='EST')),
+        'dateIssued': date_parse(summary['dateIssued']).replace(tzinfo=dateutil.tz.gettz(name='EST')),
+        'heldDates': [
+            date_parse(j).replace(tzinfo=dateutil.tz.gettz(name='EST')).date()
+            for j in summary.get('heldDates', [])
+        ]
+    }
+
+
+def decode_fast(response: requests.Response) -> Dict:
+    summary = decode_json(response)
+    return {
+        'lastModified': parse_datetime(summary['lastModified']),
+        'dateIssued': parse_datetime(summary['dateIssued']),
+        'heldDates': [parse_datetime(j).date() for j in summary.get('heldDates', [])]
+    }
+
+
+def measure(decode: Callable[[requests.Response], Dict], responses: List[requests.Response], iterations: int) -> float:
+    """Microseconds per summary."""
+    seconds = timeit.timeit(lambda: [decode(i) for i in responses], number=iterations)
+    return seconds / (iterations * len(responses)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    responses = load_responses()
+    assert [decode_baseline(i) for i in responses] == [decode_fast(i) for i in responses]
+
+    baseline = measure(decode_baseline, responses, args.iterations)
+    results = {'stdlib json + dateutil': baseline}
+    orjson = fast_decoding.orjson
+    if orjson is not None:
+        results['orjson + ISO fast path'] = measure(decode_fast, responses, args.iterations)
+    fast_decoding.orjson = None
+    try:
+        results['stdlib json + ISO fast path'] = measure(decode_fast, responses, args.iterations)
+    finally:
+        fast_decoding.orjson = orjson
+
+    print(json.dumps({'summaries': len(responses), 'iterations': args.iterations}))
+    for name, microseconds in results.items():
+        print(f'{name:<30} {microseconds:8.2f} us/summary  {baseline / microseconds:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
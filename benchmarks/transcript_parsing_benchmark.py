@@ -0,0 +1,49 @@
+"""Micro-benchmark of transcript_parser: Parser (three searches per line) against ScanningParser
+(a substring check, a first character check and at most one combined match per line),
+and ScanningParser giving entries as offsets into the transcript body instead of joined text.
+The corpus is the transcript excerpt in tests/test_standard_speaker_pattern.py, repeated --repeat times.
+Run from the repository root:
+
+    python -m benchmarks.transcript_parsing_benchmark --repeat 200 --iterations 20
+"""
+import json
+import timeit
+import argparse
+from typing import Callable, List
+from hearings_lib.transcript_parser import Parser, ScanningParser
+from tests.test_standard_speaker_pattern import TestStandardSpeakerPattern
+
+
+def load_corpus(repeat: int) -> List[str]:
+    lines = TestStandardSpeakerPattern.LINES.split('\n')
+    end = [i for i in lines if Parser.TRANSCRIPT_END_PATTERN.search(i)]
+    body = [i for i in lines if not Parser.TRANSCRIPT_END_PATTERN.search(i)]
+    return body * repeat + end
+
+
+def measure(parse: Callable[[], object], lines: int, iterations: int) -> float:
+    """Lines per second, the best of five runs."""
+    seconds = min(timeit.repeat(parse, number=iterations, repeat=5))
+    return lines * iterations / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.repeat)
+    body = '\n'.join(corpus)
+    assert Parser().parse(corpus) == ScanningParser().parse(corpus)
+
+    baseline = measure(lambda: Parser().parse(corpus), len(corpus), args.iterations)
+    scanning = measure(lambda: ScanningParser().parse(corpus), len(corpus), args.iterations)
+    offsets = measure(lambda: list(ScanningParser().iter_entry_offsets(body)), len(corpus), args.iterations)
+    print(json.dumps({'lines': len(corpus), 'iterations': args.iterations}))
+    for name, lines_per_second in [('Parser', baseline), ('ScanningParser', scanning), ('offsets', offsets)]:
+        print(f'{name:<16} {lines_per_second:12,.0f} lines/s  {lines_per_second / baseline:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,32 @@
 import os
+import sys
+import datetime
+import contextlib
+from typing import List
 import sqlalchemy
 import requests
-from dateutil.parser import parse as date_parse
-import dateutil.tz
 from sqlalchemy_utils import database_exists, create_database
-from sqlalchemy import select
-from sqlalchemy.orm import Session
 from hearings_lib.hearings.load_project_env import load_project_env
-from hearings_lib.db_models import (
-    Base,
-    Hearing
-)
+from hearings_lib.db_models import Base
 from hearings_lib.db_handler import DB_Handler
-from hearings_lib.api_client import APIClient
+from hearings_lib.api_client import APIClient, ListingUnavailableException
+from hearings_lib.bulk_ingest import BulkIngester
+from hearings_lib.response_cache import ResponseCache
+from hearings_lib.retry_queue import RetryQueue
+from hearings_lib.crawler import Crawler
+from hearings_lib.mods_page_parser import mods_parsing_pool
+from hearings_lib.sharded_crawler import ShardedCrawler
+from hearings_lib.transcript_parse_job import TranscriptParseJob
 
 
-def get_package_summaries_by_congress(congress: int, config_directory: str = ''):
+def get_package_summaries_by_congress(
+    congress: int,
+    config_directory: str = '',
+    incremental: bool = False,
+    pipelined: bool = False,
+    processes: int = 1,
+    mods_processes: int = 1
+):
     config = load_project_env(config_directory)
     db_config = config['govinfo_db']
     # Python automatically concatenates strings within brackets that aren't comma-separated.
@@ -34,21 +45,115 @@ def get_package_summaries_by_congress(congress: int, config_directory: str = '')
 
     handler = DB_Handler(engine)
 
-    with Session(handler.engine) as db:
-        existing_packages = {i[0]: i[1] for i in db.execute(select(Hearing.package_id, Hearing.last_modified))}
+    cache = ResponseCache.from_config(config)
+    # Incremental crawls only list packages modified since the last completed crawl started
+    watermark = handler.get_crawl_watermark() if incremental else None
+
+    if processes > 1 and not watermark:
+        # Full backfills can be split across processes, each crawling a shard of the congresses
+        crawl_start = datetime.datetime.utcnow()
+        ShardedCrawler(os.getenv('GPO_API_KEY'), handler, processes, config).crawl_congresses(Crawler.ALL_CONGRESSES)
+        handler.set_crawl_watermark(crawl_start)
+        return
+
+    # MODS documents are parsed on a process pool when mods_processes is above 1
+    mods_pool = mods_parsing_pool(mods_processes) if mods_processes > 1 else contextlib.nullcontext()
+    with requests.Session() as s, mods_pool as mods_executor:
+        client = APIClient(
+            api_key=os.getenv('GPO_API_KEY'),
+            session=s,
+            cache=cache,
+            retry_queue=RetryQueue(engine),
+            mods_executor=mods_executor
+        )
+        # Summaries are synced page by page, full crawls are checkpointed per congress and resume after a crash
+        crawler = Crawler(client, handler)
+        try:
+            if watermark:
+                crawl_start = datetime.datetime.utcnow()
+                crawler.crawl_modified_since(watermark)
+            elif pipelined:
+                crawl_start = datetime.datetime.utcnow()
+                crawler.crawl_pipelined(Crawler.ALL_CONGRESSES)
+            else:
+                crawl_start = crawler.crawl_congresses(Crawler.ALL_CONGRESSES)
+        except ListingUnavailableException as e:
+            # the watermark and the checkpoints are kept, so running the crawl again picks it back up
+            client.metrics.export(config)
+            sys.exit(f'Stopped crawling, the listing could not be read: {e}')
+        client.metrics.export(config)
+
+    # only reached once the listing has been read in full
+    handler.set_crawl_watermark(crawl_start)
+
+
+def drain_retry_queue(config_directory: str = ''):
+    """Re-attempts the summary, MODS, listing and transcript fetches that failed in earlier crawls."""
+    config = load_project_env(config_directory)
+    db_config = config['govinfo_db']
+    connection_uri = (
+        f'{db_config["db_type"]}'
+        f'+{db_config["db_driver"]}'
+        f'://{db_config["user"]}'
+        f':{os.getenv("DB_POSTGRES_PW")}@{db_config["host"]}/{db_config["name"]}'
+    )
+
+    engine = sqlalchemy.create_engine(connection_uri, future=True)
+    Base.metadata.create_all(engine)
+    handler = DB_Handler(engine)
 
     with requests.Session() as s:
-        client = APIClient(api_key=os.getenv('GPO_API_KEY'), session=s)
-        packages = []
-        for i in range(118):
-            new_or_modified_packages = [
-                i for i in client.get_package_ids_by_congress(i)
-                if i['packageId'] not in existing_packages
-                or date_parse(i['lastModified'])
-                > existing_packages[i['packageId']].replace(tzinfo=dateutil.tz.tzlocal())
-            ]
-
-            packages = packages + new_or_modified_packages
-        package_summaries = client.get_package_summaries(packages=packages)
-
-    handler.sync_hearing_records(package_summaries)
+        client = APIClient(
+            api_key=os.getenv('GPO_API_KEY'),
+            session=s,
+            cache=ResponseCache.from_config(config),
+            retry_queue=RetryQueue(engine)
+        )
+        package_summaries, transcripts = client.drain_retry_queue()
+        client.metrics.export(config)
+
+    handler.sync_hearing_records(package_summaries, force=True)
+    handler.sync_transcripts(transcripts)
+
+
+def ingest_bulk_data(paths: List[str], config_directory: str = '', processes: int = 1, parse_transcripts: bool = True):
+    """Builds the database from local copies of govinfo's CHRG package ZIP archives, without API requests."""
+    config = load_project_env(config_directory)
+    db_config = config['govinfo_db']
+    connection_uri = (
+        f'{db_config["db_type"]}'
+        f'+{db_config["db_driver"]}'
+        f'://{db_config["user"]}'
+        f':{os.getenv("DB_POSTGRES_PW")}@{db_config["host"]}/{db_config["name"]}'
+    )
+
+    engine = sqlalchemy.create_engine(connection_uri, future=True)
+    if not database_exists(connection_uri):
+        create_database(connection_uri)
+    Base.metadata.create_all(engine)
+
+    BulkIngester(DB_Handler(engine), processes=processes).ingest(paths, parse_transcripts=parse_transcripts)
+
+
+def parse_stored_transcripts(
+    config_directory: str = '',
+    processes: int = 1,
+    force: bool = False,
+    offsets: bool = False
+):
+    """Re-parses the stored transcripts whose body or Parser.VERSION changed, or every one when forced.
+    With offsets set, entries are stored as offsets into the transcript body instead of copies of its text.
+    """
+    config = load_project_env(config_directory)
+    db_config = config['govinfo_db']
+    connection_uri = (
+        f'{db_config["db_type"]}'
+        f'+{db_config["db_driver"]}'
+        f'://{db_config["user"]}'
+        f':{os.getenv("DB_POSTGRES_PW")}@{db_config["host"]}/{db_config["name"]}'
+    )
+
+    engine = sqlalchemy.create_engine(connection_uri, future=True)
+    Base.metadata.create_all(engine)
+
+    TranscriptParseJob(DB_Handler(engine), processes=processes, offsets=offsets).run(force=force)
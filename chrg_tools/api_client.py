@@ -1,31 +1,112 @@
 import requests
-from requests.adapters import HTTPAdapter
+from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE
+from requests.packages.urllib3.exceptions import MaxRetryError
 from requests.packages.urllib3.util.retry import Retry
 import datetime
-from dateutil.parser import parse as date_parse
+import threading
+import time
+from contextlib import contextmanager
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
 import dateutil.tz
-import logging
-from typing import Optional, Dict, List
+import itertools
+from typing import Optional, Dict, List, Iterable, Iterator, Callable, NamedTuple, Sized, Tuple, TypeVar
 from tqdm.auto import tqdm
-from hearings_lib.mods_page_parser import ModsPageParser
-from hearings_lib.summary_parsing_types import ParsedSummary
+from hearings_lib.fast_decoding import decode_json, parse_datetime
+from hearings_lib.metrics import RequestMetrics
+from hearings_lib.queued_logging import get_queued_logger
+from hearings_lib.mods_page_parser import ModsPageParser, mods_content_hash, parse_mods_batch, parse_mods_document
+from hearings_lib.rate_limiter import RateLimiter
+from hearings_lib.response_cache import ResponseCache
+from hearings_lib.retry_queue import RetryQueue, RetryItem
+from hearings_lib.summary_parsing_types import ParsedModsData, ParsedSummary
 
 DEFAULT_TIMEOUT = 3.1  # seconds
 
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class RateLimitExceededException(Exception):
+    def __init__(self, response: requests.Response):
+        super().__init__(f'Rate limit exceeded for {response.url}')
+        self.response = response
+
+
+class ListingUnavailableException(Exception):
+    """The first page of a listing could not be fetched, so none of the listing is known."""
+    pass
+
+
+class FetchedPackage(NamedTuple):
+    """A package's raw summary and MODS document, as fetched and before parsing."""
+    package: Dict
+    summary: Optional[Dict] = None
+    mods: Optional[bytes] = None
+
+
+class Deadline:
+    """Time budget shared by the requests made for one package. Time spent waiting for the rate limiter
+    is not charged to it, since that says nothing about the package.
+    """
+
+    def __init__(self, seconds: float):
+        self.expires = time.monotonic() + seconds
+
+    def extend(self, seconds: float) -> None:
+        self.expires += seconds
+
+    def remaining(self) -> float:
+        return self.expires - time.monotonic()
+
 
 class APIHTTPAdapter(HTTPAdapter):
     TIMEOUT_KEY = 'timeout'
+    METRICS_KEY = 'metrics'
+    NO_RETRIES = Retry(0, read=False)
 
     def __init__(self, *args, **kwargs):
         self.timeout = kwargs.get(self.TIMEOUT_KEY, DEFAULT_TIMEOUT)
         kwargs.pop(self.TIMEOUT_KEY, None)
+        self.metrics: Optional[RequestMetrics] = kwargs.pop(self.METRICS_KEY, None)
+        self._local = threading.local()
         super().__init__(*args, **kwargs)
 
+    @property
+    def max_retries(self) -> Retry:
+        """The configured retry strategy, or none for requests sent inside without_retries."""
+        if getattr(self._local, 'no_retries', False):
+            return self.NO_RETRIES
+        return self._max_retries
+
+    @max_retries.setter
+    def max_retries(self, value: Retry) -> None:
+        self._max_retries = value
+
+    @contextmanager
+    def without_retries(self) -> Iterator[None]:
+        """Requests this thread sends inside the block are tried once, for callers that retry on their own."""
+        self._local.no_retries = True
+        try:
+            yield
+        finally:
+            self._local.no_retries = False
+
     def send(self, request, **kwargs):
-        if self.TIMEOUT_KEY not in kwargs:
+        # Session.request always passes a timeout, None when the caller did not give one
+        if kwargs.get(self.TIMEOUT_KEY) is None:
             kwargs[self.TIMEOUT_KEY] = self.timeout
 
-        return super().send(request, **kwargs)
+        if self.metrics is None:
+            return super().send(request, **kwargs)
+        started = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            self.metrics.observe(request.url, time.perf_counter() - started)
+            raise
+        self.metrics.observe(request.url, time.perf_counter() - started, response)
+        return response
 
 
 class APIClient:
@@ -35,150 +116,348 @@ class APIClient:
     CHRG_ENDPOINT: str = f'{COLLECTION_LIST_ENDPOINT}/CHRG/{DEFAULT_LAST_MODIFIED_START_DATE}'
     PACKAGE_ENDPOINT: str = f'{BASE_URL}/packages'
     DEFAULT_PAGE_SIZE: int = 100
+    PAGE_RETRIES: int = 3
+    PAGE_RETRY_BACKOFF: float = 2.0  # seconds, doubled after every failed attempt
     RATE_LIMIT_STATUS_CODE = requests.codes.too_many_requests
+    # How many times a request waits out an exhausted quota before the rate limit error is raised
+    RATE_LIMIT_RETRIES = 3
+
+    TRANSCRIPT_CHUNK_SIZE: int = 64 * 1024  # bytes
+    # Read timeout allowance per page of the hearing, on top of DEFAULT_TIMEOUT
+    TRANSCRIPT_TIMEOUT_PER_PAGE: float = 0.05  # seconds
+    # Slowest transfer tolerated once a transcript starts arriving, sets the deadline for the whole body
+    TRANSCRIPT_MIN_TRANSFER_RATE: int = 50 * 1024  # bytes per second
+
+    # A hedged request is duplicated once it has taken longer than this percentile of the endpoint's recent latencies
+    HEDGE_PERCENTILE: float = 95
+    HEDGE_MIN_SAMPLES: int = 20  # requests are not hedged until the endpoint has this many latencies recorded
+    HEDGE_MIN_DELAY: float = 0.05  # seconds
+    # The slower request of a hedged pair keeps its thread until the server answers. Spare threads keep a
+    # few slow losers from queueing the next duplicate behind them; they are only started when needed.
+    HEDGE_SPARE_THREADS: int = 16
 
     SKELETON_ATTRIBUTES = ['title', 'packageId', 'packageLink', 'lastModified']
     SUM_RESULT_ATTRIBUTES = ['chamber', 'suDocClassNumber', 'dateIssued']
 
-    def __init__(self, api_key: str, session: requests.Session):
-        self.logger = logging.getLogger(__name__)
-        formatter = logging.Formatter(fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        fh = logging.FileHandler(f'{__name__}.log', 'w+')
-        fh.setLevel(logging.INFO)
-        fh.setFormatter(formatter)
-        self.logger.addHandler(fh)
-        self.logger.setLevel(logging.INFO)
+    def __init__(
+        self,
+        api_key: str,
+        session: requests.Session,
+        max_workers: int = 1,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        retry_queue: Optional[RetryQueue] = None,
+        metrics: Optional[RequestMetrics] = None,
+        base_url: Optional[str] = None,
+        hedge: bool = False,
+        package_deadline: Optional[float] = None,
+        package_log_sample_rate: float = 1.0,
+        mods_executor: Optional[Executor] = None,
+        mods_hashes: Optional[Dict[str, str]] = None
+    ):
+        # The log file is written by a listener thread set up once per process, so fetch threads never wait on it
+        self.logger = get_queued_logger(__name__)
+        # Fraction of the per-package messages logged, lower it so logging keeps up with large concurrent crawls
+        self._package_log_every = round(1 / package_log_sample_rate) if package_log_sample_rate > 0 else 0
+        self._package_log_counter = itertools.count()
 
         self.api_key = api_key
+        if base_url:
+            # points the client at another server, e.g. the local stand-in the benchmarks use
+            self.BASE_URL = base_url.rstrip('/')
+            self.COLLECTION_LIST_ENDPOINT = f'{self.BASE_URL}/collections'
+            self.CHRG_ENDPOINT = f'{self.COLLECTION_LIST_ENDPOINT}/CHRG/{self.DEFAULT_LAST_MODIFIED_START_DATE}'
+            self.PACKAGE_ENDPOINT = f'{self.BASE_URL}/packages'
+        # Number of requests kept in flight at once by the bulk fetch methods. 1 keeps fetching serial.
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # Summaries, MODS and transcripts are cached when a cache is given, collection listings never are
+        self.cache = cache
+        # Failed summary, MODS, transcript and listing page fetches are recorded here for drain_retry_queue
+        self.retry_queue = retry_queue
+        self.metrics = metrics or RequestMetrics()
+        # Hedged requests send a duplicate when the first is slower than HEDGE_PERCENTILE and keep the first answer
+        self.hedge = hedge
+        self._hedge_executor = (
+            ThreadPoolExecutor(2 * self.max_workers + self.HEDGE_SPARE_THREADS, 'hedge') if hedge else None
+        )
+        # Seconds a package's summary and MODS requests may take altogether, including retries and hedges.
+        # Packages that run out of time are recorded as failed fetches instead of stalling the crawl.
+        self.package_deadline = package_deadline
+        # MODS documents are parsed on this pool (see mods_parsing_pool) instead of the fetch threads when it is given
+        self.mods_executor = mods_executor
+        # package id -> mods_content_hash of the stored MODS document, unchanged documents are not parsed again
+        self.mods_hashes = mods_hashes if mods_hashes is not None else {}
         self.session = self._configure_session(session)
 
+    def __enter__(self) -> 'APIClient':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shuts down the threads that send hedged requests. The session is left open for its owner to close;
+        abandoned hedged requests still running finish on their own.
+        """
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+
     def _configure_session(self, session: requests.Session) -> requests.Session:
         retry_strategy = Retry(
             total=3,
-            status_forcelist=[429, 500, 502, 503, 504],
+            # 429s are left to the rate limiter, which waits for the quota window instead of backing off blindly
+            status_forcelist=[500, 502, 503, 504],
             method_whitelist=['GET'],
             backoff_factor=1
         )
 
-        adapter = APIHTTPAdapter(max_retries=retry_strategy)
+        adapter = APIHTTPAdapter(
+            max_retries=retry_strategy,
+            pool_maxsize=max(self.max_workers, DEFAULT_POOLSIZE),
+            metrics=self.metrics
+        )
         session.mount('https://', adapter)
         session.mount('http://', adapter)
+        # requests with a deadline skip the adapter's retries and are retried by _get_within_deadline
+        self._adapter = adapter
+        self._retry_strategy = retry_strategy
 
         def raise_for_status(response, *args, **kwargs):
             return response.raise_for_status()
-        session.hooks['response'] = [raise_for_status]
+        # the rate limiter has to see 429 responses before they are raised
+        session.hooks['response'] = [self.rate_limiter.update_from_response, raise_for_status]
 
         return session
 
     def get_transcripts_by_package_id(self, package_ids: List[str]) -> Dict[str, str]:
-        transcripts: Dict[str, str] = {}
-        for i in tqdm(package_ids, 'fetching transcripts'):
-            transcript_endpoint = f'{self.PACKAGE_ENDPOINT}/{i}/htm'
-            try:
-                r = self._get(transcript_endpoint)
-            except (
-                requests.ConnectionError,
-                requests.exceptions.ReadTimeout,
-                requests.exceptions.Timeout,
-                requests.exceptions.ConnectTimeout,
-                OSError
-            ) as e:
-                self.logger.info(f'{transcript_endpoint} returned error: {e}')
-                transcripts[i] = None
-                continue
-            transcripts[i] = r.content.decode('UTF-8')
-        return transcripts
+        return dict(self.iter_transcripts(package_ids))
 
-    def get_package_summaries(self, packages: List[Dict]) -> List[ParsedSummary]:
-        summaries = []
-        for i in tqdm(packages, "Building package summaries"):
-            stripped_skeleton = {j: i.get(j).strip() if i.get(j) else None for j in self.SKELETON_ATTRIBUTES}
-            title = stripped_skeleton['title']
-            package_id = stripped_skeleton['packageId']
-            last_modified = date_parse(stripped_skeleton['lastModified']).replace(tzinfo=dateutil.tz.gettz(name='EST'))
-            self.logger.info(f'Parsing package {package_id}, {title}')
-            congress = int(i.get('congress', 0))
-            summary_url = stripped_skeleton['packageLink']
-            if summary_url is None:
-                self.logger.info(f'Package {package_id} had no link to summary, adding skeleton entry to database')
-                summaries.append(
-                    ParsedSummary(
-                        title=title,
-                        package_id=package_id,
-                        congress=congress,
-                        url=summary_url,
-                    )
-                )
-                continue
+    def iter_transcripts(
+        self,
+        package_ids: Iterable[str],
+        pages: Optional[Dict[str, int]] = None
+    ) -> Iterator[Tuple[str, Optional[str]]]:
+        """Downloads transcripts with up to max_workers requests in flight, yielding (package_id, body)
+        as each download completes, so callers can write them out without holding every transcript.
+        The body is None when the download failed.
 
-            try:
-                r = self._get(summary_url)
-            except (
-                requests.ConnectionError,
-                requests.exceptions.ReadTimeout,
-                requests.exceptions.Timeout,
-                requests.exceptions.ConnectTimeout,
-                OSError
-            ) as e:
-                self.logger.info(f'{summary_url} returned error: {e}')
-                continue
-                # potentially add this url to a retry list.
-            except requests.exceptions.HTTPError as e:
-                self.logger.info(f'{summary_url} returned error: {e}')
-                if r.status_code == self.RATE_LIMIT_STATUS_CODE:
-                    rate_limit = r.headers['X-RateLimit-Limit']
-                    self.logger.warning('\n'.join([
-                        'The govinfo API limits the number of requests an API key can make in a period of time.',
-                        f'You have used all {rate_limit} of your available requests for this url ({r.url}).',
-                        'Please try again later.'
-                    ]))
-                    return summaries
-
-            sum_result = r.json()
-            parsed_sum = self._parse_summary_attributes(sum_result)
+        :param pages: page counts by package id, used to give long hearings a longer read timeout
+        """
+        pages = pages or {}
+        yield from self._map_concurrently(
+            lambda i: (i, self._get_transcript(i, pages.get(i))),
+            package_ids,
+            'fetching transcripts',
+            ordered=False
+        )
 
-            try:
-                mods_link = sum_result['download']['modsLink']
-            except KeyError:
-                self.logger.info(f'{package_id} has no mods Link, no witness or committee data collected')
-                summaries.append(
-                    ParsedSummary(
-                        package_id=package_id,
-                        last_modified=last_modified,
-                        title=title,
-                        congress=congress,
-                        session=parsed_sum['session'],
-                        chamber=parsed_sum['chamber'],
-                        url=summary_url,
-                        sudoc=parsed_sum['suDocClassNumber'],
-                        pages=parsed_sum['pages'],
-                        date_issued=parsed_sum['dateIssued'],
-                        dates=parsed_sum['heldDates']
-                    )
-                )
-                continue
+    def _get_transcript(self, package_id: str, pages: Optional[int] = None) -> Optional[str]:
+        transcript_endpoint = f'{self.PACKAGE_ENDPOINT}/{package_id}/htm'
+        try:
+            r = self._get(transcript_endpoint, stream=True, timeout=self.transcript_timeout(pages))
+            # responses served from the cache arrive already read
+            from_network = not r._content_consumed
+            body = self._read_streamed(r)
+        except (
+            requests.ConnectionError,
+            requests.exceptions.ReadTimeout,
+            requests.exceptions.Timeout,
+            requests.exceptions.ConnectTimeout,
+            OSError
+        ) as e:
+            self.logger.info('%s returned error: %s', transcript_endpoint, e)
+            self._record_failure(RetryQueue.TRANSCRIPT, transcript_endpoint, e, package_id=package_id)
+            return None
+        if self.cache and from_network:
+            self.cache.put(self.cache.make_key(transcript_endpoint), r, body=body)
+        return body.decode('UTF-8')
+
+    def transcript_timeout(self, pages: Optional[int] = None) -> Tuple[float, float]:
+        """(connect, read) timeout for a transcript request. govinfo renders the htm before sending
+        anything, so the read timeout grows with the number of pages.
+        """
+        return DEFAULT_TIMEOUT, DEFAULT_TIMEOUT + (pages or 0) * self.TRANSCRIPT_TIMEOUT_PER_PAGE
+
+    def _read_streamed(self, response: requests.Response) -> bytes:
+        """Reads a streamed body chunk by chunk (gzip transfer encoding is decoded as it arrives),
+        raising a Timeout if it arrives slower than TRANSCRIPT_MIN_TRANSFER_RATE.
+        """
+        if response._content_consumed:
+            return response.content
+        size = response.headers.get('Content-Length')
+        deadline = None
+        if size and size.isdigit():
+            deadline = time.monotonic() + DEFAULT_TIMEOUT + int(size) / self.TRANSCRIPT_MIN_TRANSFER_RATE
+        body = bytearray()
+        try:
+            for chunk in response.iter_content(self.TRANSCRIPT_CHUNK_SIZE):
+                body += chunk
+                if deadline and time.monotonic() > deadline:
+                    raise requests.exceptions.ReadTimeout(f'{response.url} arrived too slowly')
+        finally:
+            response.close()
+        return bytes(body)
+
+    def get_package_summaries(
+        self,
+        packages: Iterable[Dict],
+        raise_on_rate_limit: bool = False
+    ) -> List[ParsedSummary]:
+        """Builds the summaries of the given packages.
+        When the rate limit cannot be waited out, the summaries built so far are returned,
+        or the RateLimitExceededException is re-raised if raise_on_rate_limit is set.
+        """
+        summaries = []
+        fetched = []
+        try:
+            if self.mods_executor:
+                # fetched concurrently, then the MODS documents are parsed as one batch on the pool
+                for i in self._map_concurrently(self._fetch_package, packages, 'Fetching package summaries'):
+                    if i:
+                        fetched.append(i)
             else:
-                mods_page = self._make_mods_request(mods_link)
-                mods = ModsPageParser(mods_page, self.logger).create_parsed_mods_page() if mods_page else None
-
-            summaries.append(
-                ParsedSummary(
-                    package_id=package_id,
-                    title=title,
-                    congress=congress,
-                    session=parsed_sum['session'],
-                    chamber=parsed_sum['chamber'],
-                    url=summary_url,
-                    sudoc=parsed_sum['suDocClassNumber'],
-                    pages=parsed_sum['pages'],
-                    date_issued=parsed_sum['dateIssued'],
-                    last_modified=last_modified,
-                    dates=parsed_sum['heldDates'],
-                    metadata=mods
-                )
+                for i in self._map_concurrently(self._get_package_summary, packages, 'Building package summaries'):
+                    if i:
+                        summaries.append(i)
+        except RateLimitExceededException as e:
+            rate_limit = e.response.headers.get('X-RateLimit-Limit')
+            self.logger.warning(
+                'The govinfo API limits the number of requests an API key can make in a period of time.\n'
+                'You have used all %s of your available requests for this url (%s).\n'
+                'Please try again later.',
+                rate_limit,
+                e.response.url
             )
+            if raise_on_rate_limit:
+                raise
+        if fetched:
+            summaries.extend(self._build_package_summaries(fetched))
         return summaries
 
+    def _build_package_summaries(self, fetched: List[FetchedPackage]) -> List[ParsedSummary]:
+        documents = [None if self._is_mods_unchanged(i) else i.mods for i in fetched]
+        metadata = parse_mods_batch(documents, executor=self.mods_executor)
+        return [self._build_package_summary(i, j) for i, j in zip(fetched, metadata)]
+
+    def _is_mods_unchanged(self, fetched: FetchedPackage) -> bool:
+        package_id = fetched.package.get('packageId')
+        return bool(fetched.mods) and self.mods_hashes.get(package_id) == mods_content_hash(fetched.mods)
+
+    def _get_package_summary(self, package: Dict) -> Optional[ParsedSummary]:
+        fetched = self._fetch_package(package)
+        return self._build_package_summary(fetched) if fetched else None
+
+    def _log_package(self, message: str, *args) -> None:
+        """Logs a per-package message, or only a sample of them when package_log_sample_rate is below 1."""
+        if self._package_log_every and next(self._package_log_counter) % self._package_log_every == 0:
+            self.logger.info(message, *args)
+
+    def _fetch_package(self, package: Dict) -> Optional[FetchedPackage]:
+        """Network half of building a summary: requests the package's summary and MODS document."""
+        package_id = package.get('packageId')
+        self._log_package('Parsing package %s, %s', package_id, package.get('title'))
+        summary_url = package.get('packageLink').strip() if package.get('packageLink') else None
+        if summary_url is None:
+            return FetchedPackage(package=package)
+
+        deadline = Deadline(self.package_deadline) if self.package_deadline else None
+        try:
+            # keyed on the listed lastModified, so a modified package is never built from its old cached summary
+            r = self._get(summary_url, deadline=deadline, cache_version=package.get('lastModified'))
+        # HTTPError subclasses OSError, so it has to be handled first
+        except requests.exceptions.HTTPError as e:
+            self.logger.info('%s returned error: %s', summary_url, e)
+            if e.response is not None and e.response.status_code == self.RATE_LIMIT_STATUS_CODE:
+                raise RateLimitExceededException(e.response)
+            self._record_failure(RetryQueue.SUMMARY, summary_url, e, package_id=package_id, payload=package)
+            return None
+        except (
+            requests.ConnectionError,
+            requests.exceptions.ReadTimeout,
+            requests.exceptions.Timeout,
+            requests.exceptions.ConnectTimeout,
+            OSError
+        ) as e:
+            self.logger.info('%s returned error: %s', summary_url, e)
+            self._record_failure(RetryQueue.SUMMARY, summary_url, e, package_id=package_id, payload=package)
+            return None
+
+        sum_result = decode_json(r)
+        mods_link = sum_result.get('download', {}).get('modsLink')
+        mods_page = self._make_mods_request(mods_link, package, deadline) if mods_link else None
+        return FetchedPackage(package=package, summary=sum_result, mods=mods_page)
+
+    def _build_package_summary(
+        self,
+        fetched: FetchedPackage,
+        metadata: Optional[ParsedModsData] = None
+    ) -> ParsedSummary:
+        """CPU half of building a summary: parses the fetched summary attributes and MODS document.
+        metadata is the MODS document when it has been parsed already, e.g. by parse_mods_batch.
+        """
+        package = fetched.package
+        stripped_skeleton = {j: package.get(j).strip() if package.get(j) else None for j in self.SKELETON_ATTRIBUTES}
+        title = stripped_skeleton['title']
+        package_id = stripped_skeleton['packageId']
+        last_modified = parse_datetime(stripped_skeleton['lastModified'])
+        congress = int(package.get('congress', 0))
+        summary_url = stripped_skeleton['packageLink']
+        if summary_url is None:
+            self._log_package('Package %s had no link to summary, adding skeleton entry to database', package_id)
+            return ParsedSummary(
+                title=title,
+                package_id=package_id,
+                congress=congress,
+                url=summary_url,
+            )
+
+        sum_result = fetched.summary
+        parsed_sum = self._parse_summary_attributes(sum_result)
+
+        if 'modsLink' not in sum_result.get('download', {}):
+            self._log_package('%s has no mods Link, no witness or committee data collected', package_id)
+            return ParsedSummary(
+                package_id=package_id,
+                last_modified=last_modified,
+                title=title,
+                congress=congress,
+                session=parsed_sum['session'],
+                chamber=parsed_sum['chamber'],
+                url=summary_url,
+                sudoc=parsed_sum['suDocClassNumber'],
+                pages=parsed_sum['pages'],
+                date_issued=parsed_sum['dateIssued'],
+                dates=parsed_sum['heldDates']
+            )
+
+        mods = metadata
+        mods_hash = mods_content_hash(fetched.mods) if fetched.mods else None
+        if mods_hash and self.mods_hashes.get(package_id) == mods_hash:
+            # DB_Handler keeps the metadata it stored from this same document
+            mods = None
+        elif mods is None and fetched.mods:
+            if self.mods_executor:
+                mods = self.mods_executor.submit(parse_mods_document, fetched.mods).result()
+            else:
+                mods = ModsPageParser(fetched.mods, self.logger).create_parsed_mods_page()
+
+        return ParsedSummary(
+            package_id=package_id,
+            title=title,
+            congress=congress,
+            session=parsed_sum['session'],
+            chamber=parsed_sum['chamber'],
+            url=summary_url,
+            sudoc=parsed_sum['suDocClassNumber'],
+            pages=parsed_sum['pages'],
+            date_issued=parsed_sum['dateIssued'],
+            last_modified=last_modified,
+            dates=parsed_sum['heldDates'],
+            metadata=mods,
+            mods_hash=mods_hash
+        )
+
     def _parse_summary_attributes(self, summary_result: Dict) -> Dict:
         result = {
             j: summary_result.get(j).strip() if summary_result.get(j) else None
@@ -186,16 +465,19 @@ class APIClient:
         }
         result['session'] = int(summary_result.get('session', 0))
         result['pages'] = int(summary_result.get('pages', 0))
-        result['dateIssued'] = date_parse(result['dateIssued']).replace(tzinfo=dateutil.tz.gettz(name='EST'))
-        result['heldDates'] = [
-            date_parse(j).replace(tzinfo=dateutil.tz.gettz(name='EST')).date()
-            for j in summary_result.get('heldDates', [])
-        ]
+        result['dateIssued'] = parse_datetime(result['dateIssued'])
+        result['heldDates'] = [parse_datetime(j).date() for j in summary_result.get('heldDates', [])]
         return result
 
-    def _make_mods_request(self, mods_link: str) -> bytes:
+    def _make_mods_request(
+        self,
+        mods_link: str,
+        package: Optional[Dict] = None,
+        deadline: Optional[Deadline] = None
+    ) -> bytes:
         try:
-            mods_r = self._get(mods_link)
+            cache_version = package.get('lastModified') if package else None
+            mods_r = self._get(mods_link, deadline=deadline, cache_version=cache_version)
         except (
             requests.exceptions.HTTPError,
             requests.ConnectionError,
@@ -204,41 +486,124 @@ class APIClient:
             requests.exceptions.ConnectTimeout,
             OSError
         ) as e:
-            self.logger.info(f'{mods_link} returned error: {e}')
+            self.logger.info('%s returned error: %s', mods_link, e)
+            if package:
+                self._record_failure(
+                    RetryQueue.MODS,
+                    mods_link,
+                    e,
+                    package_id=package.get('packageId'),
+                    payload=package
+                )
             return None
         else:
             return mods_r.content
 
     def get_package_ids_by_congress(self, congress: int) -> List[Dict]:
+        return list(self.iter_package_ids_by_congress(congress))
+
+    def iter_package_ids_by_congress(
+        self,
+        congress: int,
+        last_modified_start: Optional[datetime.datetime] = None
+    ) -> Iterator[Dict]:
         params = {
             'congress': str(congress)
         }
-        return self._get_packages(params)
+        return self.iter_packages(params, last_modified_start)
 
-    def _get_packages(self, params: Optional[Dict[str, str]] = {}) -> List[Dict]:
-        params['offset'] = str(0)
-        params['pageSize'] = str(self.DEFAULT_PAGE_SIZE)
-        try:
-            first_response = self._get(self.CHRG_ENDPOINT, params=params)
-        except (
-            requests.exceptions.HTTPError,
-            requests.ConnectionError,
-            requests.exceptions.ReadTimeout,
-            requests.exceptions.Timeout,
-            requests.exceptions.ConnectTimeout,
-            OSError
-        ) as e:
-            self.logger.info(f'{self.CHRG_ENDPOINT} returned error: {e}')
-            return []
-
-        packages: List[Dict] = self._extract_packages_from_response(first_response)
-        # Determine how many requests to make
-        total_count: int = int(first_response.json()['count'])
-        iterations: int = total_count // self.DEFAULT_PAGE_SIZE + 1
-        for i in tqdm(range(1, iterations), 'Requesting packages'):
-            params['offset']: str = str(i * self.DEFAULT_PAGE_SIZE)
+    def iter_packages_modified_since(self, last_modified_start: datetime.datetime) -> Iterator[Dict]:
+        """Yields the packages of every congress that were added or modified at or after last_modified_start."""
+        return self.iter_packages(last_modified_start=last_modified_start)
+
+    def _get_packages(self, params: Optional[Dict[str, str]] = None) -> List[Dict]:
+        return list(self.iter_packages(params))
+
+    def iter_packages(
+        self,
+        params: Optional[Dict[str, str]] = None,
+        last_modified_start: Optional[datetime.datetime] = None
+    ) -> Iterator[Dict]:
+        """Yields the CHRG collection's package dictionaries as each page of the listing arrives."""
+        for i in self.iter_package_pages(params, last_modified_start):
+            yield from i
+
+    def iter_package_pages(
+        self,
+        params: Optional[Dict[str, str]] = None,
+        last_modified_start: Optional[datetime.datetime] = None,
+        skip_failed_pages: bool = True
+    ) -> Iterator[List[Dict]]:
+        """Yields the CHRG collection listing one page of package dictionaries at a time.
+        Only packages modified at or after last_modified_start are listed when it is given.
+        """
+        for _, i in self.iter_offset_package_pages(params, last_modified_start, skip_failed_pages=skip_failed_pages):
+            yield i
+
+    def iter_offset_package_pages(
+        self,
+        params: Optional[Dict[str, str]] = None,
+        last_modified_start: Optional[datetime.datetime] = None,
+        start_offset: int = 0,
+        skip_failed_pages: bool = True
+    ) -> Iterator[Tuple[int, List[Dict]]]:
+        """Yields (offset, page) pairs of the CHRG collection listing, beginning with the page at start_offset.
+        Later pages that could not be fetched are recorded in the retry queue and skipped, so offsets are not
+        always consecutive. The first page gives the size of the listing, so if it cannot be fetched either,
+        ListingUnavailableException is raised instead of listing nothing. Raised pages are not recorded in the
+        retry queue, since draining it would fetch that one page and none of the listing after it; list again instead.
+
+        :param skip_failed_pages: raise ListingUnavailableException for any page that could not be fetched
+            when False, for callers that must not go on with part of the listing
+        """
+        endpoint = self.chrg_endpoint(last_modified_start)
+        params = {**(params or {}), 'offset': str(start_offset), 'pageSize': str(self.DEFAULT_PAGE_SIZE)}
+        first_page = self._get_listing_page(endpoint, params, start_offset, record_failure=False)
+        if first_page is None:
+            raise ListingUnavailableException(f'Could not list {endpoint} at offset {start_offset}')
+
+        yield start_offset, self._extract_packages(first_page)
+        # Every later offset is known from the first page's count, so the rest of the pages
+        # are requested max_workers at a time and yielded in offset order.
+        total_count: int = int(first_page.get('count', 0))
+        last_offset: int = total_count // self.DEFAULT_PAGE_SIZE * self.DEFAULT_PAGE_SIZE
+        offsets = list(range(start_offset + self.DEFAULT_PAGE_SIZE, last_offset + 1, self.DEFAULT_PAGE_SIZE))
+        for offset, i in self._map_concurrently(
+            lambda offset: (offset, self._get_package_page(endpoint, params, offset, skip_failed_pages)),
+            offsets,
+            'Requesting packages'
+        ):
+            if i is not None:
+                yield offset, i
+            elif not skip_failed_pages:
+                raise ListingUnavailableException(f'Could not list {endpoint} at offset {offset}')
+
+    def _get_package_page(
+        self,
+        endpoint: str,
+        params: Dict[str, str],
+        offset: int,
+        record_failure: bool = True
+    ) -> Optional[List[Dict]]:
+        page = self._get_listing_page(endpoint, params, offset, record_failure)
+        return self._extract_packages(page) if page is not None else None
+
+    def _get_listing_page(
+        self,
+        endpoint: str,
+        params: Dict[str, str],
+        offset: int,
+        record_failure: bool = True
+    ) -> Optional[Dict]:
+        """The listing page at offset, retried PAGE_RETRIES times. None once it has failed.
+
+        :param record_failure: record the failed page in the retry queue, False when the caller raises instead
+        """
+        params = {**params, 'offset': str(offset)}
+        error = None
+        for attempt in range(self.PAGE_RETRIES + 1):
             try:
-                r: requests.Response = self._get(self.CHRG_ENDPOINT, params=params)
+                return decode_json(self._get(endpoint, params=params, use_cache=False))
             except (
                 requests.exceptions.HTTPError,
                 requests.ConnectionError,
@@ -247,15 +612,323 @@ class APIClient:
                 requests.exceptions.ConnectTimeout,
                 OSError
             ) as e:
-                self.logger.info(f'{self.CHRG_ENDPOINT} returned error: {e}')
-                continue
-            packages = packages + self._extract_packages_from_response(r)
+                error = e
+                self.logger.info('%s returned error at offset %s: %s', endpoint, offset, e)
+                client_error = (
+                    isinstance(e, requests.exceptions.HTTPError)
+                    and e.response is not None
+                    and e.response.status_code < 500
+                )
+                if client_error or attempt == self.PAGE_RETRIES:
+                    break
+                self.metrics.record_retry(endpoint)
+                time.sleep(self.PAGE_RETRY_BACKOFF * 2 ** attempt)
+        if not record_failure:
+            return None
+        self.logger.error('Skipping packages at offset %s of %s with params %s', offset, endpoint, params)
+        self._record_failure(
+            RetryQueue.PAGE,
+            requests.Request('GET', endpoint, params=params).prepare().url,
+            error,
+            payload={'endpoint': endpoint, 'params': params}
+        )
+        return None
+
+    def _record_failure(
+        self,
+        kind: str,
+        url: str,
+        error: Exception,
+        package_id: Optional[str] = None,
+        payload: Optional[Dict] = None
+    ) -> None:
+        if self.retry_queue is not None:
+            self.retry_queue.record(kind, url, error, package_id=package_id, payload=payload)
+
+    def drain_retry_queue(self) -> Tuple[List[ParsedSummary], Dict[str, str]]:
+        """Re-attempts the queued fetches whose backoff has elapsed.
+        Items that succeed are removed from the queue, items that fail again are re-recorded with one more attempt.
+
+        :return: The summaries rebuilt from failed summary, MODS and listing page fetches,
+            and the transcripts that could now be downloaded, by package id
+        :rtype: Tuple of a List of ParsedSummary and a Dictionary
+        """
+        summaries: List[ParsedSummary] = []
+        transcripts: Dict[str, str] = {}
+        if self.retry_queue is None:
+            return summaries, transcripts
+
+        try:
+            for i, (retried_summaries, transcript) in self._map_concurrently(
+                lambda item: (item, self._retry_item(item)),
+                self.retry_queue.due(),
+                'Retrying failed fetches'
+            ):
+                if i.kind == RetryQueue.TRANSCRIPT:
+                    if transcript is not None:
+                        transcripts[i.package_id] = transcript
+                else:
+                    summaries.extend(retried_summaries)
+        except RateLimitExceededException as e:
+            self.logger.warning('Rate limit reached while draining the retry queue at %s', e.response.url)
+        return summaries, transcripts
+
+    def _retry_item(self, item: RetryItem) -> Tuple[List[ParsedSummary], Optional[str]]:
+        if item.kind == RetryQueue.TRANSCRIPT:
+            transcript = self._get_transcript(item.package_id)
+            if transcript is not None:
+                self.retry_queue.remove(item.url)
+            return [], transcript
+
+        if item.kind == RetryQueue.PAGE:
+            params = item.payload['params']
+            packages = self._get_package_page(item.payload['endpoint'], params, int(params['offset']))
+            if packages is None:
+                return [], None
+            self.retry_queue.remove(item.url)
+            return [j for j in (self._get_package_summary(i) for i in packages) if j], None
+
+        summary = self._get_package_summary(item.payload)
+        retried = summary is not None and (item.kind != RetryQueue.MODS or summary.mods_hash is not None)
+        if retried:
+            self.retry_queue.remove(item.url)
+        return [summary] if summary else [], None
+
+    def _extract_packages(self, page: Dict) -> List[Dict]:
+        # pages past the end of the listing carry a 'No results found' message instead of packages
+        return page.get('packages', [])
+
+    def chrg_endpoint(self, last_modified_start: Optional[datetime.datetime] = None) -> str:
+        if last_modified_start is None:
+            return self.CHRG_ENDPOINT
+        # govinfo expects UTC timestamps, naive datetimes are assumed to already be in UTC
+        if last_modified_start.tzinfo is not None:
+            last_modified_start = last_modified_start.astimezone(dateutil.tz.tzutc()).replace(tzinfo=None)
+        return f'{self.COLLECTION_LIST_ENDPOINT}/CHRG/{last_modified_start.replace(microsecond=0).isoformat()}Z'
+
+    def _map_concurrently(
+        self,
+        func: Callable[[T], R],
+        items: Iterable[T],
+        description: str,
+        ordered: bool = True
+    ) -> Iterator[R]:
+        """Applies func to every item, keeping at most max_workers calls in flight,
+        and yields the results in the same order as the items (or as they complete, when ordered is False).
+        Items are consumed lazily, so a generator of items is never read far ahead of the results.
+        If a call raises, the exception is re-raised here and calls that have not started yet are cancelled.
+        After a RateLimitExceededException, calls waiting for the rate limiter are cancelled as well.
+        """
+        total = len(items) if isinstance(items, Sized) else None
+        with tqdm(total=total, desc=description) as progress:
+            if self.max_workers == 1:
+                for i in items:
+                    yield func(i)
+                    progress.update()
+                return
+
+            pending = deque()
+            executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            try:
+                for i in items:
+                    pending.append(executor.submit(func, i))
+                    # keep a small backlog queued behind the running calls so workers never sit idle
+                    if len(pending) >= 2 * self.max_workers:
+                        for result in self._next_results(pending, ordered):
+                            yield result
+                            progress.update()
+                while pending:
+                    for result in self._next_results(pending, ordered):
+                        yield result
+                        progress.update()
+            except RateLimitExceededException:
+                for i in pending:
+                    i.cancel()
+                # workers waiting for the quota window to reset would otherwise hold up the shutdown for up to an hour
+                with self.rate_limiter.cancelled():
+                    executor.shutdown()
+                raise
+            finally:
+                for i in pending:
+                    i.cancel()
+                executor.shutdown()
+
+    @staticmethod
+    def _next_results(pending: deque, ordered: bool) -> List:
+        """Removes the oldest future from pending and returns its result, or, when not ordered,
+        waits for any future to finish and returns the results of every finished future.
+        """
+        if ordered:
+            return [pending.popleft().result()]
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for i in done:
+            pending.remove(i)
+        return [i.result() for i in done]
+
+    def _get(
+        self,
+        url: str,
+        params: Optional[Dict[str, str]] = None,
+        use_cache: bool = True,
+        stream: bool = False,
+        timeout: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None,
+        cache_version: Optional[str] = None
+    ) -> requests.Response:
+        """GET through the rate limiter and the response cache. Streamed responses are not stored
+        in the cache here, since their body has not been read yet; the caller stores them once it is.
+        A request that runs out of deadline raises a Timeout.
+
+        :param cache_version: added to the cache key, e.g. the package's lastModified
+        """
+        # params are copied so that concurrent callers never share (or mutate) the same dictionary
+        params = {**(params or {}), 'api_key': self.api_key}
+        cache_key = cached = None
+        headers = {}
+        if self.cache and use_cache:
+            cache_key = self.cache.make_key(url, params, cache_version)
+            cached = self.cache.get(cache_key)
+            if cached:
+                if self.cache.is_fresh(cached):
+                    return cached.to_response(url)
+                headers = cached.validators()
+
+        send = self._send_hedged_get if self.hedge else self._send_get
+        r = send(url, params, headers, stream=stream, timeout=timeout, deadline=deadline)
+
+        if cache_key:
+            if r.status_code == requests.codes.not_modified and cached:
+                r.close()
+                return cached.to_response(url)
+            if not stream:
+                self.cache.put(cache_key, r)
+        return r
+
+    def _send_get(
+        self,
+        url: str,
+        params: Dict[str, str],
+        headers: Dict[str, str],
+        stream: bool = False,
+        timeout: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> requests.Response:
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            waiting_since = time.monotonic()
+            self.rate_limiter.acquire()
+            if deadline is not None:
+                deadline.extend(time.monotonic() - waiting_since)
+            try:
+                if deadline is not None:
+                    return self._get_within_deadline(url, params, headers, stream, timeout, deadline)
+                return self.session.get(url, params=params, headers=headers, stream=stream, timeout=timeout)
+            except requests.exceptions.HTTPError as e:
+                if (
+                    e.response is None
+                    or e.response.status_code != self.RATE_LIMIT_STATUS_CODE
+                    or attempt == self.RATE_LIMIT_RETRIES
+                ):
+                    raise
+                self.logger.warning('Rate limit reached requesting %s, waiting for the quota window to reset', url)
+                self.metrics.record_retry(url)
+
+    def _get_within_deadline(
+        self,
+        url: str,
+        params: Dict[str, str],
+        headers: Dict[str, str],
+        stream: bool,
+        timeout: Optional[Tuple[float, float]],
+        deadline: Deadline
+    ) -> requests.Response:
+        """session.get retried here instead of in the adapter, on the same errors and with the same backoff,
+        so every attempt's timeout is shortened to the time left and no backoff outlasts the deadline.
+        """
+        retry = self._retry_strategy
+        while True:
+            try:
+                with self._adapter.without_retries():
+                    return self.session.get(
+                        url,
+                        params=params,
+                        headers=headers,
+                        stream=stream,
+                        timeout=self._deadline_timeout(url, timeout, deadline)
+                    )
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+                requests.exceptions.HTTPError
+            ) as e:
+                response = getattr(e, 'response', None)
+                if response is not None and response.status_code not in retry.status_forcelist:
+                    raise
+                try:
+                    retry = retry.increment(method='GET', url=url)
+                except MaxRetryError:
+                    raise e
+                backoff = retry.get_backoff_time()
+                if backoff >= deadline.remaining():
+                    raise
+                self.metrics.record_retry(url)
+                time.sleep(backoff)
+
+    def _send_hedged_get(
+        self,
+        url: str,
+        params: Dict[str, str],
+        headers: Dict[str, str],
+        stream: bool = False,
+        timeout: Optional[Tuple[float, float]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> requests.Response:
+        """Sends the request, and if it has not answered within the endpoint's HEDGE_PERCENTILE latency,
+        sends one duplicate and returns whichever succeeds first. The slower response is closed when it arrives.
+        """
+        threshold = self.metrics.latency_percentile(url, self.HEDGE_PERCENTILE, self.HEDGE_MIN_SAMPLES)
+        if threshold is None:
+            return self._send_get(url, params, headers, stream=stream, timeout=timeout, deadline=deadline)
+
+        args = (url, params, headers, stream, timeout, deadline)
+        first = self._hedge_executor.submit(self._send_get, *args)
+        done, _ = wait([first], timeout=max(threshold, self.HEDGE_MIN_DELAY))
+        if done:
+            return first.result()
 
-        return packages
+        self.metrics.record_hedge(url)
+        pending = {first, self._hedge_executor.submit(self._send_get, *args)}
+        response = error = None
+        while pending and response is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for i in done:
+                if i.exception() is not None:
+                    error = i.exception()
+                elif response is None:
+                    response = i.result()
+                else:
+                    i.result().close()
+        for i in pending:
+            i.add_done_callback(self._close_response)
+        if response is None:
+            raise error
+        return response
 
-    def _extract_packages_from_response(self, response: requests.Response) -> List[Dict]:
-        return [i for i in response.json()['packages']]
+    @staticmethod
+    def _close_response(future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            future.result().close()
 
-    def _get(self, url: str, params: Optional[Dict[str, str]] = {}) -> requests.Response:
-        params['api_key'] = self.api_key
-        return self.session.get(url, params=params)
+    def _deadline_timeout(
+        self,
+        url: str,
+        timeout: Optional[Tuple[float, float]],
+        deadline: Optional[Deadline]
+    ) -> Optional[Tuple[float, float]]:
+        """Shortens the request's (connect, read) timeout to the time left before its deadline."""
+        if deadline is None:
+            return timeout
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise requests.exceptions.Timeout(f'Deadline passed before requesting {url}')
+        connect, read = timeout or (DEFAULT_TIMEOUT, DEFAULT_TIMEOUT)
+        return min(connect, remaining), min(read, remaining)
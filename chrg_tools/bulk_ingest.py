@@ -0,0 +1,248 @@
+import io
+import os
+import re
+import mmap
+import itertools
+import logging
+import zipfile
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from lxml import etree
+from hearings_lib.api_client import APIClient
+from hearings_lib.db_handler import DB_Handler
+from hearings_lib.fast_decoding import parse_datetime
+from hearings_lib.mods_page_parser import ModsPageParser, mods_content_hash
+from hearings_lib.queued_logging import get_queued_logger
+from hearings_lib.summary_parsing_types import ParsedSummary
+from hearings_lib.transcript_parser import ScanningParser
+
+
+class BulkPackage(NamedTuple):
+    """Where a package's files are inside a bulk data archive. Workers read the files themselves,
+    so only these names are sent to them.
+    """
+    archive: str
+    package_id: str
+    mods_name: str
+    transcript_name: Optional[str] = None
+
+
+class IngestedPackage(NamedTuple):
+    summary: ParsedSummary
+    transcript: Optional[str] = None
+    entries: Optional[List[Dict]] = None
+
+
+class BulkModsParser(ModsPageParser):
+    """ModsPageParser that also reads the fields APIClient takes from the package summary,
+    since bulk data archives only carry the MODS document.
+    """
+    TITLE_XPATH = '/ns:mods/ns:titleInfo[not(@type)]/ns:title'
+    CONGRESS_XPATH = '//ns:extension/ns:congress'
+    SESSION_XPATH = '//ns:extension/ns:session'
+    CHAMBER_XPATH = '//ns:extension/ns:chamber'
+    HELD_DATE_XPATH = '//ns:extension/ns:heldDate'
+    DATE_ISSUED_XPATH = '/ns:mods/ns:originInfo/ns:dateIssued'
+    SUDOC_XPATH = '/ns:mods/ns:classification[@authority="sudocs"]'
+    PAGES_XPATH = '/ns:mods/ns:physicalDescription/ns:extent'
+    # the listing's lastModified is not in the document, the record change date is the closest date before it
+    RECORD_CHANGE_DATE_XPATH = '/ns:mods/ns:recordInfo/ns:recordChangeDate'
+    PAGES_PATTERN = re.compile(r'\d+')
+
+    def create_summary(self, package_id: str, mods_hash: Optional[str] = None) -> ParsedSummary:
+        date_issued = self._text(self.DATE_ISSUED_XPATH)
+        last_modified = self._text(self.RECORD_CHANGE_DATE_XPATH) or date_issued
+        pages = self.PAGES_PATTERN.match(self._text(self.PAGES_XPATH) or '')
+        return ParsedSummary(
+            package_id=package_id,
+            title=self._text(self.TITLE_XPATH),
+            congress=int(self._text(self.CONGRESS_XPATH) or 0),
+            session=int(self._text(self.SESSION_XPATH) or 0),
+            chamber=self._text(self.CHAMBER_XPATH),
+            url=f'{APIClient.PACKAGE_ENDPOINT}/{package_id}/summary',
+            sudoc=self._text(self.SUDOC_XPATH),
+            pages=int(pages.group()) if pages else 0,
+            date_issued=parse_datetime(date_issued) if date_issued else None,
+            last_modified=parse_datetime(last_modified) if last_modified else None,
+            dates=[
+                parse_datetime(i.text.strip()).date()
+                for i in self.root.xpath(self.HELD_DATE_XPATH, namespaces=self.namespace) if i.text
+            ],
+            metadata=self.create_parsed_mods_page(),
+            mods_hash=mods_hash
+        )
+
+    def _text(self, xpath: str) -> Optional[str]:
+        element = self.root.xpath(xpath, namespaces=self.namespace)
+        if element and element[0].text:
+            return element[0].text.strip()
+        return None
+
+
+# govinfo package archives hold CHRG-113hhrg86466/mods.xml and CHRG-113hhrg86466/html/CHRG-113hhrg86466.htm
+MODS_NAME_PATTERN = re.compile(r'(?:^|/)(?P<package_id>CHRG-[0-9a-z]+)/mods\.xml$')
+TRANSCRIPT_NAME_PATTERN = re.compile(r'(?:^|/)(?P<package_id>CHRG-[0-9a-z]+)\.htm$')
+LOGGER_NAME = 'hearings_lib.bulk_ingest'
+
+# archives opened by this process, kept open so a worker maps each archive once
+_open_archives: Dict[str, zipfile.ZipFile] = {}
+
+
+class MappedFile:
+    """The file interface zipfile needs, over a memory map (mmap objects only report seekable() from 3.13)."""
+
+    def __init__(self, mapped: mmap.mmap):
+        self.mapped = mapped
+
+    def seekable(self) -> bool:
+        return True
+
+    def __getattr__(self, name):
+        return getattr(self.mapped, name)
+
+
+def open_archive(path: str) -> zipfile.ZipFile:
+    """Opens a ZIP archive over a read-only memory map of the file.
+    Members are read straight from the page cache without extracting the archive.
+    """
+    archive = _open_archives.get(path)
+    if archive is None:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        archive = zipfile.ZipFile(MappedFile(mapped))
+        _open_archives[path] = archive
+    return archive
+
+
+def close_archives() -> None:
+    for i in _open_archives.values():
+        mapped = i.fp
+        i.close()
+        mapped.close()
+    _open_archives.clear()
+
+
+def find_archives(paths: Iterable[str]) -> Iterator[str]:
+    """The ZIP files among paths, and in the directories among them, in name order."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, directories, names in os.walk(path):
+                directories.sort()
+                for i in sorted(names):
+                    if i.lower().endswith('.zip'):
+                        yield os.path.join(root, i)
+        else:
+            yield path
+
+
+def iter_bulk_packages(paths: Iterable[str]) -> Iterator[BulkPackage]:
+    """Lists the packages in the archives, read from each archive's central directory only."""
+    for path in find_archives(paths):
+        mods_names: Dict[str, str] = {}
+        transcript_names: Dict[str, str] = {}
+        for i in open_archive(path).namelist():
+            match = MODS_NAME_PATTERN.search(i)
+            if match:
+                mods_names[match.group('package_id')] = i
+                continue
+            match = TRANSCRIPT_NAME_PATTERN.search(i)
+            if match:
+                transcript_names[match.group('package_id')] = i
+        for package_id, mods_name in mods_names.items():
+            yield BulkPackage(path, package_id, mods_name, transcript_names.get(package_id))
+
+
+def ingest_package(package: BulkPackage, parse_transcript: bool = True) -> Optional[IngestedPackage]:
+    """Pool worker entry point: parses one package's MODS document and transcript out of its archive."""
+    logger = logging.getLogger(LOGGER_NAME)
+    try:
+        archive = open_archive(package.archive)
+        mods = archive.read(package.mods_name)
+        summary = BulkModsParser(mods, logger).create_summary(package.package_id, mods_content_hash(mods))
+        if package.transcript_name is None:
+            return IngestedPackage(summary)
+        transcript = archive.read(package.transcript_name).decode('UTF-8')
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile, etree.XMLSyntaxError) as e:
+        logger.warning('Skipping %s in %s: %s: %s', package.package_id, package.archive, type(e).__name__, e)
+        return None
+    # streamed from the decoded text, so the transcript is not also held as a list of lines
+    entries = list(ScanningParser().iter_entries(io.StringIO(transcript))) if parse_transcript else None
+    return IngestedPackage(summary, transcript, entries)
+
+
+def ingest_packages(packages: List[BulkPackage], parse_transcripts: bool = True) -> List[Optional[IngestedPackage]]:
+    return [ingest_package(i, parse_transcripts) for i in packages]
+
+
+class BulkIngester:
+    """Loads hearings from local copies of govinfo's CHRG package archives instead of the API.
+
+    Archives are memory mapped and their members read in place. A process pool parses each package's
+    MODS document (BulkModsParser) and transcript (transcript_parser.ScanningParser) while this process writes
+    the results through DB_Handler, a batch at a time. No API requests are made.
+    """
+    DEFAULT_BATCH_SIZE = 100
+    CHUNK_SIZE = 8  # packages sent to a worker per task
+    PENDING_CHUNKS_PER_PROCESS = 4
+
+    def __init__(self, handler: DB_Handler, processes: int = 1, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.logger = logging.getLogger(__name__)
+        self.handler = handler
+        self.processes = max(1, processes)
+        self.batch_size = batch_size
+
+    def ingest(self, paths: Iterable[str], parse_transcripts: bool = True, force: bool = False) -> int:
+        """Ingests every package in the ZIP files and directories of ZIP files in paths.
+
+        :param parse_transcripts: also parse each transcript into entries
+        :param force: update hearings whose stored last_modified matches the archive's
+        :return: the number of packages ingested
+        """
+        packages = iter_bulk_packages(paths)
+        count = 0
+        batch: List[IngestedPackage] = []
+        pending: Deque[Future] = deque()
+
+        def collect(future: Future) -> None:
+            nonlocal batch, count
+            batch.extend(i for i in future.result() if i)
+            if len(batch) >= self.batch_size:
+                count += self._write(batch, force)
+                batch = []
+
+        with ProcessPoolExecutor(
+            self.processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=get_queued_logger,
+            initargs=(LOGGER_NAME, None, 'a')
+        ) as pool:
+            try:
+                # chunks are submitted as earlier ones are written, so parsed transcripts never pile up in memory
+                for chunk in iter(lambda: list(itertools.islice(packages, self.CHUNK_SIZE)), []):
+                    pending.append(pool.submit(ingest_packages, chunk, parse_transcripts))
+                    if len(pending) >= self.processes * self.PENDING_CHUNKS_PER_PROCESS:
+                        collect(pending.popleft())
+                while pending:
+                    collect(pending.popleft())
+                count += self._write(batch, force)
+            finally:
+                close_archives()
+        return count
+
+    def _write(self, batch: List[IngestedPackage], force: bool) -> int:
+        if not batch:
+            return 0
+        self.handler.sync_hearing_records([i.summary for i in batch], force=force)
+        # entries are only rewritten for transcripts that are new or changed
+        changed = [
+            i for i in batch
+            if i.transcript and not self.handler.is_transcript_current(i.summary.package_id, i.transcript)
+        ]
+        self.handler.sync_transcripts({i.summary.package_id: i.transcript for i in changed})
+        self.handler.replace_parsed_entries({
+            i.summary.package_id: i.entries for i in changed if i.entries is not None
+        })
+        self.logger.info('Ingested %d packages', len(batch))
+        return len(batch)
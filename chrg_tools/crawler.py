@@ -0,0 +1,102 @@
+import datetime
+import logging
+from typing import Dict, Iterable, List
+from dateutil.parser import parse as date_parse
+import dateutil.tz
+from hearings_lib.api_client import APIClient
+from hearings_lib.db_handler import DB_Handler
+from hearings_lib.pipeline import Pipeline, StageStats
+
+
+class Crawler:
+    """Crawls the CHRG collection into the database one listing page at a time.
+
+    The summaries of each page are synced as soon as they are fetched, and a per-congress checkpoint
+    records the next page to fetch, so an interrupted crawl resumes from its last flushed page.
+    Checkpoints are cleared once every requested congress has been crawled.
+    """
+    ALL_CONGRESSES = range(118)
+
+    def __init__(self, client: APIClient, handler: DB_Handler):
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.handler = handler
+        self.existing_packages: Dict[str, datetime.datetime] = self.handler.get_package_last_modified()
+        # modified packages whose MODS document is unchanged are synced without parsing it again
+        self.client.mods_hashes.update(self.handler.get_package_mods_hashes())
+
+    def crawl_congresses(self, congresses: Iterable[int] = ALL_CONGRESSES) -> datetime.datetime:
+        """Crawls the given congresses, resuming from the saved checkpoints if a previous crawl was interrupted.
+        A congress whose listing cannot be read raises ListingUnavailableException before it is marked completed,
+        so the crawl stops with its checkpoints kept and the next crawl resumes from them.
+
+        :return: The time the crawl started, which is the start of the interrupted crawl when resuming
+        :rtype: datetime.datetime
+        """
+        checkpoints = self.handler.get_crawl_checkpoints()
+        crawl_started = min(
+            [i.crawl_started for i in checkpoints.values()],
+            default=datetime.datetime.utcnow()
+        )
+        for congress in congresses:
+            checkpoint = checkpoints.get(congress)
+            if checkpoint and checkpoint.completed:
+                continue
+            start_offset = checkpoint.next_offset if checkpoint else 0
+            if start_offset:
+                self.logger.info('Resuming congress %s at offset %s', congress, start_offset)
+
+            for offset, page in self.client.iter_offset_package_pages(
+                {'congress': str(congress)},
+                start_offset=start_offset
+            ):
+                self._sync_page(page)
+                self.handler.save_crawl_checkpoint(congress, offset + self.client.DEFAULT_PAGE_SIZE, crawl_started)
+            self.handler.save_crawl_checkpoint(congress, 0, crawl_started, completed=True)
+
+        self.handler.clear_crawl_checkpoints()
+        return crawl_started
+
+    def crawl_modified_since(self, last_modified_start: datetime.datetime) -> None:
+        """Crawls every package modified since last_modified_start, syncing each page as it is fetched.
+        These listings are short, so they are not checkpointed. A page that cannot be listed raises
+        ListingUnavailableException, so the caller does not move the watermark past packages it never saw.
+        """
+        for page in self.client.iter_package_pages(last_modified_start=last_modified_start, skip_failed_pages=False):
+            self._sync_page(page)
+
+    def crawl_pipelined(
+        self,
+        congresses: Iterable[int] = ALL_CONGRESSES,
+        fetch_transcripts: bool = False,
+        **pipeline_options
+    ) -> List[StageStats]:
+        """Crawls the given congresses through a Pipeline, overlapping listing, fetching, parsing and writes.
+        Pipelined crawls are not checkpointed.
+        """
+        packages = (
+            i for congress in congresses
+            for i in self.client.iter_package_ids_by_congress(congress)
+            if self._is_new_or_modified(i)
+        )
+        return Pipeline(self.client, self.handler, **pipeline_options).run(packages, fetch_transcripts)
+
+    def _sync_page(self, page: List[Dict]) -> None:
+        packages = [i for i in page if self._is_new_or_modified(i)]
+        if not packages:
+            return
+        # a page cut short by the rate limit must not be checkpointed, so the error is left to stop the crawl
+        self.handler.sync_hearing_records(
+            self.client.get_package_summaries(packages=packages, raise_on_rate_limit=True)
+        )
+
+    def _is_new_or_modified(self, package: Dict) -> bool:
+        return is_new_or_modified(package, self.existing_packages)
+
+
+def is_new_or_modified(package: Dict, existing_packages: Dict[str, datetime.datetime]) -> bool:
+    """Whether a listed package is missing from existing_packages or was modified after it was stored."""
+    last_modified = existing_packages.get(package['packageId'])
+    if last_modified is None:
+        return True
+    return date_parse(package['lastModified']) > last_modified.replace(tzinfo=dateutil.tz.tzlocal())
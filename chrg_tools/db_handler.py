@@ -1,9 +1,11 @@
-from typing import List, Tuple, Dict
+import datetime
+from typing import List, Tuple, Dict, Optional
 from tqdm.auto import tqdm
 import mmh3
 from sqlalchemy.engine.base import Engine
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, insert, update, inspect, bindparam
 from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
 from hearings_lib.db_models import (
     Hearing,
     HearingTranscript,
@@ -15,29 +17,69 @@ from hearings_lib.db_models import (
     MemberAttendance,
     CongressMember,
     HearingWitness,
-    HeldDate
+    HeldDate,
+    CrawlWatermark,
+    CrawlCheckpoint
 )
 from hearings_lib.summary_parsing_types import ParsedSummary, ParsedCommittee, ParsedMember
+from hearings_lib.transcript_parser import Parser
 
 
 class DB_Handler:
     HASH_SEED = 42
+    DEFAULT_WATERMARK = 'chrg'
+    # Columns added to tables that existing databases already have. Base.metadata.create_all only creates
+    # missing tables, so upgrade_schema adds these to databases created before them.
+    ADDED_COLUMNS = [
+        Hearing.__table__.c.mods_hash,
+        HearingTranscript.__table__.c.parsed_hash,
+        HearingTranscript.__table__.c.parser_version,
+        HearingEntry.__table__.c.body_start,
+        HearingEntry.__table__.c.body_end
+    ]
 
     def __init__(self, engine):
         self.engine: Engine = engine
+        self.upgrade_schema(self.engine)
         self.member_cache: Dict[str, CongressMember] = self._initialize_member_cache(self.engine)
         self.committee_cache: Dict[str, Committee] = self._initialize_committee_cache(self.engine)
         self.transcript_cache: Dict[str, int] = self._initialize_transcript_cache(self.engine)
 
+    def upgrade_schema(self, engine) -> List[str]:
+        """Adds the ADDED_COLUMNS missing from existing tables, so databases created by older versions
+        can be read and written. Tables that do not exist yet are left to Base.metadata.create_all.
+
+        :return: the added columns, as table.column
+        """
+        inspector = inspect(engine)
+        existing_tables = set(inspector.get_table_names())
+        added = []
+        with engine.begin() as conn:
+            for column in self.ADDED_COLUMNS:
+                table = column.table
+                if table.name not in existing_tables:
+                    continue
+                if column.name in {i['name'] for i in inspector.get_columns(table.name)}:
+                    continue
+                table_name = engine.dialect.identifier_preparer.format_table(table)
+                conn.exec_driver_sql(
+                    f'ALTER TABLE {table_name} ADD COLUMN {CreateColumn(column).compile(dialect=engine.dialect)}'
+                )
+                added.append(f'{table.name}.{column.name}')
+        return added
+
     def _make_transcript_body_hash(self, body) -> str:
         return self._make_hash(body)
 
+    def is_transcript_current(self, package_id: str, body: str) -> bool:
+        """Whether the stored transcript of the package has this body."""
+        return self.transcript_cache.get(package_id) == self._make_transcript_body_hash(body)
+
     def _initialize_transcript_cache(self, engine) -> Dict[str, int]:
         with Session(engine) as conn:
             return {
-                i[0].package_id: i[0].body_hash
-                for i in conn.execute(select(HearingTranscript))
-                if i[0]
+                i[0]: i[1]
+                for i in conn.execute(select(HearingTranscript.package_id, HearingTranscript.body_hash))
             }
 
     def _make_congress_member_hash(self, member) -> str:
@@ -64,19 +106,112 @@ class DB_Handler:
     def _make_hash(self, hash_input: str) -> str:
         return str(mmh3.hash(hash_input, self.HASH_SEED, signed=False))
 
+    def get_crawl_watermark(self, name: str = DEFAULT_WATERMARK) -> Optional[datetime.datetime]:
+        with Session(self.engine) as session:
+            watermark = session.get(CrawlWatermark, name)
+            return watermark.last_modified_start if watermark else None
+
+    def set_crawl_watermark(self, last_modified_start: datetime.datetime, name: str = DEFAULT_WATERMARK) -> None:
+        with Session(self.engine) as session:
+            session.merge(CrawlWatermark(name=name, last_modified_start=last_modified_start))
+            session.commit()
+
+    def get_crawl_checkpoints(self) -> Dict[int, CrawlCheckpoint]:
+        with Session(self.engine) as session:
+            return {i.congress: i for i in session.execute(select(CrawlCheckpoint)).scalars()}
+
+    def save_crawl_checkpoint(
+        self,
+        congress: int,
+        next_offset: int,
+        crawl_started: datetime.datetime,
+        completed: bool = False
+    ) -> None:
+        with Session(self.engine) as session:
+            session.merge(CrawlCheckpoint(
+                congress=congress,
+                next_offset=next_offset,
+                completed=completed,
+                crawl_started=crawl_started
+            ))
+            session.commit()
+
+    def clear_crawl_checkpoints(self) -> None:
+        with Session(self.engine) as session:
+            session.execute(delete(CrawlCheckpoint))
+            session.commit()
+
+    def get_package_last_modified(self) -> Dict[str, datetime.datetime]:
+        with Session(self.engine) as session:
+            return {i[0]: i[1] for i in session.execute(select(Hearing.package_id, Hearing.last_modified))}
+
+    def get_package_mods_hashes(self) -> Dict[str, str]:
+        """The mods_content_hash of each hearing's stored MODS metadata, for APIClient.mods_hashes."""
+        with Session(self.engine) as session:
+            stored = select(Hearing.package_id, Hearing.mods_hash).where(Hearing.mods_hash.isnot(None))
+            return {i[0]: i[1] for i in session.execute(stored)}
+
     def save_parsed_entries(self, package_id: str, entries: List[HearingEntry]) -> None:
         with Session(self.engine) as session:
             session.execute(delete(HearingEntry).where(HearingEntry.package_id == package_id))
             session.commit()
             counter = 0
             for i in entries:
-                session.add(entries)
+                session.add(i)
                 counter += 1
                 if counter == 100:
                     counter = 0
                     session.commit()
             session.commit()
 
+    def replace_parsed_entries(
+        self,
+        parsed: Dict[str, List[Dict]],
+        body_hashes: Optional[Dict[str, str]] = None,
+        parser_version: Optional[int] = None
+    ) -> None:
+        """Replaces the entries of each package with the parser's entries for it, in one transaction.
+        Rows are inserted with a single executemany instead of one ORM object per entry, and each transcript
+        records the body hash and parser version its entries came from.
+        Entries from Parser.iter_entry_offsets are stored as offsets into the transcript body, without a body.
+
+        :param body_hashes: body_hash of each parsed transcript, by default that of the transcript synced last
+        :param parser_version: Parser.VERSION by default
+        """
+        if not parsed:
+            return
+        if body_hashes is None:
+            body_hashes = self.transcript_cache
+        if parser_version is None:
+            parser_version = Parser.VERSION
+        rows = [
+            {
+                'transcript_hash': body_hashes.get(package_id),
+                'parsed_name': j['speaker'],
+                'body': j.get('body'),
+                'body_start': j.get('start'),
+                'body_end': j.get('end'),
+                'sequence': j['seq'],
+                'package_id': package_id,
+                'transcript_id': package_id
+            }
+            for package_id, entries in parsed.items()
+            for j in entries
+        ]
+        with Session(self.engine) as session:
+            session.execute(delete(HearingEntry).where(HearingEntry.package_id.in_(list(parsed))))
+            if rows:
+                session.execute(insert(HearingEntry), rows)
+            # a Core executemany keyed on package_id, run on the connection so that SQLAlchemy 1.4 and 2.0
+            # both send one UPDATE ... WHERE package_id = ? per transcript
+            session.connection().execute(
+                update(HearingTranscript)
+                .where(HearingTranscript.package_id == bindparam('b_package_id'))
+                .values(parsed_hash=bindparam('b_hash'), parser_version=bindparam('b_version')),
+                [{'b_package_id': i, 'b_hash': body_hashes.get(i), 'b_version': parser_version} for i in parsed]
+            )
+            session.commit()
+
     def sync_transcripts(self, transcripts: Dict[str, str]) -> None:
         with Session(self.engine) as session:
             counter = 0
@@ -106,13 +241,17 @@ class DB_Handler:
                     session.commit()
             session.commit()
 
-    def sync_hearing_records(self, package_summaries: List[ParsedSummary]) -> None:
+    def sync_hearing_records(self, package_summaries: List[ParsedSummary], force: bool = False) -> None:
+        """Adds or updates the hearings of the given summaries.
+        Hearings whose last_modified has not changed are skipped unless force is set,
+        which is needed when a summary is re-fetched after its MODS request failed.
+        """
         with Session(self.engine) as session:
             counter = 0
             for i in tqdm(package_summaries, 'Adding summaries and metadata to database'):
                 current_hearing = session.execute(select(Hearing).filter_by(package_id=i.package_id)).scalar()
                 if current_hearing:
-                    if current_hearing.last_modified == i.last_modified:
+                    if current_hearing.last_modified == i.last_modified and not force:
                         continue
 
                     processed_hearing = self._process_hearing(i, current_hearing, session)
@@ -129,6 +268,16 @@ class DB_Handler:
         hearing.title = parsed.title
         hearing.congress = parsed.congress
         hearing.url = parsed.url
+        if parsed.mods_hash and parsed.mods_hash == hearing.mods_hash:
+            # same MODS document as before, so the stored uri, committees, witnesses and members are current
+            hearing.last_modified = parsed.last_modified
+            hearing.session = parsed.session
+            hearing.chamber = parsed.chamber
+            hearing.sudoc = parsed.sudoc
+            hearing.pages = parsed.pages
+            hearing.date_issued = parsed.date_issued
+            hearing.dates_held = [HeldDate(date=j) for j in parsed.dates or []]
+            return hearing
         try:
             hearing.last_modified = parsed.last_modified
             hearing.session = parsed.session
@@ -137,12 +286,13 @@ class DB_Handler:
             hearing.sudoc = parsed.sudoc
             hearing.pages = parsed.pages
             hearing.date_issued = parsed.date_issued
-            hearing.dates_held = [HeldDate(date=j) for j in parsed.dates]
+            hearing.dates_held = [HeldDate(date=j) for j in parsed.dates or []]
             committees, subcommittees = self._process_unique_committees(parsed.metadata.committees, session)
             hearing.committees = committees
             hearing.subcommittees = subcommittees
             hearing.witnesses = self._process_unique_witnesses(parsed.metadata.witnesses, session)
             hearing.members = self._process_unique_members(parsed.metadata.members, session)
+            hearing.mods_hash = parsed.mods_hash
         except AttributeError:
             pass
 
@@ -160,6 +310,8 @@ class DB_Handler:
             existing_committee = self.committee_cache.get(committee_hash)
 
             if existing_committee:
+                existing_committee = self._attach(existing_committee, session)
+                self.committee_cache[committee_hash] = existing_committee
                 for j in i.subcommittees:
                     existing_subcommittee: SubCommittee = session.execute(
                         select(SubCommittee).filter_by(name=j, committee_id=existing_committee.id)
@@ -196,6 +348,15 @@ class DB_Handler:
 
         return participant_committees, participant_subcommittees
 
+    @staticmethod
+    def _attach(cached, session: Session):
+        """Cached committees and members outlive the session they were loaded or added in.
+        Detached ones are merged into the current session, without reloading them, before they are referenced.
+        """
+        if inspect(cached).detached:
+            return session.merge(cached, load=False)
+        return cached
+
     def _process_unique_witnesses(self, parsed_witnesses: List[str], session: Session) -> List[HearingWitness]:
         return [HearingWitness(name=i) for i in parsed_witnesses]
 
@@ -206,6 +367,8 @@ class DB_Handler:
             existing_member = self.member_cache.get(member_hash)
 
             if existing_member:
+                existing_member = self._attach(existing_member, session)
+                self.member_cache[member_hash] = existing_member
                 attending_members.append(MemberAttendance(member=existing_member))
                 continue
             new_member = CongressMember(
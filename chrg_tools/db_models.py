@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, Text, ForeignKey
+from typing import Optional
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, Boolean, ForeignKey
 from sqlalchemy.orm import declarative_base, relationship
+from hearings_lib.transcript_parser import Parser
 Base = declarative_base()
 
 
@@ -17,6 +19,8 @@ class Hearing(Base):
     pages = Column(Integer)
     date_issued = Column(Date)
     last_modified = Column(DateTime)
+    # content hash and parser version of the MODS document the metadata was stored from
+    mods_hash = Column(String(20))
 
     transcript = relationship('HearingTranscript', back_populates='hearing')
     transcript_entries = relationship('HearingEntry', back_populates='hearing')
@@ -35,6 +39,9 @@ class HearingTranscript(Base):
     package_id = Column(String(25), ForeignKey('hearing_summaries.package_id'), primary_key=True)
     body = Column(Text)
     body_hash = Column(String(10))
+    # body_hash and Parser.VERSION of the body the stored entries were parsed from
+    parsed_hash = Column(String(10))
+    parser_version = Column(Integer)
     hearing = relationship('Hearing', back_populates='transcript')
     entries = relationship('HearingEntry', back_populates='transcript')
 
@@ -45,6 +52,9 @@ class HearingEntry(Base):
     transcript_hash = Column(String(10))
     parsed_name = Column(Text)
     body = Column(Text)
+    # entries stored as offsets into the transcript body have no body of their own
+    body_start = Column(Integer)
+    body_end = Column(Integer)
     sequence = Column(Integer)
     member_id = Column(Integer, ForeignKey('members.id'))
     package_id = Column(String(25), ForeignKey('hearing_summaries.package_id'))
@@ -54,6 +64,18 @@ class HearingEntry(Base):
     hearing = relationship('Hearing', back_populates='transcript_entries')
     transcript = relationship('HearingTranscript', back_populates='entries')
 
+    @property
+    def text(self) -> Optional[str]:
+        """The entry's body, sliced out of the transcript when only its offsets are stored.
+        None when the transcript body has changed since the offsets were parsed from it,
+        until the entries are parsed again.
+        """
+        if self.body is not None or self.body_start is None:
+            return self.body
+        if self.transcript is None or self.transcript_hash != self.transcript.body_hash:
+            return None
+        return Parser.entry_text(self.transcript.body, self.body_start, self.body_end)
+
 
 class Committee(Base):
     __tablename__ = 'committees'
@@ -127,3 +149,31 @@ class HeldDate(Base):
     date = Column(Date)
     hearing_id = Column(String(25), ForeignKey('hearing_summaries.package_id'))
     hearing = relationship('Hearing', back_populates='dates_held')
+
+
+class CrawlWatermark(Base):
+    __tablename__ = 'crawl_watermarks'
+    name = Column(String(50), primary_key=True)
+    # UTC start time of the last crawl that completed, the next crawl lists packages modified since then
+    last_modified_start = Column(DateTime)
+
+
+class FailedFetch(Base):
+    __tablename__ = 'failed_fetches'
+    url = Column(Text, primary_key=True)
+    kind = Column(String(10))
+    package_id = Column(String(25))
+    # the package dictionary or listing parameters needed to repeat the fetch, as JSON
+    payload = Column(Text)
+    error = Column(Text)
+    attempts = Column(Integer)
+    last_attempt = Column(DateTime)
+
+
+class CrawlCheckpoint(Base):
+    __tablename__ = 'crawl_checkpoints'
+    congress = Column(Integer, primary_key=True)
+    # offset of the first listing page that has not been flushed to the database yet
+    next_offset = Column(Integer)
+    completed = Column(Boolean)
+    crawl_started = Column(DateTime)
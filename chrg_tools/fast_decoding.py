@@ -0,0 +1,42 @@
+import re
+import datetime
+from typing import Any, Optional
+import requests
+import dateutil.tz
+from dateutil.parser import parse as date_parse
+
+try:
+    import orjson
+except ImportError:  # optional, installed with the 'fast' extra
+    orjson = None
+
+# Resolved once, gettz is a cache lookup plus locking on every call
+EST = dateutil.tz.gettz(name='EST')
+
+# govinfo sends dates as 2015-07-29 and timestamps as 2021-02-22T18:00:44Z
+ISO_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2})(?:T(\d{2}):(\d{2}):(\d{2})(?:Z|[+-]\d{2}:?\d{2})?)?')
+
+
+def decode_json(response: requests.Response) -> Any:
+    """response.json(), decoded with orjson when it is installed.
+    Bodies orjson rejects are handed to response.json(), so errors are raised as before.
+    """
+    if orjson is None:
+        return response.json()
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        return response.json()
+
+
+def parse_datetime(value: str, tzinfo: Optional[datetime.tzinfo] = EST) -> datetime.datetime:
+    """Same result as date_parse(value).replace(tzinfo=tzinfo), with a fast path for strict ISO-8601 values.
+    Like replace(), the wall clock time is kept and any offset in value is discarded.
+    """
+    match = ISO_PATTERN.fullmatch(value)
+    if match:
+        try:
+            return datetime.datetime(*(int(i) for i in match.groups() if i is not None), tzinfo=tzinfo)
+        except ValueError:
+            pass
+    return date_parse(value).replace(tzinfo=tzinfo)
@@ -0,0 +1,196 @@
+import os
+import re
+import json
+import time
+import bisect
+import threading
+from urllib.parse import urlparse
+from collections import Counter, deque
+from typing import Dict, List, Optional
+import requests
+
+
+class EndpointMetrics:
+    """Counters for the requests sent to one kind of govinfo endpoint."""
+
+    def __init__(self, bucket_count: int, recent_count: int):
+        self.requests = 0
+        self.errors = 0  # requests that failed without a response, e.g. connection errors and timeouts
+        self.retries = 0
+        self.hedges = 0  # duplicate requests sent because the first was slower than the hedging threshold
+        self.bytes_received = 0
+        self.latency_sum = 0.0
+        # one count per bucket upper bound in RequestMetrics.LATENCY_BUCKETS, plus one for +Inf
+        self.latency_buckets = [0] * (bucket_count + 1)
+        self.status_codes: Counter = Counter()
+        # latencies of the most recent successful requests, for percentiles
+        self.recent_latencies: deque = deque(maxlen=recent_count)
+
+    def to_dict(self, bounds: List[float]) -> Dict:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'hedges': self.hedges,
+            'bytes_received': self.bytes_received,
+            'latency_sum': self.latency_sum,
+            'latency_buckets': dict(zip([str(i) for i in bounds] + ['+Inf'], self.latency_buckets)),
+            'status_codes': {str(k): v for k, v in sorted(self.status_codes.items())}
+        }
+
+
+class RequestMetrics:
+    """Per-endpoint request counts, latency histograms, bytes received, retries and status codes,
+    plus the remaining rate limit budget, for every request an APIClient sends.
+
+    APIHTTPAdapter.send reports each request through observe(). Latency is the time until the
+    response headers arrive. Bytes received are taken from Content-Length, so they count the
+    compressed size of gzipped responses.
+    Metrics can be exported as a Prometheus text file (for the node_exporter textfile collector)
+    or as a JSON snapshot.
+    """
+    LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]  # seconds
+    RECENT_LATENCIES = 500
+    PREFIX = 'govinfo'
+    # /packages/CHRG-114shrg99990/summary becomes packages/summary
+    PACKAGE_PATH_PATTERN = re.compile(r'^/packages/[^/]+/(?P<kind>[^/]+)')
+    RATE_LIMIT_REMAINING_HEADER = 'X-RateLimit-Remaining'
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+        self.rate_limit_remaining: Optional[int] = None
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def endpoint_name(cls, url: str) -> str:
+        path = urlparse(url).path
+        match = cls.PACKAGE_PATH_PATTERN.match(path)
+        if match:
+            return f'packages/{match.group("kind")}'
+        return path.strip('/').split('/')[0] or '/'
+
+    def _endpoint(self, url: str) -> EndpointMetrics:
+        name = self.endpoint_name(url)
+        if name not in self.endpoints:
+            self.endpoints[name] = EndpointMetrics(len(self.LATENCY_BUCKETS), self.RECENT_LATENCIES)
+        return self.endpoints[name]
+
+    def observe(self, url: str, elapsed: float, response: Optional[requests.Response] = None) -> None:
+        """Records one request. A missing response means the request failed before one arrived."""
+        with self._lock:
+            endpoint = self._endpoint(url)
+            endpoint.requests += 1
+            endpoint.latency_sum += elapsed
+            endpoint.latency_buckets[bisect.bisect_left(self.LATENCY_BUCKETS, elapsed)] += 1
+            if response is None:
+                endpoint.errors += 1
+                return
+
+            endpoint.status_codes[response.status_code] += 1
+            if response.ok:
+                endpoint.recent_latencies.append(elapsed)
+            length = response.headers.get('Content-Length')
+            if length and length.isdigit():
+                endpoint.bytes_received += int(length)
+            # retries made inside the adapter by urllib3's Retry
+            retries = getattr(response.raw, 'retries', None)
+            if retries is not None:
+                endpoint.retries += len(retries.history)
+            remaining = response.headers.get(self.RATE_LIMIT_REMAINING_HEADER)
+            if remaining and remaining.isdigit():
+                self.rate_limit_remaining = int(remaining)
+
+    def record_retry(self, url: str) -> None:
+        """Records a retry made by the client itself, e.g. after a rate limit wait or a failed listing page."""
+        with self._lock:
+            self._endpoint(url).retries += 1
+
+    def record_hedge(self, url: str) -> None:
+        with self._lock:
+            self._endpoint(url).hedges += 1
+
+    def latency_percentile(self, url: str, percentile: float, min_samples: int = 1) -> Optional[float]:
+        """The given percentile of the endpoint's recent successful request latencies,
+        or None until at least min_samples have been recorded.
+        """
+        with self._lock:
+            endpoint = self.endpoints.get(self.endpoint_name(url))
+            samples = sorted(endpoint.recent_latencies) if endpoint else []
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'started': self.started,
+                'rate_limit_remaining': self.rate_limit_remaining,
+                'endpoints': {k: v.to_dict(self.LATENCY_BUCKETS) for k, v in sorted(self.endpoints.items())}
+            }
+
+    def to_prometheus(self) -> str:
+        snapshot = self.snapshot()
+        endpoints = snapshot['endpoints']
+        lines = []
+
+        def metric(name: str, metric_type: str, description: str) -> str:
+            lines.append(f'# HELP {self.PREFIX}_{name} {description}')
+            lines.append(f'# TYPE {self.PREFIX}_{name} {metric_type}')
+            return f'{self.PREFIX}_{name}'
+
+        name = metric('requests_total', 'counter', 'Requests sent, by endpoint and status code.')
+        for endpoint, i in endpoints.items():
+            for status, count in i['status_codes'].items():
+                lines.append(f'{name}{{endpoint="{endpoint}",status="{status}"}} {count}')
+            if i['errors']:
+                lines.append(f'{name}{{endpoint="{endpoint}",status="error"}} {i["errors"]}')
+
+        name = metric('request_duration_seconds', 'histogram', 'Time until the response headers arrived.')
+        for endpoint, i in endpoints.items():
+            cumulative = 0
+            for bound, count in i['latency_buckets'].items():
+                cumulative += count
+                lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {i["latency_sum"]}')
+            lines.append(f'{name}_count{{endpoint="{endpoint}"}} {i["requests"]}')
+
+        name = metric('response_bytes_total', 'counter', 'Response bytes received, by endpoint.')
+        for endpoint, i in endpoints.items():
+            lines.append(f'{name}{{endpoint="{endpoint}"}} {i["bytes_received"]}')
+
+        name = metric('retries_total', 'counter', 'Requests retried, by endpoint.')
+        for endpoint, i in endpoints.items():
+            lines.append(f'{name}{{endpoint="{endpoint}"}} {i["retries"]}')
+
+        name = metric('hedges_total', 'counter', 'Duplicate requests sent to cut tail latency, by endpoint.')
+        for endpoint, i in endpoints.items():
+            lines.append(f'{name}{{endpoint="{endpoint}"}} {i["hedges"]}')
+
+        if snapshot['rate_limit_remaining'] is not None:
+            name = metric('rate_limit_remaining', 'gauge', 'Requests left in the current rate limit window.')
+            lines.append(f'{name} {snapshot["rate_limit_remaining"]}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> None:
+        self._write(path, self.to_prometheus())
+
+    def write_json(self, path: str) -> None:
+        self._write(path, json.dumps(self.snapshot(), indent=2))
+
+    def export(self, config: Dict) -> None:
+        """Writes the files named in the [metrics] section of config.toml, if there is one."""
+        metrics_config = config.get('metrics') or {}
+        if metrics_config.get('prometheus_file'):
+            self.write_prometheus(metrics_config['prometheus_file'])
+        if metrics_config.get('json_file'):
+            self.write_json(metrics_config['json_file'])
+
+    @staticmethod
+    def _write(path: str, content: str) -> None:
+        # write then rename, so scrapers never read a partially written file
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(content)
+        os.replace(temp_path, path)
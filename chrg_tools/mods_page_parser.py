@@ -1,8 +1,26 @@
-from typing import Dict, List
+import io
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+import mmh3
 from lxml import etree
+from hearings_lib.queued_logging import get_queued_logger
 from hearings_lib.summary_parsing_types import ParsedCommittee, ParsedMember, ParsedModsData
 
 
+# Bump when a change to the parsers changes their output, so documents parsed before are parsed again
+PARSER_VERSION = 1
+MODS_HASH_SEED = 42
+
+
+def mods_content_hash(content: bytes) -> str:
+    """Identifies a MODS document and the parser version it is parsed with.
+    Equal hashes mean parsing the document again would give the same ParsedModsData.
+    """
+    return f'{PARSER_VERSION}:{mmh3.hash(content, MODS_HASH_SEED, signed=False)}'
+
+
 class ModsPageParser:
     MEMBER_XPATH = '//ns:extension/ns:congMember'
     MEMBER_NAME_XPATH = './ns:name[@type="authority-lnf"]'
@@ -106,3 +124,169 @@ class ModsPageParser:
             return uri_element[0].text.strip()
         self.logger.warning('uri not found')
         return ''
+
+
+class IterparseModsParser:
+    """Builds the same ParsedModsData as ModsPageParser in one streaming pass over the document,
+    instead of building the whole tree and walking it with an XPath scan per field.
+    Only the elements the fields come from are reported by the parser, and they are cleared once read,
+    so large MODS documents are never held in full.
+    """
+    MEMBER_ATTRIBUTES = ModsPageParser.MEMBER_ATTRIBUTES
+    # govinfo's MODS documents all use this default namespace, others are parsed with a second pass
+    NAMESPACE = 'http://www.loc.gov/mods/v3'
+
+    def __init__(self, content, logger):
+        self.logger = logger
+        self.content = content.encode('UTF-8') if isinstance(content, str) else content
+
+    def create_parsed_mods_page(self) -> ParsedModsData:
+        return self._parse(self.NAMESPACE)
+
+    def _parse(self, namespace: str) -> ParsedModsData:
+        members: List[ParsedMember] = []
+        committees: List[ParsedCommittee] = []
+        witnesses: List[str] = []
+        uri = None
+        missed_member_count = 0
+        missed_committee_count = 0
+
+        extension_tag = f'{{{namespace}}}extension'
+        member_tag = f'{{{namespace}}}congMember'
+        committee_tag = f'{{{namespace}}}congCommittee'
+        witness_tag = f'{{{namespace}}}witness'
+        identifier_tag = f'{{{namespace}}}identifier'
+        name_tag = f'{{{namespace}}}name'
+        subcommittee_tag = f'{{{namespace}}}subCommittee'
+
+        context = etree.iterparse(
+            io.BytesIO(self.content),
+            events=('end',),
+            tag=[extension_tag, member_tag, committee_tag, witness_tag, identifier_tag],
+            collect_ids=False
+        )
+        for _, element in context:
+            tag = element.tag
+            parent = element.getparent()
+            if tag == identifier_tag:
+                if uri is None and element.get('type') == 'uri':
+                    uri = element.text.strip()
+                continue
+            if tag == extension_tag:
+                if parent is not None and parent.getparent() is None:
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del parent[0]
+                continue
+            if parent is None or parent.tag != extension_tag:
+                continue
+
+            if tag == member_tag:
+                name = self._child_name(element, name_tag, 'authority-lnf')
+                if name is None:
+                    name = ''
+                    missed_member_count += 1
+                attributes = element.attrib
+                stripped_attributes = {
+                    j: attributes.get(j).strip() if attributes.get(j) else None
+                    for j in self.MEMBER_ATTRIBUTES
+                }
+                members.append(
+                    ParsedMember(
+                        name=name,
+                        chamber=stripped_attributes['chamber'],
+                        party=stripped_attributes['party'],
+                        state=stripped_attributes['state'],
+                        congress=int(attributes.get('congress', 0))
+                    )
+                )
+            elif tag == committee_tag:
+                name = self._child_name(element, name_tag, 'authority-standard')
+                if name is None:
+                    name = ''
+                    missed_committee_count += 1
+                subcommittees = [
+                    j.text.strip() if j.text else None
+                    for i in element.iterchildren(subcommittee_tag)
+                    for j in i.iterchildren(name_tag)
+                    if j.get('type') == 'parsed'
+                ]
+                committees.append(
+                    ParsedCommittee(
+                        name=name,
+                        chamber=element.attrib.get('chamber', ''),
+                        congress=int(element.attrib.get('congress', 0)),
+                        subcommittees=subcommittees
+                    )
+                )
+            else:
+                witnesses.append(element.text.strip())
+
+            # the element and its earlier siblings have been read
+            element.clear()
+            while element.getprevious() is not None:
+                del parent[0]
+
+        root_namespace = context.root.nsmap[None]
+        if root_namespace != namespace:
+            return self._parse(root_namespace)
+
+        if missed_member_count:
+            self.logger.warning(f'Failed to parse {missed_member_count} members')
+        if missed_committee_count:
+            self.logger.warning(f'Failed to parse {missed_committee_count} committees')
+        if uri is None:
+            self.logger.warning('uri not found')
+            uri = ''
+        return ParsedModsData(members=members, committees=committees, witnesses=witnesses, uri=uri)
+
+    @staticmethod
+    def _child_name(element: etree._Element, name_tag: str, name_type: str):
+        for i in element.iterchildren(name_tag):
+            if i.get('type') == name_type:
+                return i.text.strip()
+        return None
+
+
+# Documents sent to a pool worker per task, so the IPC cost is paid per chunk rather than per document
+MODS_BATCH_CHUNK_SIZE = 16
+# Pool workers log to the same file as the APIClient that parses MODS documents inline
+MODS_LOGGER_NAME = 'hearings_lib.api_client'
+
+
+def mods_parsing_pool(processes: int) -> ProcessPoolExecutor:
+    """A process pool for parse_mods_batch. Spawned workers start clean instead of inheriting
+    the parent's threads and connections.
+    """
+    return ProcessPoolExecutor(
+        processes,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=get_queued_logger,
+        initargs=(MODS_LOGGER_NAME, None, 'a')
+    )
+
+
+def parse_mods_document(content: Optional[bytes]) -> Optional[ParsedModsData]:
+    """Pool worker entry point. Only the document bytes and the parsed NamedTuples cross the process boundary."""
+    if not content:
+        return None
+    return ModsPageParser(content, logging.getLogger(MODS_LOGGER_NAME)).create_parsed_mods_page()
+
+
+def parse_mods_batch(
+    documents: Sequence[Optional[bytes]],
+    executor: Optional[Executor] = None,
+    processes: Optional[int] = None,
+    chunk_size: int = MODS_BATCH_CHUNK_SIZE
+) -> List[Optional[ParsedModsData]]:
+    """Parses MODS documents over a process pool, chunk_size documents per task.
+    Results are in the order of documents, with None for empty documents.
+
+    :param executor: pool to parse with, e.g. from mods_parsing_pool. A pool of processes workers
+        is created for the call when none is given.
+    :return: the parsed documents
+    """
+    if executor is None:
+        with mods_parsing_pool(processes) as pool:
+            return list(pool.map(parse_mods_document, documents, chunksize=chunk_size))
+    return list(executor.map(parse_mods_document, documents, chunksize=chunk_size))
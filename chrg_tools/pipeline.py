@@ -0,0 +1,259 @@
+import time
+import queue
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from hearings_lib.api_client import APIClient
+from hearings_lib.db_handler import DB_Handler
+from hearings_lib.summary_parsing_types import ParsedSummary
+
+_DONE = object()
+
+
+class StageStats(NamedTuple):
+    name: str
+    processed: int
+    throughput: float  # items per second since the pipeline started
+    utilization: float  # fraction of the stage's worker time spent working rather than waiting
+    queue_depth: int  # items waiting in the stage's input queue
+
+
+class Stage:
+    """A pool of worker threads that take items from an input queue, apply func and put the results
+    on the output queue. Results that are None are dropped. Stages with a batch_size hand func lists
+    of up to batch_size items and forward every item of the list func returns.
+    """
+    POLL_INTERVAL = 0.1  # seconds
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        input_queue: queue.Queue,
+        output_queue: Optional[queue.Queue],
+        stop: threading.Event,
+        workers: int = 1,
+        batch_size: Optional[int] = None
+    ):
+        self.name = name
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.stop = stop
+        self.workers = workers
+        self.batch_size = batch_size
+        self.downstream_workers = 0
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.error: Optional[BaseException] = None
+        self._running = workers
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, name=f'{name}-{i}', daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self) -> None:
+        for i in self._threads:
+            i.start()
+
+    def join(self) -> None:
+        for i in self._threads:
+            i.join()
+
+    def _work(self) -> None:
+        batch: List = []
+        try:
+            while not self.stop.is_set():
+                try:
+                    item = self.input_queue.get(timeout=self.POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+                if self.batch_size is None:
+                    self._process([item])
+                    continue
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self._process(batch)
+                    batch = []
+            if batch and not self.stop.is_set():
+                self._process(batch)
+        except BaseException as e:
+            self.error = e
+            self.stop.set()
+        finally:
+            with self._lock:
+                self._running -= 1
+                last_worker = self._running == 0
+            # the last worker to finish tells every downstream worker that no more items are coming
+            if last_worker and self.output_queue is not None:
+                for _ in range(self.downstream_workers):
+                    put(self.output_queue, _DONE, self.stop)
+
+    def _process(self, items: List) -> None:
+        started = time.perf_counter()
+        if self.batch_size is None:
+            results = [self.func(items[0])]
+        else:
+            results = self.func(items) or []
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.processed += len(items)
+            self.busy_seconds += elapsed
+        if self.output_queue is not None:
+            for i in results:
+                if i is not None:
+                    put(self.output_queue, i, self.stop)
+
+
+def put(q: queue.Queue, item: Any, stop: threading.Event) -> None:
+    """Blocks until there is room in the queue, unless the pipeline is stopped in the meantime."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=Stage.POLL_INTERVAL)
+            return
+        except queue.Full:
+            continue
+
+
+class Pipeline:
+    """Runs listing, fetching, parsing and database writes as concurrent stages joined by bounded queues,
+    so memory use stays flat however many packages are crawled and the slowest stage sets the pace.
+
+    Stages: fetch (summary and MODS requests) -> parse (summary attributes and ModsPageParser)
+    -> persist (DB_Handler.sync_hearing_records in batches). With fetch_transcripts, the persisted
+    package ids continue through transcript fetch -> transcript persist (DB_Handler.sync_transcripts).
+    stats() reports each stage's throughput, utilization and input queue depth while the pipeline runs.
+    When the client has a mods_executor, the parse workers hand MODS documents to its process pool,
+    so parse_workers can be raised to keep every pool process busy.
+    """
+    DEFAULT_QUEUE_SIZE = 200
+    DEFAULT_BATCH_SIZE = 100
+    DEFAULT_REPORT_INTERVAL = 60.0  # seconds
+
+    def __init__(
+        self,
+        client: APIClient,
+        handler: DB_Handler,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        parse_workers: int = 1,
+        report_interval: float = DEFAULT_REPORT_INTERVAL
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.handler = handler
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.parse_workers = parse_workers
+        self.report_interval = report_interval
+        self.stages: List[Stage] = []
+        self._started: Optional[float] = None
+
+    def run(self, packages: Iterable[Dict], fetch_transcripts: bool = False) -> List[StageStats]:
+        """Feeds the packages (typically a streamed listing) through the pipeline and waits for it to drain.
+
+        :return: The final statistics of every stage
+        :rtype: List of StageStats
+        """
+        stop = threading.Event()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(5 if fetch_transcripts else 3)]
+        self.stages = [
+            Stage('fetch', self.client._fetch_package, queues[0], queues[1], stop, workers=self.client.max_workers),
+            Stage('parse', self.client._build_package_summary, queues[1], queues[2], stop, workers=self.parse_workers),
+            Stage(
+                'persist',
+                self._persist_summaries,
+                queues[2],
+                queues[3] if fetch_transcripts else None,
+                stop,
+                batch_size=self.batch_size
+            )
+        ]
+        if fetch_transcripts:
+            self.stages = self.stages + [
+                Stage(
+                    'fetch transcripts',
+                    self._fetch_transcript,
+                    queues[3],
+                    queues[4],
+                    stop,
+                    workers=self.client.max_workers
+                ),
+                Stage(
+                    'persist transcripts',
+                    self._persist_transcripts,
+                    queues[4],
+                    None,
+                    stop,
+                    batch_size=self.batch_size
+                )
+            ]
+        for upstream, downstream in zip(self.stages, self.stages[1:]):
+            upstream.downstream_workers = downstream.workers
+
+        self._started = time.perf_counter()
+        for i in self.stages:
+            i.start()
+
+        source_error = None
+        next_report = self._started + self.report_interval
+        try:
+            for i in packages:
+                if stop.is_set():
+                    break
+                put(queues[0], i, stop)
+                if time.perf_counter() >= next_report:
+                    self.log_stats()
+                    next_report += self.report_interval
+        except BaseException as e:
+            source_error = e
+            stop.set()
+        finally:
+            for _ in range(self.stages[0].workers):
+                put(queues[0], _DONE, stop)
+            for i in self.stages:
+                i.join()
+
+        self.log_stats()
+        errors = [source_error] + [i.error for i in self.stages]
+        for i in errors:
+            if i is not None:
+                raise i
+        return self.stats()
+
+    def stats(self) -> List[StageStats]:
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return [
+            StageStats(
+                name=i.name,
+                processed=i.processed,
+                throughput=i.processed / elapsed if elapsed else 0.0,
+                utilization=i.busy_seconds / (elapsed * i.workers) if elapsed else 0.0,
+                queue_depth=i.input_queue.qsize()
+            )
+            for i in self.stages
+        ]
+
+    def log_stats(self) -> None:
+        for i in self.stats():
+            self.logger.info(
+                '%s: %d processed, %.1f/s, %.0f%% busy, %d queued',
+                i.name,
+                i.processed,
+                i.throughput,
+                i.utilization * 100,
+                i.queue_depth
+            )
+
+    def _persist_summaries(self, summaries: List[ParsedSummary]) -> List[str]:
+        self.handler.sync_hearing_records(summaries)
+        return [i.package_id for i in summaries]
+
+    def _fetch_transcript(self, package_id: str) -> Tuple[str, Optional[str]]:
+        return package_id, self.client._get_transcript(package_id)
+
+    def _persist_transcripts(self, transcripts: List[Tuple[str, Optional[str]]]) -> None:
+        self.handler.sync_transcripts(dict(transcripts))
@@ -0,0 +1,80 @@
+import os
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, NamedTuple, Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Puts records on the queue unformatted, so messages are formatted on the listener thread
+    instead of the thread that logged them. Log arguments must not be mutated after the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _QueuedLogging(NamedTuple):
+    pid: int
+    handler: QueueHandler
+    listener: QueueListener
+
+
+_lock = threading.Lock()
+_configured: Dict[str, _QueuedLogging] = {}
+
+
+def stop_queued_logging() -> None:
+    """Stops this process's listeners once they have written every queued record.
+    Runs at exit; the next get_queued_logger call for a name sets its handlers up again.
+    """
+    with _lock:
+        for name, configured in list(_configured.items()):
+            if configured.pid != os.getpid():
+                continue
+            configured.listener.stop()
+            logging.getLogger(name).removeHandler(configured.handler)
+            for i in configured.listener.handlers:
+                i.close()
+            del _configured[name]
+
+
+atexit.register(stop_queued_logging)
+
+
+def get_queued_logger(
+    name: str,
+    filename: Optional[str] = None,
+    mode: str = 'w',
+    level: int = logging.INFO
+) -> logging.Logger:
+    """Returns the named logger, writing to filename (f'{name}.log' by default) through a queue.
+    The file is written by a QueueListener thread, so logging never blocks the caller on file I/O.
+
+    Handlers are set up once per process; later calls return the logger as it is.
+    A forked child sets up its own listener, since the parent's thread does not survive the fork.
+    """
+    logger = logging.getLogger(name)
+    with _lock:
+        configured = _configured.get(name)
+        if configured and configured.pid == os.getpid():
+            return logger
+        if configured:
+            logger.removeHandler(configured.handler)
+
+        file_handler = logging.FileHandler(filename or f'{name}.log', mode)
+        file_handler.setLevel(level)
+        file_handler.setFormatter(logging.Formatter(fmt=LOG_FORMAT))
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        handler = DeferredQueueHandler(log_queue)
+        listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+
+        logger.addHandler(handler)
+        logger.setLevel(level)
+        _configured[name] = _QueuedLogging(pid=os.getpid(), handler=handler, listener=listener)
+    return logger
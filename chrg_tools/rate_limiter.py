@@ -0,0 +1,126 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+import requests
+
+
+class RateLimitWaitCancelledException(Exception):
+    """acquire was called, or was waiting, while the limiter's waits were cancelled."""
+    pass
+
+
+class RateLimiter:
+    """Token bucket that paces every request an APIClient makes, including requests made from worker threads.
+
+    The bucket holds at most the hourly limit (minus some headroom) and refills continuously over the window.
+    Each response's X-RateLimit-Limit and X-RateLimit-Remaining headers correct the bucket, so the client
+    never believes it has more requests left than govinfo does. A 429 blocks every caller until the window resets.
+    Processes that share an API key each take a share of the limit, and of the remaining quota govinfo reports.
+    """
+    LIMIT_HEADER = 'X-RateLimit-Limit'
+    REMAINING_HEADER = 'X-RateLimit-Remaining'
+    RETRY_AFTER_HEADER = 'Retry-After'
+
+    DEFAULT_LIMIT = 1000  # requests per window, the default for api.data.gov keys
+    DEFAULT_WINDOW = 3600.0  # seconds
+    DEFAULT_HEADROOM = 0.02  # fraction of the limit that is never spent
+
+    def __init__(
+        self,
+        limit: int = DEFAULT_LIMIT,
+        window: float = DEFAULT_WINDOW,
+        headroom: float = DEFAULT_HEADROOM,
+        share: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Optional[Callable[[float], None]] = None
+    ):
+        self.window = window
+        self.headroom = headroom
+        self.share = share
+        self.remaining: Optional[int] = None
+        self.blocked_until: float = 0.0
+        self._clock = clock
+        # waits are made on _wakeup unless another sleep is given, so cancelled() can cut them short
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._cancelled = 0
+        self._set_limit(limit)
+        self.tokens: float = self.capacity
+        self._last_refill: float = self._clock()
+
+    def _set_limit(self, limit: int) -> None:
+        self.limit = limit
+        self.capacity = max(1.0, limit * self.share * (1 - self.headroom))
+        self.rate = self.capacity / self.window
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self) -> None:
+        """Blocks until a request may be sent, then spends one token.
+        Raises RateLimitWaitCancelledException instead while the waits are cancelled.
+        """
+        while True:
+            with self._lock:
+                if self._cancelled:
+                    raise RateLimitWaitCancelledException('Waits for the rate limiter were cancelled')
+                now = self._clock()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                if self._sleep is None:
+                    self._wakeup.wait(wait)
+                    continue
+            self._sleep(wait)
+
+    @contextmanager
+    def cancelled(self) -> Iterator[None]:
+        """Inside the block, callers waiting in acquire are woken and every acquire raises
+        RateLimitWaitCancelledException, e.g. so the workers of an aborted crawl can be shut down
+        without waiting out the quota window.
+        """
+        with self._lock:
+            self._cancelled += 1
+            self._wakeup.notify_all()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._cancelled -= 1
+
+    def update_from_response(self, response: requests.Response, *args, **kwargs) -> None:
+        """Response hook, reads the rate limit headers of every response the session receives."""
+        limit = self._int_header(response, self.LIMIT_HEADER)
+        remaining = self._int_header(response, self.REMAINING_HEADER)
+        with self._lock:
+            self._refill(self._clock())
+            if limit and limit != self.limit:
+                self._set_limit(limit)
+            if remaining is not None:
+                self.remaining = remaining
+                self.tokens = min(self.tokens, (remaining - self.limit * self.headroom) * self.share)
+
+        if response.status_code == requests.codes.too_many_requests:
+            self.block(self._int_header(response, self.RETRY_AFTER_HEADER))
+
+    def block(self, seconds: Optional[float] = None) -> None:
+        """Stops all requests until the quota window has reset (or for the number of seconds given)."""
+        with self._lock:
+            now = self._clock()
+            self.tokens = 0
+            self._last_refill = now
+            self.blocked_until = max(self.blocked_until, now + (seconds if seconds else self.window))
+
+    @staticmethod
+    def _int_header(response: requests.Response, header: str) -> Optional[int]:
+        try:
+            return int(response.headers[header])
+        except (KeyError, ValueError):
+            return None
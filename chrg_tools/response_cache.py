@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+import requests
+
+
+class CacheEntry(NamedTuple):
+    body: bytes
+    headers: Dict[str, str]
+    stored_at: float
+
+    def to_response(self, url: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = requests.codes.ok
+        response.headers.update(self.headers)
+        response.url = url
+        response._content = self.body
+        response._content_consumed = True
+        return response
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers that let the server answer 304 when the cached body is still current."""
+        validators = {}
+        if 'ETag' in self.headers:
+            validators['If-None-Match'] = self.headers['ETag']
+        if 'Last-Modified' in self.headers:
+            validators['If-Modified-Since'] = self.headers['Last-Modified']
+        return validators
+
+
+class ResponseCache:
+    """Compressed on-disk cache of GET response bodies, keyed by a hash of the URL and its query parameters.
+
+    The api_key parameter is left out of the key so one cache can be shared between keys. A version,
+    such as the lastModified a package was listed with, can be added to the key, so that a changed package
+    misses the entries stored for its earlier version even though its URLs stay the same.
+    Entries are evicted least recently used first once the cache grows past max_bytes.
+    Entries younger than max_age seconds (or all entries, when max_age is None) are served without
+    a request; older entries are revalidated with If-None-Match/If-Modified-Since.
+    """
+    DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+    DEFAULT_MAX_AGE = 24 * 60 * 60
+    IGNORED_PARAMS = {'api_key'}
+    STORED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+    FILE_EXTENSION = '.z'
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: Optional[float] = DEFAULT_MAX_AGE
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._entries: 'OrderedDict[str, int]' = self._load_index()
+        self.size = sum(self._entries.values())
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional['ResponseCache']:
+        """Builds the cache described by the [response_cache] section of config.toml, if there is one."""
+        cache_config = config.get('response_cache')
+        if not cache_config:
+            return None
+        return cls(**cache_config)
+
+    def _load_index(self) -> 'OrderedDict[str, int]':
+        # file modification times record last use, so sorting by them restores the LRU order
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for i in names:
+                if i.endswith(self.FILE_EXTENSION):
+                    stat = os.stat(os.path.join(root, i))
+                    files.append((stat.st_mtime, i[:-len(self.FILE_EXTENSION)], stat.st_size))
+        return OrderedDict((key, size) for _, key, size in sorted(files))
+
+    def make_key(self, url: str, params: Optional[Dict[str, str]] = None, version: Optional[str] = None) -> str:
+        kept_params = sorted((k, v) for k, v in (params or {}).items() if k not in self.IGNORED_PARAMS)
+        key = f'{url}?{kept_params}' if version is None else f'{url}?{kept_params}#{version}'
+        return hashlib.sha256(key.encode('UTF-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f'{key}{self.FILE_EXTENSION}')
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+        metadata, body = data.split(b'\n', 1)
+        metadata = json.loads(metadata)
+        self.touch(key)
+        return CacheEntry(body=body, headers=metadata['headers'], stored_at=metadata['stored_at'])
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return self.max_age is None or time.time() - entry.stored_at < self.max_age
+
+    def touch(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def put(self, key: str, response: requests.Response, body: Optional[bytes] = None) -> None:
+        """Stores the response. Streamed responses have already been read, so their body is passed separately."""
+        # the url is not stored, it carries the api key
+        metadata = {
+            'stored_at': time.time(),
+            'headers': {i: response.headers[i] for i in self.STORED_HEADERS if i in response.headers}
+        }
+        body = response.content if body is None else body
+        data = zlib.compress(json.dumps(metadata).encode('UTF-8') + b'\n' + body)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write then rename, so concurrent readers (in this or another process) never see a partial entry
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self.size += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            evicted = []
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                evicted_key, evicted_size = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                evicted.append(evicted_key)
+        for i in evicted:
+            try:
+                os.remove(self._path(i))
+            except OSError:
+                pass
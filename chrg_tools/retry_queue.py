@@ -0,0 +1,86 @@
+import json
+import datetime
+from typing import Dict, List, NamedTuple, Optional
+from sqlalchemy import select, delete, func
+from sqlalchemy.engine.base import Engine
+from sqlalchemy.orm import Session
+from hearings_lib.db_models import FailedFetch
+
+
+class RetryItem(NamedTuple):
+    url: str
+    kind: str
+    package_id: str
+    payload: Dict
+    error: str
+    attempts: int
+    last_attempt: datetime.datetime
+
+
+class RetryQueue:
+    """Durable record of fetches that failed during a crawl, kept in the failed_fetches table
+    so they can be re-attempted later without re-crawling everything.
+    """
+    SUMMARY = 'summary'
+    MODS = 'mods'
+    TRANSCRIPT = 'transcript'
+    PAGE = 'page'
+
+    MAX_ATTEMPTS = 8
+    BACKOFF = datetime.timedelta(minutes=5)  # doubled after every failed attempt
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def record(
+        self,
+        kind: str,
+        url: str,
+        error: Exception,
+        package_id: Optional[str] = None,
+        payload: Optional[Dict] = None
+    ) -> None:
+        with Session(self.engine) as session:
+            failed_fetch = session.get(FailedFetch, url)
+            if not failed_fetch:
+                failed_fetch = FailedFetch(url=url, attempts=0)
+                session.add(failed_fetch)
+            failed_fetch.kind = kind
+            failed_fetch.package_id = package_id
+            failed_fetch.payload = json.dumps(payload) if payload is not None else None
+            failed_fetch.error = type(error).__name__
+            failed_fetch.attempts += 1
+            failed_fetch.last_attempt = datetime.datetime.utcnow()
+            session.commit()
+
+    def remove(self, url: str) -> None:
+        with Session(self.engine) as session:
+            session.execute(delete(FailedFetch).where(FailedFetch.url == url))
+            session.commit()
+
+    def due(self, now: Optional[datetime.datetime] = None) -> List[RetryItem]:
+        """Items whose backoff has elapsed and that have not yet used up their attempts."""
+        now = now or datetime.datetime.utcnow()
+        with Session(self.engine) as session:
+            failed_fetches = session.execute(
+                select(FailedFetch).where(FailedFetch.attempts < self.MAX_ATTEMPTS)
+            ).scalars()
+            return [
+                self._to_item(i) for i in failed_fetches
+                if i.last_attempt + self.BACKOFF * 2 ** (i.attempts - 1) <= now
+            ]
+
+    def __len__(self) -> int:
+        with Session(self.engine) as session:
+            return session.execute(select(func.count()).select_from(FailedFetch)).scalar()
+
+    def _to_item(self, failed_fetch: FailedFetch) -> RetryItem:
+        return RetryItem(
+            url=failed_fetch.url,
+            kind=failed_fetch.kind,
+            package_id=failed_fetch.package_id,
+            payload=json.loads(failed_fetch.payload) if failed_fetch.payload else None,
+            error=failed_fetch.error,
+            attempts=failed_fetch.attempts,
+            last_attempt=failed_fetch.last_attempt
+        )
@@ -0,0 +1,142 @@
+import queue
+import logging
+import datetime
+import multiprocessing
+from typing import Dict, Iterable, List, Optional
+import requests
+import sqlalchemy
+from hearings_lib.api_client import APIClient
+from hearings_lib.crawler import Crawler, is_new_or_modified
+from hearings_lib.db_handler import DB_Handler
+from hearings_lib.queued_logging import get_queued_logger
+from hearings_lib.rate_limiter import RateLimiter
+from hearings_lib.response_cache import ResponseCache
+from hearings_lib.retry_queue import RetryQueue
+
+
+class ShardCrawlException(Exception):
+    pass
+
+
+def shard_congresses(congresses: Iterable[int], shards: int) -> List[List[int]]:
+    """Deals the congresses out round robin. Recent congresses hold far more hearings than early ones,
+    so dealing them out spreads the work more evenly than contiguous ranges would.
+    """
+    sharded: List[List[int]] = [[] for _ in range(shards)]
+    for i, congress in enumerate(sorted(congresses, reverse=True)):
+        sharded[i % shards].append(congress)
+    return [i for i in sharded if i]
+
+
+def crawl_shard(
+    api_key: str,
+    congresses: List[int],
+    existing_packages: Dict[str, datetime.datetime],
+    rate_limit_share: float,
+    config: Dict,
+    results,
+    mods_hashes: Optional[Dict[str, str]] = None,
+    database_url: Optional[str] = None
+) -> None:
+    """Worker process entry point. Crawls its congresses with its own session and share of the rate limit,
+    and puts the summaries of each listing page on results for the parent process to write.
+    None is put once the shard is finished, a ShardCrawlException if it failed.
+
+    :param database_url: database whose retry queue records the fetches that failed, through the worker's own engine
+    """
+    # appends, so workers do not truncate the log the parent and the other workers write to
+    get_queued_logger('hearings_lib.api_client', mode='a')
+    engine = sqlalchemy.create_engine(database_url, future=True) if database_url else None
+    try:
+        with requests.Session() as s:
+            client = APIClient(
+                api_key=api_key,
+                session=s,
+                rate_limiter=RateLimiter(share=rate_limit_share),
+                cache=ResponseCache.from_config(config),
+                retry_queue=RetryQueue(engine) if engine else None,
+                mods_hashes=mods_hashes
+            )
+            for congress in congresses:
+                for page in client.iter_package_pages({'congress': str(congress)}):
+                    packages = [i for i in page if is_new_or_modified(i, existing_packages)]
+                    if packages:
+                        results.put(client.get_package_summaries(packages, raise_on_rate_limit=True))
+    except Exception as e:
+        results.put(ShardCrawlException(f'Crawling congresses {congresses} failed: {type(e).__name__}: {e}'))
+        return
+    finally:
+        if engine:
+            engine.dispose()
+    results.put(None)
+
+
+class ShardedCrawler:
+    """Crawls congresses with a pool of worker processes, each given a shard of the congresses.
+
+    Workers only fetch and parse. Every summary is sent back to this process and written through
+    its single DB_Handler, so the handler's caches of existing members, witnesses and committees
+    stay consistent. Fetches that fail are recorded by each worker in the handler's database retry queue,
+    through an engine of its own. Sharded crawls are not checkpointed.
+    """
+    POLL_INTERVAL = 1.0  # seconds
+    RESULT_QUEUE_SIZE = 20  # pages of summaries waiting to be written, across all workers
+
+    def __init__(self, api_key: str, handler: DB_Handler, processes: int, config: Optional[Dict] = None):
+        self.logger = logging.getLogger(__name__)
+        self.api_key = api_key
+        self.handler = handler
+        self.processes = max(1, processes)
+        self.config = config or {}
+
+    def crawl_congresses(self, congresses: Iterable[int] = Crawler.ALL_CONGRESSES) -> None:
+        shards = shard_congresses(congresses, self.processes)
+        existing_packages = self.handler.get_package_last_modified()
+        mods_hashes = self.handler.get_package_mods_hashes()
+        # engines cannot be sent to spawned workers, so each opens its own from the URL
+        database_url = self.handler.engine.url.render_as_string(hide_password=False)
+        # spawned workers start clean instead of inheriting this process's database connections
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue(maxsize=self.RESULT_QUEUE_SIZE)
+        workers = [
+            context.Process(
+                target=crawl_shard,
+                args=(
+                    self.api_key,
+                    i,
+                    existing_packages,
+                    1 / len(shards),
+                    self.config,
+                    results,
+                    mods_hashes,
+                    database_url
+                ),
+                name=f'crawl-shard-{n}',
+                daemon=True
+            )
+            for n, i in enumerate(shards)
+        ]
+        for i in workers:
+            i.start()
+
+        try:
+            finished = 0
+            while finished < len(workers):
+                try:
+                    summaries = results.get(timeout=self.POLL_INTERVAL)
+                except queue.Empty:
+                    if not any(i.is_alive() for i in workers) and results.empty():
+                        raise ShardCrawlException('A crawl worker exited without finishing its shard')
+                    continue
+                if summaries is None:
+                    finished += 1
+                elif isinstance(summaries, ShardCrawlException):
+                    raise summaries
+                else:
+                    self.handler.sync_hearing_records(summaries)
+            self.logger.info('Crawled %d shards', len(shards))
+        finally:
+            for i in workers:
+                if i.is_alive():
+                    i.terminate()
+                i.join()
@@ -1,4 +1,4 @@
-from typing import NamedTuple, List
+from typing import NamedTuple, List, Optional
 import datetime
 
 
@@ -26,14 +26,17 @@ class ParsedModsData(NamedTuple):
 
 class ParsedSummary(NamedTuple):
     package_id: str
-    title: str
-    congress: int
-    session: int
-    chamber: str
-    url: str
-    sudoc: str
-    pages: int
-    date_issued: datetime.date
-    last_modified: datetime.datetime
-    dates: List[datetime.date]
-    metadata: ParsedModsData
+    # Packages without a summary link or MODS link only carry part of these fields
+    title: str = None
+    congress: int = None
+    session: int = None
+    chamber: str = None
+    url: str = None
+    sudoc: str = None
+    pages: int = None
+    date_issued: datetime.date = None
+    last_modified: datetime.datetime = None
+    dates: Optional[List[datetime.date]] = None
+    metadata: ParsedModsData = None
+    # see mods_content_hash, metadata is left out when the hash matches the stored one
+    mods_hash: str = None
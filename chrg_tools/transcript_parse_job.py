@@ -0,0 +1,153 @@
+import io
+import logging
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterator, List, NamedTuple, Optional
+from sqlalchemy import select, or_, true
+from sqlalchemy.engine.base import Engine
+from sqlalchemy.orm import Session
+from hearings_lib.db_handler import DB_Handler
+from hearings_lib.db_models import HearingTranscript
+from hearings_lib.queued_logging import get_queued_logger
+from hearings_lib.transcript_parser import ScanningParser
+
+LOGGER_NAME = 'hearings_lib.transcript_parse_job'
+
+
+class StoredTranscript(NamedTuple):
+    package_id: str
+    body: str
+    body_hash: str
+
+
+class ParsedTranscript(NamedTuple):
+    package_id: str
+    body_hash: str
+    entries: List[Dict]
+
+
+def iter_transcript_pages(
+    engine: Engine,
+    page_size: int,
+    parser_version: Optional[int] = None
+) -> Iterator[List[StoredTranscript]]:
+    """The stored transcripts, page_size at a time in package_id order.
+    Each page is its own short query, so no cursor stays open while the job writes entries.
+
+    :param parser_version: only list transcripts whose entries were not parsed from their current body by this version
+    """
+    stale = true()
+    if parser_version is not None:
+        stale = or_(
+            HearingTranscript.parser_version.is_distinct_from(parser_version),
+            HearingTranscript.parsed_hash.is_distinct_from(HearingTranscript.body_hash)
+        )
+    last_package_id = ''
+    while True:
+        with Session(engine) as session:
+            page = session.execute(
+                select(HearingTranscript.package_id, HearingTranscript.body, HearingTranscript.body_hash)
+                .where(HearingTranscript.package_id > last_package_id, stale)
+                .order_by(HearingTranscript.package_id)
+                .limit(page_size)
+            ).all()
+        if not page:
+            return
+        last_package_id = page[-1][0]
+        yield [StoredTranscript(*i) for i in page if i[1]]
+
+
+def parse_transcripts(transcripts: List[StoredTranscript], offsets: bool = False) -> List[ParsedTranscript]:
+    """Pool worker entry point: the entries of each transcript.
+
+    :param offsets: give entries as offsets into the body (Parser.iter_entry_offsets) instead of text
+    """
+    parser = ScanningParser()
+    return [
+        ParsedTranscript(
+            i.package_id,
+            i.body_hash,
+            list(parser.iter_entry_offsets(i.body) if offsets else parser.iter_entries(io.StringIO(i.body)))
+        )
+        for i in transcripts
+    ]
+
+
+class TranscriptParseJob:
+    """Re-parses stored transcripts into entries, by default only those whose body changed
+    or whose entries came from an older Parser.VERSION, so routine runs touch only the changed hearings.
+
+    Transcripts are read from the database a page at a time and parsed in chunks on a process pool
+    (transcript_parser.ScanningParser) while this process replaces their entries through DB_Handler in bulk.
+    With offsets set, entries are stored as offsets into the transcript body instead of copies of its text
+    (HearingEntry.text reads them); switching an existing database over takes a forced run.
+    """
+    DEFAULT_PAGE_SIZE = 200  # transcripts read per query
+    DEFAULT_BATCH_SIZE = 100  # transcripts whose entries are written per transaction
+    CHUNK_SIZE = 8  # transcripts sent to a worker per task
+    PENDING_CHUNKS_PER_PROCESS = 4
+
+    def __init__(
+        self,
+        handler: DB_Handler,
+        processes: int = 1,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        offsets: bool = False
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.handler = handler
+        self.processes = max(1, processes)
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.offsets = offsets
+
+    def run(self, force: bool = False) -> int:
+        """Parses the stale stored transcripts and replaces their entries.
+
+        :param force: parse every stored transcript
+        :return: the number of transcripts parsed
+        """
+        parser_version = None if force else ScanningParser.VERSION
+        transcripts = itertools.chain.from_iterable(
+            iter_transcript_pages(self.handler.engine, self.page_size, parser_version)
+        )
+        count = 0
+        batch: Dict[str, ParsedTranscript] = {}
+        pending: Deque[Future] = deque()
+
+        def collect(future: Future) -> None:
+            nonlocal batch, count
+            batch.update((i.package_id, i) for i in future.result())
+            if len(batch) >= self.batch_size:
+                count += self._write(batch)
+                batch = {}
+
+        with ProcessPoolExecutor(
+            self.processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=get_queued_logger,
+            initargs=(LOGGER_NAME, None, 'a')
+        ) as pool:
+            # chunks are submitted as earlier ones are written, so bodies and entries never pile up in memory
+            for chunk in iter(lambda: list(itertools.islice(transcripts, self.CHUNK_SIZE)), []):
+                pending.append(pool.submit(parse_transcripts, chunk, self.offsets))
+                if len(pending) >= self.processes * self.PENDING_CHUNKS_PER_PROCESS:
+                    collect(pending.popleft())
+            while pending:
+                collect(pending.popleft())
+            count += self._write(batch)
+        return count
+
+    def _write(self, batch: Dict[str, ParsedTranscript]) -> int:
+        if not batch:
+            return 0
+        self.handler.replace_parsed_entries(
+            {i: batch[i].entries for i in batch},
+            {i: batch[i].body_hash for i in batch},
+            ScanningParser.VERSION
+        )
+        self.logger.info('Parsed %d transcripts', len(batch))
+        return len(batch)
@@ -1,5 +1,7 @@
 import re
-from typing import Tuple, List, Dict, Set
+import string
+import itertools
+from typing import Tuple, List, Dict, Iterable, Iterator, Optional, Set, Union
 
 
 class TranscriptStartMatchException(Exception):
@@ -7,9 +9,13 @@ class TranscriptStartMatchException(Exception):
 
 
 class Parser:
+    # Stored entries record the version that parsed them; bump it whenever the entries parse produces change
+    VERSION = 1
     TRANSCRIPT_START_PATTERN = re.compile(
         r'The\s+.{1,5}ommittee(s?)\s+met,\s+pursuant\s+to\s+(notice|call),\s+at'
     )
+    # TRANSCRIPT_START_PATTERN kept from matching across lines, so a whole body can be searched at once
+    TRANSCRIPT_START_LINE_PATTERN = re.compile(TRANSCRIPT_START_PATTERN.pattern.replace(r'\s', r'[^\S\n]'))
     PREPARED_STATEMENT_PATTERN = re.compile(
         r'^\[The\s+prepared\s+statement\s+of\s+([A-Z,a-z]*\.?)\s+([A-Z,a-z,\-]+)'
     )
@@ -21,52 +27,169 @@ class Parser:
     )
 
     def parse(self, transcript: List[str]) -> Tuple[List[Dict], Set[str]]:
-        transcript_start: int = None
-        for i, line in enumerate(transcript):
-            start_match = self.TRANSCRIPT_START_PATTERN.search(line)
-            if start_match:
-                transcript_start = i
+        speakers: Set[str] = set()
+        return list(self.iter_entries(transcript, speakers)), speakers
+
+    def iter_entries(self, stream: Iterable[Union[str, bytes]], speakers: Optional[Set[str]] = None) -> Iterator[Dict]:
+        """Yields the same entries as parse, each as soon as the next contribution starts.
+        stream is any iterable of lines, e.g. an open file or response.iter_lines(); bytes lines are decoded as UTF-8.
+        Only the current contribution is held, apart from the lines before the transcript's opening line,
+        which are held until it is found (a transcript without one is parsed from its first line).
+
+        :param speakers: set that every speaker found is added to
+        """
+        lines = (i.decode('UTF-8') if isinstance(i, bytes) else i for i in stream)
+        held: List[str] = []
+        for line in lines:
+            held.append(line)
+            if self.TRANSCRIPT_START_PATTERN.search(line):
                 break
-        if not transcript_start:
-            transcript_start = 0
+        else:
+            # no opening line, the whole transcript is parsed
+            yield from self._iter_contributions(held, [], speakers)
+            return
+        yield from self._iter_contributions(itertools.chain(held[-1:], lines), held[:-1], speakers, len(held) - 1)
 
-        speakers: set = set()
-        output = []
+    def _iter_contributions(
+        self,
+        lines: Iterable[str],
+        preamble: List[str],
+        speakers: Optional[Set[str]],
+        first_index: int = 0
+    ) -> Iterator[Dict]:
+        """The entries of lines, whose first line is line first_index of the transcript.
+        Text before the first speaker belongs to the speakerless contribution, preamble lines included.
+        """
         contribution_start: int = None
+        contribution: List[str] = preamble
         speaker: str = None
         seq = 1
-        for i in range(transcript_start, len(transcript)):
-            transcript[i] = transcript[i].strip()
-            line: str = transcript[i]
+        for i, line in enumerate(lines, first_index):
+            line = line.strip()
 
-            end_line = self.TRANSCRIPT_END_PATTERN.search(line)
-            statement = self.PREPARED_STATEMENT_PATTERN.search(line)
-            contribution = self.STANDARD_SPEAKER_PATTERN.search(line)
+            end_line, line_speaker = self._scan_line(line)
 
             if end_line:
                 # must replace carriage return new lines first.
-                output.append({
+                yield {
                     'speaker': speaker,
-                    'body': self._make_entry(transcript[contribution_start: i]),
+                    'body': self._make_entry(contribution),
                     'seq': seq
-                })
-                break
+                }
+                return
 
-            if statement or contribution:
+            if line_speaker:
+                # a contribution starting on the transcript's first line is never emitted, as parse always did
                 if contribution_start:
-                    output.append({
+                    yield {
                         'speaker': speaker,
-                        'body': self._make_entry(transcript[contribution_start: i]),
+                        'body': self._make_entry(contribution),
                         'seq': seq
-                    })
-                speaker = self._configure_speaker(statement) if statement else self._configure_speaker(contribution)
-                speakers.add(speaker)
+                    }
+                speaker = line_speaker
+                if speakers is not None:
+                    speakers.add(speaker)
+                contribution_start = i
+                contribution = [line]
+                seq += 1
+            else:
+                contribution.append(line)
+
+    def iter_entry_offsets(self, body: str, speakers: Optional[Set[str]] = None) -> Iterator[Dict]:
+        """Yields the entries iter_entries yields for body's lines, each holding the 'start' and 'end' offsets
+        of its text in body instead of a copy of the text. entry_text(body, start, end) gives the text when needed.
+
+        :param speakers: set that every speaker found is added to
+        """
+        # lines before the opening line are never scanned, as in iter_entries
+        opening = self.TRANSCRIPT_START_LINE_PATTERN.search(body)
+        first_line = body.rfind('\n', 0, opening.start()) + 1 if opening else 0
+        contribution_start: int = None
+        contribution_offset = 0
+        previous_end = max(first_line - 1, 0)
+        speaker: str = None
+        seq = 1
+        # the lines body.split('\n') gives, found in place
+        i = body.count('\n', 0, first_line)
+        start = first_line
+        while start <= len(body):
+            end = body.find('\n', start)
+            if end == -1:
+                end = len(body)
+            end_line, line_speaker = self._scan_line(body[start:end].strip())
+
+            if end_line:
+                yield {'speaker': speaker, 'start': contribution_offset, 'end': previous_end, 'seq': seq}
+                return
+
+            if line_speaker:
+                if contribution_start:
+                    yield {'speaker': speaker, 'start': contribution_offset, 'end': previous_end, 'seq': seq}
+                speaker = line_speaker
+                if speakers is not None:
+                    speakers.add(speaker)
                 contribution_start = i
+                contribution_offset = start
                 seq += 1
-        return output, speakers
+            previous_end = end
+            start = end + 1
+            i += 1
+
+    @classmethod
+    def entry_text(cls, body: str, start: int, end: int) -> str:
+        """The text of an entry from iter_entry_offsets, the same body iter_entries gives it.
+        Lines before the transcript's opening line are joined unstripped, as iter_entries holds them.
+        """
+        first_line = start
+        if start == 0:
+            # only the first entry starts before the opening line
+            opening = cls.TRANSCRIPT_START_LINE_PATTERN.search(body)
+            first_line = body.rfind('\n', 0, opening.start()) + 1 if opening else 0
+        preamble = body[start:first_line - 1].split('\n') if first_line > start else []
+        lines = body[first_line:end].split('\n') if end >= first_line else []
+        return cls._make_entry(preamble + [i.strip() for i in lines])
+
+    def _scan_line(self, line: str) -> Tuple[bool, Optional[str]]:
+        """Whether the line ends the transcript, and the speaker whose contribution it starts, if any."""
+        if self.TRANSCRIPT_END_PATTERN.search(line):
+            return True, None
+        statement = self.PREPARED_STATEMENT_PATTERN.search(line)
+        contribution = self.STANDARD_SPEAKER_PATTERN.search(line)
+        if statement or contribution:
+            return False, self._configure_speaker(statement) if statement else self._configure_speaker(contribution)
+        return False, None
 
     def _configure_speaker(self, regex_match) -> str:
         return f"{regex_match.group(1).replace('.', '')} {regex_match.group(2).replace('.', '').upper()}"
 
-    def _make_entry(self, lines: List[str]) -> str:
+    @staticmethod
+    def _make_entry(lines: List[str]) -> str:
         return " ".join(lines).replace('\r\n', '').replace('\n', '')
+
+
+class ScanningParser(Parser):
+    """Parser that classifies each line with one match instead of three searches.
+
+    The speaker and prepared statement patterns are anchored to the start of the line, so they are
+    combined into one alternation, only tried on lines starting with a capital letter or '['.
+    The end pattern is a plain string, so it is found with a substring check.
+    Output is identical to Parser's.
+    """
+    TRANSCRIPT_END_TEXT = '[Whereupon,'
+    SPEAKER_START_CHARACTERS = frozenset('[' + string.ascii_uppercase)
+    # Each alternative is wrapped in a group, so a match's lastindex is the wrapping group
+    # and the title and name groups of the alternative follow it
+    SPEAKER_SCANNER = re.compile('|'.join(
+        f'({i.pattern[1:]})' for i in [Parser.PREPARED_STATEMENT_PATTERN, Parser.STANDARD_SPEAKER_PATTERN]
+    ))
+
+    def _scan_line(self, line: str) -> Tuple[bool, Optional[str]]:
+        if self.TRANSCRIPT_END_TEXT in line:
+            return True, None
+        if not line or line[0] not in self.SPEAKER_START_CHARACTERS:
+            return False, None
+        match = self.SPEAKER_SCANNER.match(line)
+        if match is None:
+            return False, None
+        title = match.lastindex + 1
+        return False, f"{match.group(title).replace('.', '')} {match.group(title + 1).replace('.', '').upper()}"
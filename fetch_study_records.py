@@ -13,6 +13,7 @@ from hearings_lib.db_models import (
 )
 from hearings_lib.db_handler import DB_Handler
 from hearings_lib.api_client import APIClient
+from hearings_lib.response_cache import ResponseCache
 
 
 def main():
@@ -61,8 +62,9 @@ def main():
         study_files = [i for i in csv.DictReader(f)]
 
     study_ids = [i['hearing_id'] for i in study_files]
+    cache = ResponseCache.from_config(config)
     with requests.Session() as s:
-        client = APIClient(api_key=os.getenv('GPO_API_KEY'), session=s)
+        client = APIClient(api_key=os.getenv('GPO_API_KEY'), session=s, cache=cache)
         transcripts = client.get_transcripts_by_package_id(study_ids)
     handler.sync_transcripts(transcripts)
 
@@ -1,4 +1,5 @@
 import os
+import sys
 import sqlalchemy
 import requests
 from dateutil.parser import parse as date_parse
@@ -12,7 +13,12 @@ from hearings_lib.db_models import (
     Hearing
 )
 from hearings_lib.db_handler import DB_Handler
-from hearings_lib.api_client import APIClient
+from hearings_lib.api_client import APIClient, ListingUnavailableException
+from hearings_lib.response_cache import ResponseCache
+from hearings_lib.retry_queue import RetryQueue
+
+TRANSCRIPT_WORKERS = 4
+TRANSCRIPT_BATCH_SIZE = 100
 
 
 def main():
@@ -35,30 +41,45 @@ def main():
     with Session(handler.engine) as db:
         existing_packages = {i[0]: i[1] for i in db.execute(select(Hearing.package_id, Hearing.last_modified))}
 
+    cache = ResponseCache.from_config(config)
+    retry_queue = RetryQueue(engine)
     with requests.Session() as s:
-        client = APIClient(api_key=os.getenv('GPO_API_KEY'), session=s)
-        packages = []
-        for i in range(117, 118):
-            new_or_modified_packages = [
-                i for i in client.get_package_ids_by_congress(i)
-                if i['packageId'] not in existing_packages
-                or date_parse(i['lastModified'])
-                > existing_packages[i['packageId']].replace(tzinfo=dateutil.tz.tzlocal())
-            ]
-
-            packages = packages + new_or_modified_packages
-        package_summaries = client.get_package_summaries(packages=packages)
+        client = APIClient(api_key=os.getenv('GPO_API_KEY'), session=s, cache=cache, retry_queue=retry_queue)
+        # The listing is streamed, so summaries are fetched while later pages are still being requested
+        packages = (
+            j for i in range(117, 118) for j in client.iter_package_ids_by_congress(i)
+            if j['packageId'] not in existing_packages
+            or date_parse(j['lastModified'])
+            > existing_packages[j['packageId']].replace(tzinfo=dateutil.tz.tzlocal())
+        )
+        try:
+            package_summaries = client.get_package_summaries(packages=packages)
+        except ListingUnavailableException as e:
+            # nothing has been stored yet, so running the script again starts over
+            sys.exit(f'Could not list the packages of the 117th congress, try again later: {e}')
 
     handler.sync_hearing_records(package_summaries)
 
     with Session(handler.engine) as db:
-        packages_to_fetch = [i[0] for i in db.execute(sqlalchemy.select(Hearing).filter_by(congress=117))]
+        pages = {i[0]: i[1] for i in db.execute(select(Hearing.package_id, Hearing.pages).filter_by(congress=117))}
 
     with requests.Session() as s:
-        client = APIClient(api_key=os.getenv('GPO_API_KEY'), session=s)
-        transcripts = client.get_transcripts_by_package_id([i.package_id for i in packages_to_fetch])
-
-    handler.sync_transcripts(transcripts)
+        client = APIClient(
+            api_key=os.getenv('GPO_API_KEY'),
+            session=s,
+            max_workers=TRANSCRIPT_WORKERS,
+            cache=cache,
+            retry_queue=retry_queue
+        )
+        # Transcripts are written as they arrive, so only one batch is ever held in memory
+        batch = {}
+        for package_id, transcript in client.iter_transcripts(pages, pages=pages):
+            batch[package_id] = transcript
+            if len(batch) == TRANSCRIPT_BATCH_SIZE:
+                handler.sync_transcripts(batch)
+                batch = {}
+        handler.sync_transcripts(batch)
+        client.metrics.export(config)
 
 
 if __name__ == '__main__':
@@ -5,6 +5,9 @@ from hearings_lib.api_client import APIClient
 
 
 def get_package_ids_by_congress(congress: int, config_directory: str = ''):
+    """Summaries of every package of the congress. Raises ListingUnavailableException when the congress
+    could not be listed; call it again later.
+    """
     load_project_env(config_directory)
     # Python automatically concatenates strings within brackets that aren't comma-separated.
     # This string definition is broken up due to line-length
@@ -0,0 +1,240 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse, parse_qs
+
+FIXTURE_DIRECTORY = os.path.abspath(os.path.dirname(__file__))
+SUMMARY_FIXTURE_PATH = os.path.join(FIXTURE_DIRECTORY, 'sample_api_responses', 'example_summary_response.json')
+MODS_FIXTURE_PATHS = [
+    os.path.join(FIXTURE_DIRECTORY, 'sample_mods', 'example_mods.xml'),
+    os.path.join(FIXTURE_DIRECTORY, 'sample_mods', 'alt_mods.xml')
+]
+
+
+class FakeGovinfoServer:
+    """Local stand-in for api.govinfo.gov, serving the CHRG collection listing, package summaries,
+    MODS and HTM transcripts for a synthetic collection of package_count packages per congress.
+
+    Summaries and MODS are the fixtures in tests/sample_api_responses and tests/sample_mods with the
+    package id and links rewritten; transcripts are generated with the summary's page count.
+    latency (plus up to jitter) is added to every response, slow_rate of the responses to a URL's first request
+    take slow_latency more to model a long tail, and error_rate and rate_limit_rate are the fractions of requests
+    answered with a 503 or a 429. Use it as a context manager, or start() and stop():
+
+        with FakeGovinfoServer(package_count=500, latency=0.05) as server:
+            client = APIClient(api_key, session, base_url=server.url)
+    """
+    LISTING_PATH_PATTERN = re.compile(r'^/collections/CHRG/(?P<last_modified_start>[^/]+)$')
+    PACKAGE_PATH_PATTERN = re.compile(r'^/packages/(?P<package_id>[^/]+)/(?P<kind>summary|mods|htm)$')
+    PACKAGE_ID_PATTERN = re.compile(r'^CHRG-(?P<congress>\d+)hhrg(?P<number>\d+)$')
+    LAST_MODIFIED = '2021-02-22T18:00:44Z'
+    TRANSCRIPT_LINE = '    Mr. SMITH. Thank you, Mr. Chairman. I yield back the balance of my time.\n'
+    TRANSCRIPT_LINES_PER_PAGE = 40
+
+    def __init__(
+        self,
+        package_count: int = 100,
+        congresses: Tuple[int, ...] = (113, 114),
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int = 1,
+        rate_limit: int = 10 ** 9,
+        seed: int = 0
+    ):
+        self.package_count = package_count
+        self.congresses = congresses
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.rate_limit = rate_limit
+        self.requests: Counter = Counter()  # by endpoint kind and status code, e.g. ('summary', 200)
+        # (path, X-Request-Number) of the slow responses, the header numbers the requests made for each path
+        self.slow_requests: Set[Tuple[str, int]] = set()
+        self._path_requests: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        with open(SUMMARY_FIXTURE_PATH, 'r') as f:
+            self._summary_fixture = json.load(f)
+        self._mods_fixtures: List[bytes] = []
+        for i in MODS_FIXTURE_PATHS:
+            with open(i, 'rb') as f:
+                self._mods_fixtures.append(f.read())
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FakeGovinfoServer':
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # headers and body are written separately, which Nagle's algorithm would delay by ~40ms
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                try:
+                    fake._handle(self)
+                except (BrokenPipeError, ConnectionResetError):
+                    # the client gave up on the response, e.g. the slower of two hedged requests
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-govinfo', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> 'FakeGovinfoServer':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def reset(self) -> None:
+        """Forgets the requests served so far, so the next request for every URL is a first request again."""
+        with self._lock:
+            self.requests.clear()
+            self.slow_requests.clear()
+            self._path_requests.clear()
+
+    def package_ids(self, congress: int) -> List[str]:
+        return [f'CHRG-{congress}hhrg{i:05d}' for i in range(self.package_count)]
+
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        parsed = urlparse(request.path)
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        with self._lock:
+            self._path_requests[parsed.path] += 1
+            number = self._path_requests[parsed.path]
+            draw = self._random.random()
+            delay = self.latency + self._random.random() * self.jitter
+            # repeated requests are never slow, so a hedged duplicate of a slow request answers at the usual latency
+            if self._random.random() < self.slow_rate and number == 1:
+                delay += self.slow_latency
+                self.slow_requests.add((parsed.path, number))
+        if delay:
+            time.sleep(delay)
+
+        kind = 'unknown'
+        status, headers, body = 404, {}, b''
+        listing = self.LISTING_PATH_PATTERN.match(parsed.path)
+        package = self.PACKAGE_PATH_PATTERN.match(parsed.path)
+        if listing:
+            kind = 'listing'
+        elif package:
+            kind = package.group('kind')
+
+        if kind != 'unknown' and draw < self.rate_limit_rate:
+            status, headers = 429, {'Retry-After': str(self.retry_after)}
+        elif kind != 'unknown' and draw < self.rate_limit_rate + self.error_rate:
+            status = 503
+        elif listing:
+            status, headers, body = self._listing(params)
+        elif package:
+            status, headers, body = getattr(self, f'_{kind}')(package.group('package_id'))
+
+        with self._lock:
+            self.requests[(kind, status)] += 1
+            remaining = max(0, self.rate_limit - sum(self.requests.values()))
+        request.send_response(status)
+        for k, v in {
+            **headers,
+            'Content-Length': str(len(body)),
+            'X-Request-Number': str(number),
+            'X-RateLimit-Limit': str(self.rate_limit),
+            'X-RateLimit-Remaining': str(remaining)
+        }.items():
+            request.send_header(k, v)
+        request.end_headers()
+        request.wfile.write(body)
+
+    def _json(self, data: Dict) -> Tuple[int, Dict[str, str], bytes]:
+        return 200, {'Content-Type': 'application/json'}, json.dumps(data).encode('UTF-8')
+
+    def _listing(self, params: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        offset = int(params.get('offset', 0))
+        page_size = int(params.get('pageSize', 100))
+        congresses = [int(params['congress'])] if 'congress' in params else self.congresses
+        package_ids = [j for i in congresses if i in self.congresses for j in self.package_ids(i)]
+        return self._json({
+            'count': len(package_ids),
+            'packages': [
+                {
+                    'packageId': i,
+                    'lastModified': self.LAST_MODIFIED,
+                    'packageLink': f'{self.url}/packages/{i}/summary',
+                    'docClass': 'HHRG',
+                    'title': f'Hearing {i}',
+                    'congress': self.PACKAGE_ID_PATTERN.match(i).group('congress')
+                }
+                for i in package_ids[offset:offset + page_size]
+            ]
+        })
+
+    def _known(self, package_id: str) -> Optional[re.Match]:
+        match = self.PACKAGE_ID_PATTERN.match(package_id)
+        if (
+            match
+            and int(match.group('congress')) in self.congresses
+            and int(match.group('number')) < self.package_count
+        ):
+            return match
+        return None
+
+    def _summary(self, package_id: str) -> Tuple[int, Dict[str, str], bytes]:
+        match = self._known(package_id)
+        if not match:
+            return 404, {}, b''
+        return self._json({
+            **self._summary_fixture,
+            'packageId': package_id,
+            'title': f'Hearing {package_id}',
+            'congress': match.group('congress'),
+            'pages': str(self._pages(package_id)),
+            'download': {'modsLink': f'{self.url}/packages/{package_id}/mods'},
+            'lastModified': self.LAST_MODIFIED
+        })
+
+    def _mods(self, package_id: str) -> Tuple[int, Dict[str, str], bytes]:
+        match = self._known(package_id)
+        if not match:
+            return 404, {}, b''
+        mods = self._mods_fixtures[int(match.group('number')) % len(self._mods_fixtures)]
+        return 200, {'Content-Type': 'application/xml'}, mods
+
+    def _htm(self, package_id: str) -> Tuple[int, Dict[str, str], bytes]:
+        if not self._known(package_id):
+            return 404, {}, b''
+        lines = self.TRANSCRIPT_LINE * (self._pages(package_id) * self.TRANSCRIPT_LINES_PER_PAGE)
+        body = f'<html>\n<head><title>{package_id}</title></head>\n<body><pre>\n{lines}</pre></body>\n</html>\n'
+        return 200, {'Content-Type': 'text/html; charset=utf-8'}, body.encode('UTF-8')
+
+    @staticmethod
+    def _pages(package_id: str) -> int:
+        return 10 + int(package_id[-3:]) % 90
@@ -0,0 +1,93 @@
+import os
+import zipfile
+import datetime
+import pytest
+import sqlalchemy
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from hearings_lib.bulk_ingest import BulkIngester, BulkModsParser, iter_bulk_packages, close_archives
+from hearings_lib.db_handler import DB_Handler
+from hearings_lib.db_models import Base, Hearing, HearingEntry, HearingTranscript, MemberAttendance
+from hearings_lib.mods_page_parser import ModsPageParser
+from hearings_lib.transcript_parse_job import TranscriptParseJob
+
+SAMPLE_MODS_DIRECTORY = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'sample_mods')
+TRANSCRIPT = '''<html>
+<body><pre>
+    The Committee met, pursuant to notice, at 10 a.m.
+    Chairman Royce. The hearing will come to order.
+    Today we look at the agreement.
+    Mr. Engel. Thank you, Mr. Chairman.
+    [Whereupon, at 12:30 p.m., the committee was adjourned.]
+</pre></body>
+</html>
+'''
+
+
+class TestBulkIngest:
+    PACKAGES = {
+        'CHRG-113hhrg86466': 'example_mods.xml',
+        'CHRG-113shrg87945': 'alt_mods.xml'
+    }
+
+    @pytest.fixture
+    def handler(self, tmp_path):
+        e = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "bulk.db"}', future=True)
+        Base.metadata.create_all(e)
+        return DB_Handler(e)
+
+    @pytest.fixture
+    def mirror(self, tmp_path):
+        """A directory holding one archive per package, the way govinfo's package ZIPs are laid out."""
+        directory = tmp_path / 'mirror'
+        directory.mkdir()
+        for package_id, mods_file in self.PACKAGES.items():
+            with zipfile.ZipFile(directory / f'{package_id}.zip', 'w', zipfile.ZIP_DEFLATED) as z:
+                z.write(os.path.join(SAMPLE_MODS_DIRECTORY, mods_file), f'{package_id}/mods.xml')
+                z.writestr(f'{package_id}/html/{package_id}.htm', TRANSCRIPT)
+                z.writestr(f'{package_id}/pdf/{package_id}.pdf', b'%PDF-1.4')
+        return str(directory)
+
+    def test_lists_packages_from_central_directory(self, mirror):
+        packages = list(iter_bulk_packages([mirror]))
+        close_archives()
+        assert [i.package_id for i in packages] == list(self.PACKAGES)
+        assert all(i.transcript_name.endswith(f'{i.package_id}.htm') for i in packages)
+
+    def test_summary_fields_from_mods(self):
+        with open(os.path.join(SAMPLE_MODS_DIRECTORY, 'example_mods.xml'), 'rb') as f:
+            content = f.read()
+        summary = BulkModsParser(content, None).create_summary('CHRG-113hhrg86466')
+        assert summary.title == 'IMPLEMENTATION OF THE IRAN NUCLEAR DEAL'
+        assert (summary.congress, summary.session, summary.chamber) == (113, 2, 'HOUSE')
+        assert summary.sudoc == 'Y 4.F 76/1:113-115'
+        assert summary.pages == 94
+        assert summary.date_issued.date() == datetime.date(2014, 1, 28)
+        assert summary.last_modified.date() == datetime.date(2020, 1, 3)
+        assert summary.dates == [datetime.date(2014, 1, 28)]
+        assert summary.metadata == ModsPageParser(content, None).create_parsed_mods_page()
+
+    def test_ingest_mirror(self, mirror, handler):
+        assert BulkIngester(handler, processes=2, batch_size=1).ingest([mirror]) == 2
+        with Session(handler.engine) as session:
+            hearings = session.execute(select(Hearing)).scalars().all()
+            assert sorted(i.package_id for i in hearings) == sorted(self.PACKAGES)
+            assert all(i.mods_hash and i.uri for i in hearings)
+            assert session.execute(select(MemberAttendance)).scalars().all()
+            transcripts = session.execute(select(HearingTranscript)).scalars().all()
+            assert [i.body for i in transcripts] == [TRANSCRIPT, TRANSCRIPT]
+            entries = session.execute(
+                select(HearingEntry).filter_by(package_id='CHRG-113hhrg86466').order_by(HearingEntry.sequence)
+            ).scalars().all()
+            assert [i.parsed_name for i in entries] == ['Chairman ROYCE', 'Mr ENGEL']
+        # entries record the transcript they were parsed from, so the parse job has nothing left to do
+        assert TranscriptParseJob(handler).run() == 0
+
+    def test_unchanged_transcripts_keep_entries(self, mirror, handler):
+        BulkIngester(handler).ingest([mirror])
+        with Session(handler.engine) as session:
+            entry_ids = session.execute(select(HearingEntry.id)).scalars().all()
+        BulkIngester(DB_Handler(handler.engine)).ingest([mirror], force=True)
+        with Session(handler.engine) as session:
+            assert session.execute(select(HearingEntry.id)).scalars().all() == entry_ids
+        assert len(entry_ids) == 4
@@ -0,0 +1,130 @@
+import re
+import datetime
+import json
+import pytest
+import requests
+import sqlalchemy
+import responses
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from hearings_lib.db_models import Base, Hearing
+from hearings_lib.db_handler import DB_Handler
+from hearings_lib.api_client import APIClient, ListingUnavailableException
+from hearings_lib.crawler import Crawler
+
+
+class TestCrawler:
+    TEST_API_KEY = "1234abc"
+    PACKAGE_COUNT = 250
+
+    @pytest.fixture
+    def handler(self, tmp_path):
+        e = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "crawl.db"}', future=True)
+        Base.metadata.create_all(e)
+        return DB_Handler(e)
+
+    @pytest.fixture
+    def client(self):
+        client = APIClient(self.TEST_API_KEY, requests.Session())
+        client.PAGE_RETRIES = 0
+        return client
+
+    @pytest.fixture
+    def failing_offsets(self):
+        return set()
+
+    @pytest.fixture
+    def unavailable_offsets(self):
+        return set()
+
+    @pytest.fixture
+    def mocked_api(self, client, failing_offsets, unavailable_offsets):
+        def listing_callback(request):
+            offset = int(request.params['offset'])
+            congress = request.params['congress']
+            if (congress, offset) in failing_offsets:
+                raise KeyboardInterrupt()
+            if (congress, offset) in unavailable_offsets:
+                return 503, {}, ''
+            packages = [
+                {
+                    'packageId': f'CHRG-{congress}-{i}',
+                    'title': f'Hearing {i}',
+                    'lastModified': '2021-02-22T18:00:44Z',
+                    'packageLink': None,
+                    'congress': congress
+                }
+                for i in range(offset, min(offset + 100, self.PACKAGE_COUNT))
+            ]
+            return 200, {}, json.dumps({'count': self.PACKAGE_COUNT, 'packages': packages})
+
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            rsps.add_callback(
+                responses.GET,
+                re.compile(f'{re.escape(client.CHRG_ENDPOINT)}.*'),
+                callback=listing_callback,
+                content_type='application/json'
+            )
+            yield rsps
+
+    def hearing_count(self, handler):
+        with Session(handler.engine) as session:
+            return len(session.execute(select(Hearing.package_id)).all())
+
+    def test_crawl_syncs_every_page_and_clears_checkpoints(self, mocked_api, client, handler):
+        Crawler(client, handler).crawl_congresses([113, 114])
+        assert self.hearing_count(handler) == 2 * self.PACKAGE_COUNT
+        assert handler.get_crawl_checkpoints() == {}
+
+    def test_interrupted_crawl_resumes_from_checkpoint(self, mocked_api, client, handler, failing_offsets):
+        failing_offsets.add(('114', 200))
+        with pytest.raises(KeyboardInterrupt):
+            Crawler(client, handler).crawl_congresses([113, 114])
+        checkpoints = handler.get_crawl_checkpoints()
+        assert checkpoints[113].completed
+        assert checkpoints[114].next_offset == 200
+        assert self.hearing_count(handler) == self.PACKAGE_COUNT + 200
+
+        failing_offsets.clear()
+        mocked_api.calls.reset()
+        crawl_started = Crawler(client, handler).crawl_congresses([113, 114])
+        assert crawl_started == checkpoints[113].crawl_started
+        assert [i.request.params['offset'] for i in mocked_api.calls] == ['200']
+        assert self.hearing_count(handler) == 2 * self.PACKAGE_COUNT
+        assert handler.get_crawl_checkpoints() == {}
+
+    def test_unavailable_listing_stops_crawl_unfinished(self, mocked_api, client, handler, unavailable_offsets):
+        unavailable_offsets.add(('114', 0))
+        with pytest.raises(ListingUnavailableException):
+            Crawler(client, handler).crawl_congresses([113, 114, 115])
+        checkpoints = handler.get_crawl_checkpoints()
+        assert checkpoints[113].completed
+        assert 114 not in checkpoints and 115 not in checkpoints
+        assert self.hearing_count(handler) == self.PACKAGE_COUNT
+
+        unavailable_offsets.clear()
+        Crawler(client, handler).crawl_congresses([113, 114, 115])
+        assert self.hearing_count(handler) == 3 * self.PACKAGE_COUNT
+        assert handler.get_crawl_checkpoints() == {}
+
+    @pytest.mark.parametrize('unavailable_offset', [0, 100])
+    def test_unavailable_modified_listing_raises(self, client, handler, unavailable_offset):
+        def listing_callback(request):
+            offset = int(request.params['offset'])
+            if offset == unavailable_offset:
+                return 503, {}, ''
+            packages = [
+                {'packageId': f'CHRG-{i}', 'lastModified': '2021-02-22T18:00:44Z', 'packageLink': None}
+                for i in range(offset, min(offset + 100, self.PACKAGE_COUNT))
+            ]
+            return 200, {}, json.dumps({'count': self.PACKAGE_COUNT, 'packages': packages})
+
+        with responses.RequestsMock() as rsps:
+            rsps.add_callback(
+                responses.GET,
+                re.compile(f'{re.escape(client.COLLECTION_LIST_ENDPOINT)}/CHRG/2021-05-01T00:00:00Z.*'),
+                callback=listing_callback,
+                content_type='application/json'
+            )
+            with pytest.raises(ListingUnavailableException):
+                Crawler(client, handler).crawl_modified_since(datetime.datetime(2021, 5, 1))
@@ -0,0 +1,54 @@
+import pytest
+import requests
+import sqlalchemy
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from hearings_lib.db_models import Base, Hearing, HearingTranscript
+from hearings_lib.db_handler import DB_Handler
+from hearings_lib.api_client import APIClient
+from hearings_lib.crawler import Crawler
+from tests.fake_govinfo import FakeGovinfoServer
+
+
+class TestFakeGovinfoCrawl:
+    TEST_API_KEY = "1234abc"
+
+    @pytest.fixture
+    def handler(self, tmp_path):
+        e = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "crawl.db"}', future=True)
+        Base.metadata.create_all(e)
+        return DB_Handler(e)
+
+    def test_crawl_end_to_end(self, handler):
+        with FakeGovinfoServer(package_count=120, congresses=(114,)) as server:
+            with requests.Session() as s:
+                client = APIClient(self.TEST_API_KEY, s, max_workers=4, base_url=server.url)
+                Crawler(client, handler).crawl_congresses([114])
+                handler.sync_transcripts(client.get_transcripts_by_package_id(server.package_ids(114)[:5]))
+
+        with Session(handler.engine) as session:
+            hearings = session.execute(select(Hearing)).scalars().all()
+            assert len(hearings) == 120
+            assert all(i.congress == 114 for i in hearings)
+            assert len(session.execute(select(HearingTranscript.package_id)).all()) == 5
+        assert server.requests[('listing', 200)] == 2
+        assert server.requests[('summary', 200)] == server.requests[('mods', 200)] == 120
+
+    def test_injected_errors_are_retried(self):
+        with FakeGovinfoServer(package_count=10, error_rate=0.3, seed=1) as server:
+            with requests.Session() as s:
+                client = APIClient(self.TEST_API_KEY, s, base_url=server.url)
+                client.session.get_adapter(server.url).max_retries.backoff_factor = 0
+                packages = list(client.iter_package_ids_by_congress(113))
+                summaries = client.get_package_summaries(packages)
+        assert len(summaries) == 10
+        assert server.requests[('summary', 503)] + server.requests[('mods', 503)] > 0
+        assert client.metrics.snapshot()['endpoints']['packages/summary']['retries'] > 0
+
+    def test_injected_rate_limits_are_waited_out(self):
+        with FakeGovinfoServer(package_count=3, rate_limit_rate=0.3, seed=3) as server:
+            with requests.Session() as s:
+                client = APIClient(self.TEST_API_KEY, s, base_url=server.url)
+                transcripts = client.get_transcripts_by_package_id(server.package_ids(113))
+        assert all(transcripts.values())
+        assert sum(v for k, v in server.requests.items() if k[1] == 429) > 0
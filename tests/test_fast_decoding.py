@@ -0,0 +1,55 @@
+import os
+import json
+import pytest
+import requests
+import dateutil.tz
+from dateutil.parser import parse as date_parse
+from hearings_lib import fast_decoding
+from hearings_lib.fast_decoding import EST, decode_json, parse_datetime
+
+
+class TestFastDecoding:
+    EXAMPLE_SUMMARY_JSON_PATH = os.path.join(
+        os.path.abspath(os.path.dirname(__file__)),
+        'sample_api_responses',
+        'example_summary_response.json'
+    )
+
+    @pytest.fixture
+    def summary_response(self):
+        response = requests.Response()
+        response.status_code = 200
+        with open(self.EXAMPLE_SUMMARY_JSON_PATH, 'rb') as f:
+            response._content = f.read()
+        return response
+
+    @pytest.mark.parametrize('value', [
+        '2021-02-22T18:00:44Z',
+        '2015-07-29',
+        '2015-07-29T10:30:00-04:00',
+        '2015-07-29T10:30:00.250Z',
+        'July 29, 2015',
+        '20150729'
+    ])
+    def test_parse_datetime_matches_dateutil(self, value):
+        expected = date_parse(value).replace(tzinfo=dateutil.tz.gettz(name='EST'))
+        parsed = parse_datetime(value)
+        assert parsed == expected
+        assert parsed.utcoffset() == expected.utcoffset()
+        assert parsed.tzinfo is EST
+
+    def test_invalid_dates_still_raise(self):
+        with pytest.raises(ValueError):
+            parse_datetime('2015-02-30')
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_decode_json_matches_stdlib(self, summary_response, monkeypatch, use_orjson):
+        if not use_orjson:
+            monkeypatch.setattr(fast_decoding, 'orjson', None)
+        with open(self.EXAMPLE_SUMMARY_JSON_PATH, 'r') as f:
+            assert decode_json(summary_response) == json.load(f)
+
+    def test_decode_errors_match_requests(self, summary_response):
+        summary_response._content = b'{"truncated": '
+        with pytest.raises(requests.exceptions.JSONDecodeError):
+            decode_json(summary_response)
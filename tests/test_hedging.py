@@ -0,0 +1,76 @@
+import time
+import pytest
+import requests
+from urllib.parse import urlparse
+from hearings_lib.api_client import APIClient
+from tests.fake_govinfo import FakeGovinfoServer
+
+
+class TestHedging:
+    TEST_API_KEY = "1234abc"
+    SLOW_LATENCY = 1.0
+
+    @pytest.fixture
+    def server(self):
+        with FakeGovinfoServer(
+            package_count=100,
+            congresses=(114,),
+            latency=0.01,
+            slow_rate=0.03,
+            slow_latency=self.SLOW_LATENCY,
+            seed=7
+        ) as server:
+            yield server
+
+    def summary_urls(self, server):
+        return [f'{server.url}/packages/{i}/summary' for i in server.package_ids(114)]
+
+    def test_hedged_requests_cut_the_tail(self, server):
+        with requests.Session() as s, APIClient(self.TEST_API_KEY, s, base_url=server.url, hedge=True) as client:
+            client.HEDGE_MIN_SAMPLES = 5
+            answered = []
+            for i in self.summary_urls(server):
+                r = client._get(i)
+                assert r.json()['packageId'] in i
+                answered.append((urlparse(i).path, int(r.headers['X-Request-Number'])))
+
+        assert client.metrics.snapshot()['endpoints']['packages/summary']['hedges'] > 0
+        # once there are enough samples to hedge, every slow request is answered by its duplicate
+        late_slow_requests = server.slow_requests - set(answered[:client.HEDGE_MIN_SAMPLES])
+        assert late_slow_requests
+        assert not late_slow_requests & set(answered)
+        assert {(path, 2) for path, _ in late_slow_requests} <= set(answered)
+
+    def test_unhedged_requests_are_never_duplicated(self, server):
+        with requests.Session() as s:
+            client = APIClient(self.TEST_API_KEY, s, base_url=server.url)
+            for i in self.summary_urls(server)[:10]:
+                client._get(i)
+        assert sum(server.requests.values()) == 10
+        assert client.metrics.snapshot()['endpoints']['packages/summary']['hedges'] == 0
+
+    def test_package_deadline_bounds_slow_packages(self):
+        with FakeGovinfoServer(package_count=3, congresses=(114,), latency=0.5) as server:
+            with requests.Session() as s:
+                client = APIClient(self.TEST_API_KEY, s, base_url=server.url, package_deadline=0.2)
+                packages = list(client.iter_package_ids_by_congress(114))
+                started = time.perf_counter()
+                fetched = [client._fetch_package(i) for i in packages]
+                elapsed = time.perf_counter() - started
+        assert fetched == [None, None, None]
+        assert elapsed < 3 * 0.5
+
+    def test_package_deadline_stops_retrying_failing_packages(self):
+        with FakeGovinfoServer(package_count=3, congresses=(114,), error_rate=1.0) as server:
+            packages = [
+                {'packageId': i, 'packageLink': f'{server.url}/packages/{i}/summary'} for i in server.package_ids(114)
+            ]
+            with requests.Session() as s:
+                client = APIClient(self.TEST_API_KEY, s, base_url=server.url, package_deadline=1.0)
+                started = time.perf_counter()
+                fetched = [client._fetch_package(i) for i in packages]
+                elapsed = time.perf_counter() - started
+        assert fetched == [None, None, None]
+        # the first retry is immediate, the second would back off past the deadline
+        assert server.requests[('summary', 503)] == 3 * 2
+        assert elapsed < 3 * 1.0
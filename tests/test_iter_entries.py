@@ -0,0 +1,88 @@
+import pytest
+from hearings_lib.transcript_parser import Parser, ScanningParser
+from tests import test_standard_speaker_pattern
+from tests.test_scanning_parser import EDGE_CASE_LINES
+
+PREAMBLE_LINES = """front matter, no opening line
+    Mr. Smith. Before any opening line.
+    more text
+[Whereupon, the hearing was adjourned.]"""
+
+# front matter with whitespace-only and carriage return lines, which iter_entries keeps unstripped
+WHITESPACE_PREAMBLE_LINES = """  [House Hearing, 117 Congress] \r
+   
+\r
+\t
+    The Committee met, pursuant to call, at 10 a.m.\r
+    Mr. Smith. Thank you. \r
+    \r
+[Whereupon, the hearing was adjourned.]"""
+
+
+class TestIterEntries:
+    @pytest.mark.parametrize('parser', [Parser, ScanningParser])
+    @pytest.mark.parametrize('text', [
+        test_standard_speaker_pattern.TestStandardSpeakerPattern.LINES,
+        EDGE_CASE_LINES,
+        PREAMBLE_LINES,
+        PREAMBLE_LINES.replace('    Mr. Smith.', '    Smith said'),
+        ''
+    ])
+    def test_matches_parse(self, parser, text):
+        entries, speakers = parser().parse(text.split('\n'))
+        streamed_speakers = set()
+        assert list(parser().iter_entries(iter(text.split('\n')), streamed_speakers)) == entries
+        assert streamed_speakers == speakers
+
+    @pytest.mark.parametrize('parser', [Parser, ScanningParser])
+    @pytest.mark.parametrize('text', [
+        test_standard_speaker_pattern.TestStandardSpeakerPattern.LINES.replace('\n', '\r\n'),
+        EDGE_CASE_LINES,
+        PREAMBLE_LINES,
+        PREAMBLE_LINES.replace('front matter, no opening line', 'The Committee met, pursuant to call, at'),
+        WHITESPACE_PREAMBLE_LINES,
+        WHITESPACE_PREAMBLE_LINES.replace('    Mr. Smith.', '    Smith said'),
+        WHITESPACE_PREAMBLE_LINES.replace('    The Committee met', '    Mr. Smith. The Committee met'),
+        ''
+    ])
+    def test_offsets_match_parse(self, parser, text):
+        entries, speakers = parser().parse(text.split('\n'))
+        offset_speakers = set()
+        assert [
+            {'speaker': i['speaker'], 'body': Parser.entry_text(text, i['start'], i['end']), 'seq': i['seq']}
+            for i in parser().iter_entry_offsets(text, offset_speakers)
+        ] == entries
+        assert offset_speakers == speakers
+
+    def test_parse_leaves_lines_unchanged(self):
+        lines = EDGE_CASE_LINES.split('\n')
+        Parser().parse(lines)
+        assert lines == EDGE_CASE_LINES.split('\n')
+
+    def test_file_and_bytes_lines(self, tmp_path):
+        text = test_standard_speaker_pattern.TestStandardSpeakerPattern.LINES
+        expected = Parser().parse(text.split('\n'))[0]
+        path = tmp_path / 'transcript.htm'
+        path.write_text(text.replace('\n', '\r\n'))
+        with open(path, 'r', newline='') as f:
+            assert list(Parser().iter_entries(f)) == expected
+        assert list(Parser().iter_entries(i.encode('UTF-8') for i in text.split('\n'))) == expected
+
+    def test_entries_yielded_as_contributions_end(self):
+        lines = [
+            '    The Subcommittee met, pursuant to notice, at 10 a.m., in',
+            *test_standard_speaker_pattern.TestStandardSpeakerPattern.LINES.split('\n')
+        ]
+        consumed = []
+
+        def stream():
+            for i in lines:
+                consumed.append(i)
+                yield i
+
+        entries = Parser().iter_entries(stream())
+        first = next(entries)
+        assert first['speaker'] == 'Chairman KANJORSKI'
+        # the first entry is yielded once the line starting the next contribution is read
+        assert Parser()._scan_line(consumed[-1].strip())[1] == 'Oversight BOARD'
+        assert len(consumed) < len(lines) // 2
@@ -0,0 +1,73 @@
+import os
+import logging
+import pytest
+from hearings_lib.mods_page_parser import IterparseModsParser, ModsPageParser
+from tests.mod_fixtures import (
+    expected_parsed_committees,
+    expected_parsed_members,
+    expected_parsed_mods,
+    expected_parsed_witnesses,
+)
+
+SAMPLE_MODS_DIRECTORY = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'sample_mods')
+
+EDGE_CASE_MODS = b'''<?xml version="1.0" encoding="UTF-8"?>
+<mods xmlns="http://www.loc.gov/mods/v3">
+  <relatedItem>
+    <identifier type="uri">https://www.govinfo.gov/app/details/CHRG-114hhrg00001</identifier>
+  </relatedItem>
+  <identifier type="uri">https://www.govinfo.gov/second</identifier>
+  <congMember chamber="H" congress="114"><name type="authority-lnf">Outside, Extension</name></congMember>
+  <extension>
+    <congMember chamber=" H " party="R" congress="114">
+      <name type="parsed">Mr. Nameless</name>
+    </congMember>
+    <congMember congress="114"><name type="authority-lnf"> Doe, Jane </name></congMember>
+    <congCommittee chamber="H" congress="114">
+      <name type="authority-standard">Committee on Energy and Commerce</name>
+      <subCommittee><name type="parsed">Subcommittee on Health</name></subCommittee>
+      <subCommittee><name type="parsed"/></subCommittee>
+    </congCommittee>
+    <congCommittee><name type="parsed">Nameless committee</name></congCommittee>
+    <witness> Smith, John </witness>
+  </extension>
+  <extension><witness>Roe, Richard</witness></extension>
+</mods>
+'''
+
+
+class TestIterparseModsParser:
+    @pytest.fixture
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    @pytest.mark.parametrize('filename', sorted(os.listdir(SAMPLE_MODS_DIRECTORY)))
+    def test_matches_mods_page_parser(self, logger, filename):
+        with open(os.path.join(SAMPLE_MODS_DIRECTORY, filename), 'rb') as f:
+            content = f.read()
+        expected = ModsPageParser(content, logger).create_parsed_mods_page()
+        assert IterparseModsParser(content, logger).create_parsed_mods_page() == expected
+
+    def test_expected_fields(self, logger, expected_parsed_mods):
+        with open(os.path.join(SAMPLE_MODS_DIRECTORY, 'example_mods.xml'), 'r') as f:
+            content = f.read()
+        assert IterparseModsParser(content, logger).create_parsed_mods_page() == expected_parsed_mods
+
+    def test_edge_cases_match_mods_page_parser(self, logger, caplog):
+        expected = ModsPageParser(EDGE_CASE_MODS, logger).create_parsed_mods_page()
+        with caplog.at_level(logging.WARNING):
+            actual = IterparseModsParser(EDGE_CASE_MODS, logger).create_parsed_mods_page()
+        assert actual == expected
+        assert actual.uri == 'https://www.govinfo.gov/app/details/CHRG-114hhrg00001'
+        assert [i.name for i in actual.members] == ['', 'Doe, Jane']
+        assert actual.committees[0].subcommittees == ['Subcommittee on Health', None]
+        assert actual.witnesses == ['Smith, John', 'Roe, Richard']
+        assert 'Failed to parse 1 members' in caplog.text
+        assert 'Failed to parse 1 committees' in caplog.text
+
+    def test_missing_uri(self, logger, caplog):
+        content = b'<mods xmlns="http://www.loc.gov/mods/v3"><extension/></mods>'
+        with caplog.at_level(logging.WARNING):
+            actual = IterparseModsParser(content, logger).create_parsed_mods_page()
+        assert actual.uri == ''
+        assert 'uri not found' in caplog.text
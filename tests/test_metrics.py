@@ -0,0 +1,76 @@
+import re
+import json
+import pytest
+import requests
+import responses
+from hearings_lib.api_client import APIClient
+from hearings_lib.metrics import RequestMetrics
+
+
+class TestRequestMetrics:
+    TEST_API_KEY = "1234abc"
+    SUMMARY_URL = f'{APIClient.PACKAGE_ENDPOINT}/CHRG-114shrg99990/summary'
+
+    @pytest.fixture
+    def client(self):
+        return APIClient(self.TEST_API_KEY, requests.Session())
+
+    @pytest.fixture
+    def mocked_api(self):
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            rsps.add(
+                responses.GET,
+                re.compile(f'{self.SUMMARY_URL}.*'),
+                body='{"packageId": "CHRG-114shrg99990"}',
+                headers={'X-RateLimit-Remaining': '975', 'Content-Length': '34'}
+            )
+            rsps.add(
+                responses.GET,
+                re.compile(f'{APIClient.PACKAGE_ENDPOINT}/CHRG-114shrg99991/htm.*'),
+                status=404
+            )
+            yield rsps
+
+    def test_endpoint_names(self):
+        assert RequestMetrics.endpoint_name(self.SUMMARY_URL) == 'packages/summary'
+        assert RequestMetrics.endpoint_name(f'{APIClient.PACKAGE_ENDPOINT}/CHRG-1/mods?api_key=a') == 'packages/mods'
+        assert RequestMetrics.endpoint_name(APIClient.CHRG_ENDPOINT) == 'collections'
+
+    def test_adapter_records_every_request(self, mocked_api, client):
+        client._get(self.SUMMARY_URL)
+        client._get(self.SUMMARY_URL)
+        with pytest.raises(requests.exceptions.HTTPError):
+            client._get(f'{APIClient.PACKAGE_ENDPOINT}/CHRG-114shrg99991/htm')
+
+        snapshot = client.metrics.snapshot()
+        summary = snapshot['endpoints']['packages/summary']
+        assert summary['requests'] == 2
+        assert summary['status_codes'] == {'200': 2}
+        assert summary['bytes_received'] == 2 * len('{"packageId": "CHRG-114shrg99990"}')
+        assert sum(summary['latency_buckets'].values()) == 2
+        assert snapshot['endpoints']['packages/htm']['status_codes'] == {'404': 1}
+        assert snapshot['rate_limit_remaining'] == 975
+
+    def test_failed_requests_count_as_errors(self, client):
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.GET, re.compile(f'{self.SUMMARY_URL}.*'), body=requests.ConnectionError())
+            with pytest.raises(requests.ConnectionError):
+                client._get(self.SUMMARY_URL)
+        assert client.metrics.snapshot()['endpoints']['packages/summary']['errors'] == 1
+
+    def test_prometheus_export(self, mocked_api, client, tmp_path):
+        client._get(self.SUMMARY_URL)
+        client.metrics.record_retry(self.SUMMARY_URL)
+        path = tmp_path / 'metrics.prom'
+        client.metrics.write_prometheus(str(path))
+        text = path.read_text()
+        assert 'govinfo_requests_total{endpoint="packages/summary",status="200"} 1' in text
+        assert 'govinfo_request_duration_seconds_bucket{endpoint="packages/summary",le="+Inf"} 1' in text
+        assert 'govinfo_retries_total{endpoint="packages/summary"} 1' in text
+        assert 'govinfo_rate_limit_remaining 975' in text
+
+    def test_json_export(self, mocked_api, client, tmp_path):
+        client._get(self.SUMMARY_URL)
+        path = tmp_path / 'metrics.json'
+        client.metrics.export({'metrics': {'json_file': str(path)}})
+        assert json.loads(path.read_text())['endpoints']['packages/summary']['requests'] == 1
@@ -0,0 +1,100 @@
+import os
+import re
+import json
+import pytest
+import requests
+import sqlalchemy
+import responses
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from hearings_lib import mods_page_parser
+from hearings_lib.api_client import APIClient
+from hearings_lib.db_handler import DB_Handler
+from hearings_lib.db_models import Base, Hearing, MemberAttendance
+from hearings_lib.mods_page_parser import ModsPageParser, mods_content_hash
+
+
+class TestModsHash:
+    TEST_API_KEY = "1234abc"
+    SAMPLE_DIRECTORY = os.path.abspath(os.path.dirname(__file__))
+    PACKAGE_ID = 'CHRG-113hhrg86466'
+
+    @pytest.fixture
+    def handler(self, tmp_path):
+        e = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "mods.db"}', future=True)
+        Base.metadata.create_all(e)
+        return DB_Handler(e)
+
+    @pytest.fixture
+    def mods_content(self):
+        with open(os.path.join(self.SAMPLE_DIRECTORY, 'sample_mods', 'example_mods.xml'), 'rb') as f:
+            return f.read()
+
+    @pytest.fixture
+    def mocked_responses(self, mods_content):
+        with open(os.path.join(self.SAMPLE_DIRECTORY, 'sample_api_responses', 'example_summary_response.json')) as f:
+            summary = json.load(f)
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.GET, re.compile(f'{APIClient.PACKAGE_ENDPOINT}/.+/summary.*'), json=summary)
+            rsps.add(responses.GET, re.compile(f'{APIClient.PACKAGE_ENDPOINT}/.+/mods.*'), body=mods_content)
+            yield rsps
+
+    def package(self, last_modified='2021-02-22T18:00:44Z', title='Hearing'):
+        return {
+            'packageId': self.PACKAGE_ID,
+            'title': title,
+            'lastModified': last_modified,
+            'packageLink': f'{APIClient.PACKAGE_ENDPOINT}/{self.PACKAGE_ID}/summary',
+            'congress': '113'
+        }
+
+    def stored(self, handler):
+        with Session(handler.engine) as session:
+            hearing = session.get(Hearing, self.PACKAGE_ID)
+            members = session.execute(select(MemberAttendance).filter_by(hearing_id=self.PACKAGE_ID)).scalars().all()
+            return hearing.title, hearing.uri, hearing.mods_hash, len(members)
+
+    def test_hash_depends_on_content_and_parser_version(self, mods_content, monkeypatch):
+        first = mods_content_hash(mods_content)
+        assert mods_content_hash(mods_content) == first
+        assert mods_content_hash(mods_content + b' ') != first
+        monkeypatch.setattr(mods_page_parser, 'PARSER_VERSION', mods_page_parser.PARSER_VERSION + 1)
+        assert mods_content_hash(mods_content) != first
+
+    def test_unchanged_mods_skips_parsing_and_metadata(self, mocked_responses, handler, mods_content, monkeypatch):
+        client = APIClient(self.TEST_API_KEY, requests.Session())
+        handler.sync_hearing_records(client.get_package_summaries([self.package()]))
+        title, uri, mods_hash, member_count = self.stored(handler)
+        assert mods_hash == mods_content_hash(mods_content)
+        assert handler.get_package_mods_hashes() == {self.PACKAGE_ID: mods_hash}
+
+        def fail(*args, **kwargs):
+            raise AssertionError('unchanged MODS document parsed again')
+
+        monkeypatch.setattr(ModsPageParser, 'create_parsed_mods_page', fail)
+        client = APIClient(self.TEST_API_KEY, requests.Session(), mods_hashes=handler.get_package_mods_hashes())
+        summaries = client.get_package_summaries([self.package('2022-01-01T00:00:00Z', 'Renamed hearing')])
+        assert summaries[0].metadata is None
+        assert summaries[0].mods_hash == mods_hash
+
+        handler.sync_hearing_records(summaries)
+        assert self.stored(handler) == ('Renamed hearing', uri, mods_hash, member_count)
+
+    def test_changed_mods_parsed_again(self, mocked_responses, handler, mods_content):
+        client = APIClient(self.TEST_API_KEY, requests.Session(), mods_hashes={self.PACKAGE_ID: '0:0'})
+        summaries = client.get_package_summaries([self.package()])
+        assert summaries[0].metadata.uri
+        handler.sync_hearing_records(summaries)
+        assert self.stored(handler)[2] == mods_content_hash(mods_content)
+
+    def test_upgrade_adds_columns_missing_from_existing_databases(self, tmp_path):
+        e = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "old.db"}', future=True)
+        Base.metadata.create_all(e)
+        with e.begin() as conn:
+            for i in DB_Handler.ADDED_COLUMNS:
+                conn.exec_driver_sql(f'ALTER TABLE {i.table.name} DROP COLUMN {i.name}')
+
+        handler = DB_Handler(e)
+        assert handler.get_package_mods_hashes() == {}
+        assert {i['name'] for i in sqlalchemy.inspect(e).get_columns('hearing_summaries')} >= {'mods_hash'}
+        assert handler.upgrade_schema(e) == []
@@ -0,0 +1,112 @@
+import re
+import json
+import datetime
+import dateutil.tz
+import pytest
+import requests
+import sqlalchemy
+import responses
+from hearings_lib.api_client import APIClient, ListingUnavailableException
+from hearings_lib.db_models import Base
+from hearings_lib.retry_queue import RetryQueue
+
+
+class TestPackageListing:
+    TEST_API_KEY = "1234abc"
+
+    @pytest.fixture
+    def api_client(self):
+        return APIClient(self.TEST_API_KEY, requests.Session())
+
+    @pytest.fixture
+    def failed_offsets(self):
+        return []
+
+    @pytest.fixture
+    def mocked_listing(self, api_client, failed_offsets):
+        def page_callback(request):
+            offset = int(request.params['offset'])
+            if offset in failed_offsets:
+                failed_offsets.remove(offset)
+                raise requests.ConnectionError('connection reset')
+            packages = [{'packageId': f'CHRG-{i}'} for i in range(offset, min(offset + 100, 250))]
+            return 200, {}, json.dumps({'count': 250, 'packages': packages})
+
+        with responses.RequestsMock() as rsps:
+            rsps.add_callback(
+                responses.GET,
+                re.compile(f'{re.escape(api_client.CHRG_ENDPOINT)}.*'),
+                callback=page_callback,
+                content_type='application/json'
+            )
+            yield rsps
+
+    def test_iter_package_pages_yields_each_page(self, mocked_listing, api_client):
+        pages = list(api_client.iter_package_pages({'congress': '114'}))
+        assert [len(i) for i in pages] == [100, 100, 50]
+
+    def test_iter_packages_is_lazy(self, mocked_listing, api_client):
+        packages = api_client.iter_package_ids_by_congress(114)
+        assert next(packages) == {'packageId': 'CHRG-0'}
+        assert len(mocked_listing.calls) == 1
+        assert len(list(packages)) == 249
+        assert len(mocked_listing.calls) == 3
+
+    def test_get_package_ids_by_congress_preserves_order(self, mocked_listing, api_client):
+        actual = api_client.get_package_ids_by_congress(114)
+        assert [i['packageId'] for i in actual] == [f'CHRG-{i}' for i in range(250)]
+
+    def test_concurrent_listing_preserves_order(self, mocked_listing):
+        api_client = APIClient(self.TEST_API_KEY, requests.Session(), max_workers=3)
+        actual = api_client.get_package_ids_by_congress(114)
+        assert [i['packageId'] for i in actual] == [f'CHRG-{i}' for i in range(250)]
+
+    @pytest.mark.parametrize('max_workers', [1, 3])
+    def test_failed_page_is_retried(self, mocked_listing, failed_offsets, max_workers):
+        api_client = APIClient(self.TEST_API_KEY, requests.Session(), max_workers=max_workers)
+        api_client.PAGE_RETRY_BACKOFF = 0
+        failed_offsets.extend([100, 100])
+        actual = api_client.get_package_ids_by_congress(114)
+        assert [i['packageId'] for i in actual] == [f'CHRG-{i}' for i in range(250)]
+        assert failed_offsets == []
+
+    def test_failed_first_page_is_retried(self, mocked_listing, failed_offsets, api_client):
+        api_client.PAGE_RETRY_BACKOFF = 0
+        failed_offsets.extend([0, 0])
+        assert len(api_client.get_package_ids_by_congress(114)) == 250
+
+    @pytest.mark.parametrize('offset,skip_failed_pages', [(0, True), (100, False)])
+    def test_unavailable_listing_raises_without_recording(
+        self,
+        mocked_listing,
+        failed_offsets,
+        tmp_path,
+        offset,
+        skip_failed_pages
+    ):
+        engine = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "retry.db"}', future=True)
+        Base.metadata.create_all(engine)
+        api_client = APIClient(self.TEST_API_KEY, requests.Session(), retry_queue=RetryQueue(engine))
+        api_client.PAGE_RETRY_BACKOFF = 0
+        failed_offsets.extend([offset] * (api_client.PAGE_RETRIES + 1))
+        with pytest.raises(ListingUnavailableException):
+            list(api_client.iter_package_pages({'congress': '114'}, skip_failed_pages=skip_failed_pages))
+        # the listing is listed again instead, draining the queue would only fetch the one page
+        assert len(api_client.retry_queue) == 0
+
+    def test_chrg_endpoint_defaults_to_full_collection(self, api_client):
+        assert api_client.chrg_endpoint() == api_client.CHRG_ENDPOINT
+
+    def test_chrg_endpoint_converts_watermark_to_utc(self, api_client):
+        watermark = datetime.datetime(2021, 5, 1, 8, 30, 15, 1234, tzinfo=dateutil.tz.tzoffset(None, -4 * 3600))
+        assert api_client.chrg_endpoint(watermark) == f'{api_client.COLLECTION_LIST_ENDPOINT}/CHRG/2021-05-01T12:30:15Z'
+
+    def test_iter_packages_modified_since_lists_from_watermark(self, api_client):
+        watermark = datetime.datetime(2021, 5, 1)
+        with responses.RequestsMock() as rsps:
+            rsps.add(
+                responses.GET,
+                re.compile(f'{re.escape(api_client.COLLECTION_LIST_ENDPOINT)}/CHRG/2021-05-01T00:00:00Z.*'),
+                json={'count': 1, 'packages': [{'packageId': 'CHRG-0'}]}
+            )
+            assert list(api_client.iter_packages_modified_since(watermark)) == [{'packageId': 'CHRG-0'}]
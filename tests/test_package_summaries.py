@@ -0,0 +1,142 @@
+import os
+import re
+import json
+import time
+import threading
+import pytest
+import requests
+import responses
+from hearings_lib.api_client import APIClient, RateLimitExceededException
+from hearings_lib.mods_page_parser import mods_parsing_pool
+from hearings_lib.rate_limiter import RateLimiter
+
+
+class TestPackageSummaries:
+    TEST_API_KEY = "1234abc"
+    EXAMPLE_SUMMARY_JSON_PATH = os.path.join(
+        os.path.abspath(os.path.dirname(__file__)),
+        'sample_api_responses',
+        'example_summary_response.json'
+    )
+    TEST_MODS_PATH = os.path.join(
+        os.path.abspath(os.path.dirname(__file__)),
+        'sample_mods',
+        'example_mods.xml'
+    )
+    PACKAGE_COUNT = 12
+
+    @pytest.fixture
+    def sample_summary_response(self):
+        with open(self.EXAMPLE_SUMMARY_JSON_PATH, 'r') as f:
+            return json.load(f)
+
+    @pytest.fixture
+    def mods_content(self):
+        with open(self.TEST_MODS_PATH, 'rb') as f:
+            return f.read()
+
+    @pytest.fixture
+    def packages(self):
+        return [
+            {
+                'packageId': f'CHRG-114shrg{i}',
+                'title': f'Hearing {i}',
+                'lastModified': '2021-02-22T18:00:44Z',
+                'packageLink': f'{APIClient.PACKAGE_ENDPOINT}/CHRG-114shrg{i}/summary',
+                'congress': '114'
+            }
+            for i in range(self.PACKAGE_COUNT)
+        ]
+
+    @pytest.fixture
+    def mocked_responses(self, sample_summary_response, mods_content):
+        with responses.RequestsMock() as rsps:
+            rsps.add(
+                responses.GET,
+                re.compile(f'{APIClient.PACKAGE_ENDPOINT}/.+/summary.*'),
+                json=sample_summary_response,
+                status=200
+            )
+            rsps.add(
+                responses.GET,
+                re.compile(f'{APIClient.PACKAGE_ENDPOINT}/.+/mods.*'),
+                body=mods_content,
+                status=200
+            )
+            yield rsps
+
+    @pytest.mark.parametrize('max_workers', [1, 4])
+    def test_get_package_summaries_keeps_package_order(self, mocked_responses, packages, max_workers):
+        client = APIClient(self.TEST_API_KEY, requests.Session(), max_workers=max_workers)
+        actual = client.get_package_summaries(packages)
+        assert [i.package_id for i in actual] == [i['packageId'] for i in packages]
+        assert all(i.metadata.uri for i in actual)
+
+    def test_concurrent_summaries_match_serial(self, mocked_responses, packages):
+        serial = APIClient(self.TEST_API_KEY, requests.Session()).get_package_summaries(packages)
+        concurrent = APIClient(self.TEST_API_KEY, requests.Session(), max_workers=4).get_package_summaries(packages)
+        assert serial == concurrent
+
+    def test_pooled_mods_parsing_matches_serial(self, mocked_responses, packages):
+        serial = APIClient(self.TEST_API_KEY, requests.Session()).get_package_summaries(packages)
+        with mods_parsing_pool(2) as pool:
+            client = APIClient(self.TEST_API_KEY, requests.Session(), max_workers=4, mods_executor=pool)
+            assert client.get_package_summaries(packages) == serial
+            # the pipeline's parse stage builds summaries one at a time
+            fetched = client._fetch_package(packages[0])
+            assert client._build_package_summary(fetched) == serial[0]
+
+    def test_skeleton_summary_without_package_link(self, packages):
+        client = APIClient(self.TEST_API_KEY, requests.Session())
+        packages[0]['packageLink'] = None
+        actual = client.get_package_summaries(packages[:1])
+        assert actual[0].package_id == packages[0]['packageId']
+        assert actual[0].metadata is None
+        assert actual[0].dates is None
+
+    def test_rate_limit_returns_partial_summaries(self, packages):
+        waits = []
+        elapsed = [0.0]
+
+        def sleep(seconds):
+            waits.append(seconds)
+            elapsed[0] += seconds
+
+        client = APIClient(
+            self.TEST_API_KEY,
+            requests.Session(),
+            rate_limiter=RateLimiter(clock=lambda: elapsed[0], sleep=sleep)
+        )
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            rsps.add(
+                responses.GET,
+                re.compile(f'{APIClient.PACKAGE_ENDPOINT}/.+/summary.*'),
+                status=429,
+                headers={'X-RateLimit-Limit': '1000'}
+            )
+            actual = client.get_package_summaries(packages)
+            assert len(rsps.calls) == client.RATE_LIMIT_RETRIES + 1
+        assert actual == []
+        assert len(waits) == client.RATE_LIMIT_RETRIES
+
+    def test_rate_limit_abort_wakes_waiting_workers(self):
+        limiter = RateLimiter(limit=1000, window=3600)
+        client = APIClient(self.TEST_API_KEY, requests.Session(), max_workers=2, rate_limiter=limiter)
+        blocked = threading.Event()
+        response = requests.Response()
+        response.url = APIClient.PACKAGE_ENDPOINT
+
+        def fetch(i):
+            if i == 0:
+                limiter.block()
+                blocked.set()
+                time.sleep(0.1)
+                raise RateLimitExceededException(response)
+            blocked.wait()
+            # waits for the quota window unless the abort cancels it
+            limiter.acquire()
+
+        started = time.perf_counter()
+        with pytest.raises(RateLimitExceededException):
+            list(client._map_concurrently(fetch, range(4), 'Fetching'))
+        assert time.perf_counter() - started < 5
@@ -0,0 +1,28 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from hearings_lib.mods_page_parser import ModsPageParser, mods_parsing_pool, parse_mods_batch
+
+SAMPLE_MODS_DIRECTORY = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'sample_mods')
+
+
+class TestParseModsBatch:
+    def load_documents(self):
+        documents = []
+        for i in sorted(os.listdir(SAMPLE_MODS_DIRECTORY)):
+            with open(os.path.join(SAMPLE_MODS_DIRECTORY, i), 'rb') as f:
+                documents.append(f.read())
+        return documents
+
+    def test_results_keep_document_order(self):
+        documents = self.load_documents() * 5 + [None, b'']
+        expected = [ModsPageParser(i, logging.getLogger(__name__)).create_parsed_mods_page() for i in documents[:-2]]
+        with mods_parsing_pool(2) as pool:
+            actual = parse_mods_batch(documents, executor=pool, chunk_size=3)
+        assert actual == expected + [None, None]
+
+    def test_temporary_pool(self):
+        documents = self.load_documents()
+        with ThreadPoolExecutor(1) as executor:
+            expected = parse_mods_batch(documents, executor=executor)
+        assert parse_mods_batch(documents, processes=2) == expected
@@ -0,0 +1,76 @@
+import re
+import json
+import pytest
+import requests
+import sqlalchemy
+import responses
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from hearings_lib.db_models import Base, Hearing, HearingTranscript
+from hearings_lib.db_handler import DB_Handler
+from hearings_lib.api_client import APIClient
+from hearings_lib.pipeline import Pipeline
+
+
+class TestPipeline:
+    TEST_API_KEY = "1234abc"
+    PACKAGE_COUNT = 30
+
+    @pytest.fixture
+    def handler(self, tmp_path):
+        e = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "pipeline.db"}', future=True)
+        Base.metadata.create_all(e)
+        return DB_Handler(e)
+
+    @pytest.fixture
+    def packages(self):
+        return [
+            {
+                'packageId': f'CHRG-114shrg{i}',
+                'title': f'Hearing {i}',
+                'lastModified': '2021-02-22T18:00:44Z',
+                'packageLink': f'{APIClient.PACKAGE_ENDPOINT}/CHRG-114shrg{i}/summary',
+                'congress': '114'
+            }
+            for i in range(self.PACKAGE_COUNT)
+        ]
+
+    @pytest.fixture
+    def mocked_api(self):
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            rsps.add(
+                responses.GET,
+                re.compile(f'{APIClient.PACKAGE_ENDPOINT}/.+/summary.*'),
+                body=json.dumps(
+                    {'session': '1', 'pages': '10', 'dateIssued': '2015-07-29', 'heldDates': ['2015-07-29']}
+                )
+            )
+            rsps.add(
+                responses.GET,
+                re.compile(f'{APIClient.PACKAGE_ENDPOINT}/.+/htm.*'),
+                body='<html>transcript</html>'
+            )
+            yield rsps
+
+    @pytest.mark.parametrize('max_workers', [1, 4])
+    def test_pipeline_persists_every_package(self, mocked_api, handler, packages, max_workers):
+        client = APIClient(self.TEST_API_KEY, requests.Session(), max_workers=max_workers)
+        pipeline = Pipeline(client, handler, queue_size=4, batch_size=7)
+        stats = pipeline.run(iter(packages), fetch_transcripts=True)
+
+        assert [i.name for i in stats] == ['fetch', 'parse', 'persist', 'fetch transcripts', 'persist transcripts']
+        assert all(i.processed == self.PACKAGE_COUNT for i in stats)
+        assert all(i.queue_depth == 0 for i in stats)
+        with Session(handler.engine) as session:
+            assert len(session.execute(select(Hearing.package_id)).all()) == self.PACKAGE_COUNT
+            assert len(session.execute(select(HearingTranscript.package_id)).all()) == self.PACKAGE_COUNT
+
+    def test_stage_errors_stop_the_pipeline(self, mocked_api, handler, packages):
+        client = APIClient(self.TEST_API_KEY, requests.Session(), max_workers=2)
+
+        def failing_sync(summaries):
+            raise RuntimeError('database unavailable')
+
+        handler.sync_hearing_records = failing_sync
+        with pytest.raises(RuntimeError):
+            Pipeline(client, handler, queue_size=2, batch_size=5).run(iter(packages))
@@ -0,0 +1,48 @@
+import logging
+import requests
+from hearings_lib.api_client import APIClient
+from hearings_lib.queued_logging import get_queued_logger, stop_queued_logging
+
+
+class TestQueuedLogging:
+    def test_handler_set_up_once_per_process(self, tmp_path):
+        name = 'tests.queued_logging.once'
+        logger = get_queued_logger(name, filename=str(tmp_path / 'once.log'))
+        handlers = list(logger.handlers)
+        assert get_queued_logger(name, filename=str(tmp_path / 'other.log')) is logger
+        assert logger.handlers == handlers
+        assert len(handlers) == 1
+
+    def test_records_written_by_listener(self, tmp_path):
+        name = 'tests.queued_logging.records'
+        path = tmp_path / 'records.log'
+        logger = get_queued_logger(name, filename=str(path))
+        logger.info('value %s', ['first'])
+        stop_queued_logging()
+        assert not logger.handlers
+        assert path.read_text().rstrip().endswith(" - INFO - value ['first']")
+        assert path.read_text().count('\n') == 1
+
+    def test_clients_share_one_handler(self):
+        with requests.Session() as s:
+            APIClient('test', s)
+            handlers = list(logging.getLogger('hearings_lib.api_client').handlers)
+            APIClient('test', s)
+        assert logging.getLogger('hearings_lib.api_client').handlers == handlers
+
+    def test_package_messages_sampled(self, monkeypatch):
+        messages = []
+        with requests.Session() as s:
+            client = APIClient('test', s, package_log_sample_rate=0.25)
+        monkeypatch.setattr(client.logger, 'info', lambda message, *args: messages.append(message % args))
+        for i in range(10):
+            client._log_package('Parsing package %s', i)
+        assert messages == ['Parsing package 0', 'Parsing package 4', 'Parsing package 8']
+
+    def test_package_messages_disabled(self, monkeypatch):
+        messages = []
+        with requests.Session() as s:
+            client = APIClient('test', s, package_log_sample_rate=0)
+        monkeypatch.setattr(client.logger, 'info', lambda message, *args: messages.append(message % args))
+        client._log_package('Parsing package %s', 1)
+        assert messages == []
@@ -0,0 +1,107 @@
+import time
+import threading
+import pytest
+import requests
+from hearings_lib.rate_limiter import RateLimiter, RateLimitWaitCancelledException
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter:
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    def make_response(self, status_code=200, **headers):
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers.update(headers)
+        return response
+
+    def test_acquire_does_not_wait_with_tokens_left(self, clock):
+        limiter = RateLimiter(limit=10, headroom=0, clock=clock, sleep=clock.sleep)
+        for _ in range(10):
+            limiter.acquire()
+        assert clock.sleeps == []
+
+    def test_acquire_paces_once_bucket_is_empty(self, clock):
+        limiter = RateLimiter(limit=10, window=100, headroom=0, clock=clock, sleep=clock.sleep)
+        for _ in range(11):
+            limiter.acquire()
+        assert clock.sleeps == [pytest.approx(10)]
+
+    def test_remaining_header_caps_tokens(self, clock):
+        limiter = RateLimiter(limit=1000, headroom=0, clock=clock, sleep=clock.sleep)
+        limiter.update_from_response(self.make_response(**{
+            'X-RateLimit-Limit': '1000',
+            'X-RateLimit-Remaining': '2'
+        }))
+        assert limiter.remaining == 2
+        limiter.acquire()
+        limiter.acquire()
+        assert clock.sleeps == []
+        limiter.acquire()
+        assert len(clock.sleeps) == 1
+
+    def test_limit_header_resizes_bucket(self, clock):
+        limiter = RateLimiter(limit=1000, headroom=0, clock=clock, sleep=clock.sleep)
+        limiter.update_from_response(self.make_response(**{'X-RateLimit-Limit': '36000'}))
+        assert limiter.capacity == 36000
+        assert limiter.rate == 10
+
+    def test_rate_limited_response_blocks_until_window_resets(self, clock):
+        limiter = RateLimiter(limit=1000, window=3600, clock=clock, sleep=clock.sleep)
+        limiter.update_from_response(self.make_response(status_code=429, **{'X-RateLimit-Remaining': '0'}))
+        limiter.acquire()
+        assert clock.now >= 3600
+
+    def test_retry_after_header_shortens_block(self, clock):
+        limiter = RateLimiter(limit=1000, window=3600, clock=clock, sleep=clock.sleep)
+        limiter.update_from_response(self.make_response(status_code=429, **{'Retry-After': '60'}))
+        limiter.acquire()
+        assert 60 <= clock.now < 3600
+
+    def test_share_splits_the_limit(self, clock):
+        limiter = RateLimiter(limit=100, headroom=0, share=0.25, clock=clock, sleep=clock.sleep)
+        assert limiter.capacity == 25
+        limiter.update_from_response(self.make_response(**{'X-RateLimit-Limit': '100', 'X-RateLimit-Remaining': '40'}))
+        assert limiter.capacity == 25
+        assert limiter.tokens == 10
+
+    def test_cancelled_wakes_waiting_callers(self):
+        limiter = RateLimiter(limit=1000, window=3600)
+        limiter.block()
+        errors = []
+
+        def acquire():
+            try:
+                limiter.acquire()
+            except RateLimitWaitCancelledException as e:
+                errors.append(e)
+
+        waiting = threading.Thread(target=acquire)
+        waiting.start()
+        time.sleep(0.1)
+        started = time.perf_counter()
+        with limiter.cancelled():
+            waiting.join(5)
+            with pytest.raises(RateLimitWaitCancelledException):
+                limiter.acquire()
+        assert time.perf_counter() - started < 5
+        assert len(errors) == 1
+        # later callers wait as usual
+        limiter.blocked_until = 0
+        limiter.tokens = 1
+        limiter.acquire()
@@ -0,0 +1,107 @@
+import re
+import pytest
+import requests
+import responses
+from hearings_lib.api_client import APIClient
+from hearings_lib.response_cache import ResponseCache
+
+
+class TestResponseCache:
+    TEST_API_KEY = "1234abc"
+    SUMMARY_URL = f'{APIClient.PACKAGE_ENDPOINT}/CHRG-114shrg99990/summary'
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return ResponseCache(str(tmp_path))
+
+    def make_response(self, body: bytes, **headers) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.headers.update(headers)
+        return response
+
+    def test_key_ignores_api_key(self, cache):
+        assert cache.make_key(self.SUMMARY_URL, {'api_key': 'a'}) == cache.make_key(self.SUMMARY_URL, {'api_key': 'b'})
+        assert cache.make_key(self.SUMMARY_URL, {'offset': '0'}) != cache.make_key(self.SUMMARY_URL, {'offset': '100'})
+
+    def test_round_trip(self, cache):
+        key = cache.make_key(self.SUMMARY_URL)
+        cache.put(key, self.make_response(b'{"a": 1}', ETag='"abc"'))
+        entry = cache.get(key)
+        assert entry.body == b'{"a": 1}'
+        assert entry.validators() == {'If-None-Match': '"abc"'}
+        assert entry.to_response(self.SUMMARY_URL).json() == {'a': 1}
+
+    def test_index_survives_restart(self, cache, tmp_path):
+        key = cache.make_key(self.SUMMARY_URL)
+        cache.put(key, self.make_response(b'body'))
+        reopened = ResponseCache(str(tmp_path))
+        assert reopened.size == cache.size
+        assert reopened.get(key).body == b'body'
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        body = bytes(range(256)) * 40
+        probe = ResponseCache(str(tmp_path / 'probe'))
+        probe.put('probe', self.make_response(body))
+        # entry sizes vary by a few bytes with the stored_at timestamp, so leave some slack for two entries
+        cache = ResponseCache(str(tmp_path / 'cache'), max_bytes=probe.size * 2 + 64)
+        cache.put('first', self.make_response(body))
+        cache.put('second', self.make_response(body))
+        cache.get('first')
+        cache.put('third', self.make_response(body))
+        assert cache.get('second') is None
+        assert cache.get('first') is not None
+        assert cache.get('third') is not None
+        assert cache.size <= cache.max_bytes
+
+    def test_client_serves_cached_response_without_request(self, cache):
+        client = APIClient(self.TEST_API_KEY, requests.Session(), cache=cache)
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.GET, re.compile(f'{self.SUMMARY_URL}.*'), json={'packageId': 'CHRG-114shrg99990'})
+            first = client._get(self.SUMMARY_URL)
+            second = client._get(self.SUMMARY_URL)
+            assert len(rsps.calls) == 1
+        assert first.json() == second.json()
+
+    def test_modified_package_misses_cached_summary(self, cache):
+        client = APIClient(self.TEST_API_KEY, requests.Session(), cache=cache)
+
+        def package(last_modified):
+            return {'packageId': 'CHRG-114shrg99990', 'packageLink': self.SUMMARY_URL, 'lastModified': last_modified}
+
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.GET, re.compile(f'{self.SUMMARY_URL}.*'), json={'title': 'first'})
+            rsps.add(responses.GET, re.compile(f'{self.SUMMARY_URL}.*'), json={'title': 'second'})
+            assert client._fetch_package(package('2021-01-01T00:00:00Z')).summary == {'title': 'first'}
+            assert client._fetch_package(package('2021-02-01T00:00:00Z')).summary == {'title': 'second'}
+            assert client._fetch_package(package('2021-02-01T00:00:00Z')).summary == {'title': 'second'}
+            assert len(rsps.calls) == 2
+
+    def test_client_revalidates_stale_entries(self, tmp_path):
+        client = APIClient(self.TEST_API_KEY, requests.Session(), cache=ResponseCache(str(tmp_path), max_age=0))
+        with responses.RequestsMock() as rsps:
+            rsps.add(
+                responses.GET,
+                re.compile(f'{self.SUMMARY_URL}.*'),
+                json={'packageId': 'CHRG-114shrg99990'},
+                headers={'ETag': '"v1"'}
+            )
+            rsps.add(responses.GET, re.compile(f'{self.SUMMARY_URL}.*'), status=304)
+            client._get(self.SUMMARY_URL)
+            revalidated = client._get(self.SUMMARY_URL)
+            assert rsps.calls[1].request.headers['If-None-Match'] == '"v1"'
+        assert revalidated.status_code == 200
+        assert revalidated.json() == {'packageId': 'CHRG-114shrg99990'}
+
+    def test_listing_is_not_cached(self, cache):
+        client = APIClient(self.TEST_API_KEY, requests.Session(), cache=cache)
+        with responses.RequestsMock() as rsps:
+            rsps.add(
+                responses.GET,
+                re.compile(f'{re.escape(client.CHRG_ENDPOINT)}.*'),
+                json={'count': 1, 'packages': [{'packageId': 'CHRG-0'}]}
+            )
+            client.get_package_ids_by_congress(114)
+            client.get_package_ids_by_congress(114)
+            assert len(rsps.calls) == 2
@@ -0,0 +1,88 @@
+import re
+import json
+import datetime
+import pytest
+import requests
+import sqlalchemy
+import responses
+from hearings_lib.db_models import Base
+from hearings_lib.api_client import APIClient
+from hearings_lib.retry_queue import RetryQueue
+
+
+class TestRetryQueue:
+    TEST_API_KEY = "1234abc"
+    SUMMARY_URL = f'{APIClient.PACKAGE_ENDPOINT}/CHRG-114shrg99990/summary'
+    TRANSCRIPT_URL = f'{APIClient.PACKAGE_ENDPOINT}/CHRG-114shrg99990/htm'
+
+    @pytest.fixture
+    def db(self, tmp_path):
+        e = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "retry.db"}', future=True)
+        Base.metadata.create_all(e)
+        return e
+
+    @pytest.fixture
+    def queue(self, db):
+        return RetryQueue(db)
+
+    @pytest.fixture
+    def package(self):
+        return {
+            'packageId': 'CHRG-114shrg99990',
+            'title': 'Hearing',
+            'lastModified': '2021-02-22T18:00:44Z',
+            'packageLink': self.SUMMARY_URL,
+            'congress': '114'
+        }
+
+    def test_record_counts_attempts(self, queue, package):
+        queue.record(RetryQueue.SUMMARY, self.SUMMARY_URL, requests.Timeout(), package['packageId'], package)
+        queue.record(RetryQueue.SUMMARY, self.SUMMARY_URL, requests.ConnectionError(), package['packageId'], package)
+        assert len(queue) == 1
+        later = datetime.datetime.utcnow() + datetime.timedelta(days=1)
+        item = queue.due(later)[0]
+        assert item.attempts == 2
+        assert item.error == 'ConnectionError'
+        assert item.payload == package
+
+    def test_items_wait_for_backoff(self, queue):
+        queue.record(RetryQueue.TRANSCRIPT, self.TRANSCRIPT_URL, requests.Timeout(), 'CHRG-114shrg99990')
+        assert queue.due() == []
+        assert len(queue.due(datetime.datetime.utcnow() + queue.BACKOFF)) == 1
+
+    def test_exhausted_items_are_not_due(self, queue):
+        for _ in range(queue.MAX_ATTEMPTS):
+            queue.record(RetryQueue.TRANSCRIPT, self.TRANSCRIPT_URL, requests.Timeout(), 'CHRG-114shrg99990')
+        assert queue.due(datetime.datetime.utcnow() + datetime.timedelta(days=365)) == []
+
+    def test_client_records_failures_and_drains(self, queue):
+        client = APIClient(self.TEST_API_KEY, requests.Session(), retry_queue=queue)
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.GET, re.compile(f'{self.TRANSCRIPT_URL}.*'), body=requests.ConnectionError())
+            assert client.get_transcripts_by_package_id(['CHRG-114shrg99990']) == {'CHRG-114shrg99990': None}
+        assert len(queue) == 1
+
+        queue.BACKOFF = datetime.timedelta(0)
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.GET, re.compile(f'{self.TRANSCRIPT_URL}.*'), body='<html></html>')
+            summaries, transcripts = client.drain_retry_queue()
+        assert summaries == []
+        assert transcripts == {'CHRG-114shrg99990': '<html></html>'}
+        assert len(queue) == 0
+
+    def test_failed_summary_is_rebuilt_on_drain(self, queue, package):
+        client = APIClient(self.TEST_API_KEY, requests.Session(), retry_queue=queue)
+        with responses.RequestsMock() as rsps:
+            rsps.add(responses.GET, re.compile(f'{self.SUMMARY_URL}.*'), body=requests.ConnectionError())
+            assert client.get_package_summaries([package]) == []
+
+        queue.BACKOFF = datetime.timedelta(0)
+        with responses.RequestsMock() as rsps:
+            rsps.add(
+                responses.GET,
+                re.compile(f'{self.SUMMARY_URL}.*'),
+                body=json.dumps({'session': '1', 'dateIssued': '2015-07-29'})
+            )
+            summaries, transcripts = client.drain_retry_queue()
+        assert [i.package_id for i in summaries] == [package['packageId']]
+        assert len(queue) == 0
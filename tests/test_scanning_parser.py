@@ -0,0 +1,31 @@
+import pytest
+from hearings_lib.transcript_parser import Parser, ScanningParser
+from tests import test_standard_speaker_pattern
+
+EDGE_CASE_LINES = """
+    The Subcommittee met, pursuant to call, at 2 p.m.
+    Mr. Smith-Jones. Good afternoon.
+    [The prepared statement of Mr. Smith follows:]
+    Ms. O`Neal. A backtick is in [A-z].
+    mr. Lowercase. Not a speaker.
+    Chairman Kanjorski.No space, not a speaker.
+    The witnesses said [Whereupon, nothing] mid-line.
+    Senator Byrd. Never reached.
+"""
+
+
+class TestScanningParser:
+    @pytest.mark.parametrize('text', [
+        test_standard_speaker_pattern.TestStandardSpeakerPattern.LINES,
+        EDGE_CASE_LINES,
+        EDGE_CASE_LINES.replace('[Whereupon,', '[Thereupon,'),
+        ''
+    ])
+    def test_output_matches_parser(self, text):
+        expected = Parser().parse(text.split('\n'))
+        assert ScanningParser().parse(text.split('\n')) == expected
+
+    def test_edge_case_speakers(self):
+        entries, speakers = ScanningParser().parse(EDGE_CASE_LINES.split('\n'))
+        assert [i['speaker'] for i in entries] == ['Mr SMITH-JONES', 'Mr SMITH', 'Ms O`NEAL']
+        assert speakers == {'Mr SMITH-JONES', 'Mr SMITH', 'Ms O`NEAL'}
@@ -0,0 +1,98 @@
+import re
+import json
+import queue
+import datetime
+import pytest
+import sqlalchemy
+import responses
+from hearings_lib.api_client import APIClient
+from hearings_lib.db_models import Base
+from hearings_lib.retry_queue import RetryQueue
+from hearings_lib.sharded_crawler import ShardCrawlException, crawl_shard, shard_congresses
+
+
+class TestShardedCrawler:
+    TEST_API_KEY = "1234abc"
+    PACKAGE_COUNT = 150
+
+    @pytest.fixture
+    def mocked_api(self):
+        def listing_callback(request):
+            offset = int(request.params['offset'])
+            congress = request.params['congress']
+            packages = [
+                {
+                    'packageId': f'CHRG-{congress}-{i}',
+                    'title': f'Hearing {i}',
+                    'lastModified': '2021-02-22T18:00:44Z',
+                    'packageLink': None,
+                    'congress': congress
+                }
+                for i in range(offset, min(offset + 100, self.PACKAGE_COUNT))
+            ]
+            return 200, {}, json.dumps({'count': self.PACKAGE_COUNT, 'packages': packages})
+
+        with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+            rsps.add_callback(
+                responses.GET,
+                re.compile(f'{re.escape(APIClient.CHRG_ENDPOINT)}.*'),
+                callback=listing_callback,
+                content_type='application/json'
+            )
+            yield rsps
+
+    def drain(self, results: queue.Queue):
+        items = []
+        while not results.empty():
+            items.append(results.get())
+        return items
+
+    def test_shards_cover_every_congress_once(self):
+        shards = shard_congresses(range(118), 5)
+        assert len(shards) == 5
+        assert sorted(j for i in shards for j in i) == list(range(118))
+        assert max(len(i) for i in shards) - min(len(i) for i in shards) <= 1
+        assert shard_congresses([117, 116], 4) == [[117], [116]]
+
+    def test_crawl_shard_sends_new_summaries_then_finishes(self, mocked_api):
+        results = queue.Queue()
+        existing = {'CHRG-114-3': datetime.datetime(2022, 1, 1)}
+        crawl_shard(self.TEST_API_KEY, [113, 114], existing, 0.5, {}, results)
+        items = self.drain(results)
+        assert items[-1] is None
+        package_ids = [j.package_id for i in items[:-1] for j in i]
+        assert len(package_ids) == 2 * self.PACKAGE_COUNT - 1
+        assert 'CHRG-114-3' not in package_ids
+
+    def test_crawl_shard_reports_failures(self, mocked_api, monkeypatch):
+        def failing_listing(*args, **kwargs):
+            raise RuntimeError('listing failed')
+
+        monkeypatch.setattr(APIClient, 'iter_package_pages', failing_listing)
+        results = queue.Queue()
+        crawl_shard(self.TEST_API_KEY, [114], {}, 1.0, {}, results)
+        failure = self.drain(results)[-1]
+        assert isinstance(failure, ShardCrawlException)
+
+    def test_crawl_shard_records_failed_fetches(self, tmp_path):
+        engine = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "shard.db"}', future=True)
+        Base.metadata.create_all(engine)
+        summary_url = f'{APIClient.PACKAGE_ENDPOINT}/CHRG-114-0/summary'
+        package = {
+            'packageId': 'CHRG-114-0',
+            'title': 'Hearing 0',
+            'lastModified': '2021-02-22T18:00:44Z',
+            'packageLink': summary_url,
+            'congress': '114'
+        }
+        with responses.RequestsMock() as rsps:
+            rsps.add(
+                responses.GET,
+                re.compile(f'{re.escape(APIClient.CHRG_ENDPOINT)}.*'),
+                json={'count': 1, 'packages': [package]}
+            )
+            rsps.add(responses.GET, re.compile(f'{re.escape(summary_url)}.*'), status=503)
+            results = queue.Queue()
+            crawl_shard(self.TEST_API_KEY, [114], {}, 1.0, {}, results, database_url=str(engine.url))
+        assert self.drain(results)[-1] is None
+        assert len(RetryQueue(engine)) == 1
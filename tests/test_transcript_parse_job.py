@@ -0,0 +1,119 @@
+import pytest
+import sqlalchemy
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from hearings_lib.db_handler import DB_Handler
+from hearings_lib.db_models import Base, HearingEntry, HearingTranscript
+from hearings_lib.transcript_parse_job import TranscriptParseJob, iter_transcript_pages
+from hearings_lib.transcript_parser import Parser
+from tests import test_standard_speaker_pattern
+
+TRANSCRIPT = test_standard_speaker_pattern.TestStandardSpeakerPattern.LINES
+
+
+class TestTranscriptParseJob:
+    PACKAGE_IDS = [f'CHRG-113hhrg{i:05d}' for i in range(12)]
+
+    @pytest.fixture
+    def handler(self, tmp_path):
+        e = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "parse.db"}', future=True)
+        Base.metadata.create_all(e)
+        handler = DB_Handler(e)
+        handler.sync_transcripts({i: TRANSCRIPT for i in self.PACKAGE_IDS})
+        return handler
+
+    def stored_entries(self, handler, package_id):
+        with Session(handler.engine) as session:
+            return [
+                {'speaker': i.parsed_name, 'body': i.body, 'seq': i.sequence}
+                for i in session.execute(
+                    select(HearingEntry).filter_by(package_id=package_id).order_by(HearingEntry.sequence)
+                ).scalars()
+            ]
+
+    def test_pages_cover_every_transcript_once(self, handler):
+        pages = list(iter_transcript_pages(handler.engine, 5))
+        assert [len(i) for i in pages] == [5, 5, 2]
+        assert [i[0] for page in pages for i in page] == self.PACKAGE_IDS
+
+    def test_parses_every_transcript(self, handler):
+        job = TranscriptParseJob(handler, processes=2, page_size=5, batch_size=3)
+        assert job.run() == len(self.PACKAGE_IDS)
+        expected = Parser().parse(TRANSCRIPT.split('\n'))[0]
+        assert all(self.stored_entries(handler, i) == expected for i in self.PACKAGE_IDS)
+
+    def test_force_replaces_entries(self, handler):
+        stale = HearingEntry(parsed_name='Mr OLD', body='stale', sequence=1, package_id=self.PACKAGE_IDS[0])
+        handler.save_parsed_entries(self.PACKAGE_IDS[0], [stale])
+        TranscriptParseJob(handler).run()
+        assert TranscriptParseJob(handler).run(force=True) == len(self.PACKAGE_IDS)
+        with Session(handler.engine) as session:
+            stored = session.execute(select(HearingEntry.package_id)).scalars().all()
+        assert len(stored) == len(self.PACKAGE_IDS) * len(Parser().parse(TRANSCRIPT.split('\n'))[0])
+        assert 'Mr OLD' not in [i['speaker'] for i in self.stored_entries(handler, self.PACKAGE_IDS[0])]
+
+    def test_only_stale_transcripts_parsed_again(self, handler, monkeypatch):
+        TranscriptParseJob(handler).run()
+        assert TranscriptParseJob(handler).run() == 0
+        with Session(handler.engine) as session:
+            transcript = session.get(HearingTranscript, self.PACKAGE_IDS[0])
+            assert (transcript.parsed_hash, transcript.parser_version) == (transcript.body_hash, Parser.VERSION)
+            hashes = session.execute(select(HearingEntry.transcript_hash).filter_by(package_id=self.PACKAGE_IDS[0]))
+            assert set(hashes.scalars()) == {transcript.body_hash}
+
+        handler.sync_transcripts({self.PACKAGE_IDS[3]: TRANSCRIPT + '\n'})
+        assert TranscriptParseJob(handler).run() == 1
+        assert TranscriptParseJob(handler).run() == 0
+
+        monkeypatch.setattr(Parser, 'VERSION', Parser.VERSION + 1)
+        assert TranscriptParseJob(handler).run() == len(self.PACKAGE_IDS)
+
+    def test_offset_entries(self, handler):
+        TranscriptParseJob(handler, offsets=True).run()
+        with Session(handler.engine) as session:
+            entries = session.execute(
+                select(HearingEntry).filter_by(package_id=self.PACKAGE_IDS[0]).order_by(HearingEntry.sequence)
+            ).scalars().all()
+            assert all(i.body is None and i.body_end > i.body_start for i in entries)
+            assert [i.text for i in entries] == [i['body'] for i in Parser().parse(TRANSCRIPT.split('\n'))[0]]
+
+        # offsets into a replaced body are not read until the entries are parsed again
+        handler.sync_transcripts({self.PACKAGE_IDS[0]: 'New body\n' + TRANSCRIPT})
+        with Session(handler.engine) as session:
+            entry = session.execute(select(HearingEntry).filter_by(package_id=self.PACKAGE_IDS[0])).scalars().first()
+            assert entry.text is None
+        TranscriptParseJob(handler, offsets=True).run()
+        with Session(handler.engine) as session:
+            entry = session.execute(select(HearingEntry).filter_by(package_id=self.PACKAGE_IDS[0])).scalars().first()
+            assert entry.text == Parser().parse(TRANSCRIPT.split('\n'))[0][0]['body']
+
+    def test_replace_records_only_the_given_transcripts(self, handler):
+        handler.replace_parsed_entries({self.PACKAGE_IDS[0]: []})
+        with Session(handler.engine) as session:
+            recorded = session.execute(
+                select(HearingTranscript.package_id).where(HearingTranscript.parser_version.isnot(None))
+            ).scalars().all()
+        assert recorded == [self.PACKAGE_IDS[0]]
+
+    def test_parses_transcripts_of_databases_from_before_parse_tracking(self, tmp_path):
+        e = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "old.db"}', future=True)
+        Base.metadata.create_all(e)
+        with e.begin() as conn:
+            conn.exec_driver_sql('ALTER TABLE transcripts DROP COLUMN parsed_hash')
+            conn.exec_driver_sql('ALTER TABLE transcripts DROP COLUMN parser_version')
+        handler = DB_Handler(e)
+        handler.sync_transcripts({i: TRANSCRIPT for i in self.PACKAGE_IDS})
+        assert TranscriptParseJob(handler).run() == len(self.PACKAGE_IDS)
+        assert TranscriptParseJob(handler).run() == 0
+
+    def test_stores_offsets_in_databases_from_before_offsets(self, tmp_path):
+        e = sqlalchemy.create_engine(f'sqlite:///{tmp_path / "old.db"}', future=True)
+        Base.metadata.create_all(e)
+        with e.begin() as conn:
+            conn.exec_driver_sql('ALTER TABLE entries DROP COLUMN body_start')
+            conn.exec_driver_sql('ALTER TABLE entries DROP COLUMN body_end')
+        handler = DB_Handler(e)
+        handler.sync_transcripts({i: TRANSCRIPT for i in self.PACKAGE_IDS})
+        assert TranscriptParseJob(handler, offsets=True).run() == len(self.PACKAGE_IDS)
+        with Session(handler.engine) as session:
+            assert session.execute(select(HearingEntry.body_end).limit(1)).scalar() is not None
@@ -0,0 +1,61 @@
+import re
+import gzip
+import pytest
+import requests
+import responses
+from hearings_lib.api_client import APIClient, DEFAULT_TIMEOUT
+from hearings_lib.response_cache import ResponseCache
+
+
+class TestTranscripts:
+    TEST_API_KEY = "1234abc"
+    PACKAGE_IDS = [f'CHRG-114shrg{i}' for i in range(20)]
+
+    def transcript_url(self, package_id: str) -> str:
+        return f'{APIClient.PACKAGE_ENDPOINT}/{package_id}/htm'
+
+    @pytest.fixture
+    def mocked_api(self):
+        def callback(request):
+            package_id = request.path_url.split('/')[2]
+            if package_id == 'CHRG-114shrg13':
+                return 404, {}, ''
+            body = gzip.compress(f'<html>{package_id}</html>'.encode('UTF-8'))
+            return 200, {'Content-Encoding': 'gzip', 'Content-Length': str(len(body))}, body
+
+        with responses.RequestsMock() as rsps:
+            rsps.add_callback(
+                responses.GET,
+                re.compile(f'{APIClient.PACKAGE_ENDPOINT}/.+/htm.*'),
+                callback=callback
+            )
+            yield rsps
+
+    @pytest.mark.parametrize('max_workers', [1, 4])
+    def test_iter_transcripts_yields_every_package(self, mocked_api, max_workers):
+        client = APIClient(self.TEST_API_KEY, requests.Session(), max_workers=max_workers)
+        transcripts = dict(client.iter_transcripts(iter(self.PACKAGE_IDS)))
+        assert set(transcripts) == set(self.PACKAGE_IDS)
+        assert transcripts['CHRG-114shrg13'] is None
+        assert transcripts['CHRG-114shrg7'] == '<html>CHRG-114shrg7</html>'
+
+    def test_get_transcripts_by_package_id(self, mocked_api):
+        client = APIClient(self.TEST_API_KEY, requests.Session())
+        transcripts = client.get_transcripts_by_package_id(self.PACKAGE_IDS[:3])
+        assert transcripts == {i: f'<html>{i}</html>' for i in self.PACKAGE_IDS[:3]}
+
+    def test_streamed_transcripts_are_cached(self, mocked_api, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        client = APIClient(self.TEST_API_KEY, requests.Session(), cache=cache)
+        first = client._get_transcript('CHRG-114shrg1')
+        second = client._get_transcript('CHRG-114shrg1')
+        assert first == second == '<html>CHRG-114shrg1</html>'
+        assert len(mocked_api.calls) == 1
+        assert cache.get(cache.make_key(self.transcript_url('CHRG-114shrg1'))).body == first.encode('UTF-8')
+
+    def test_read_timeout_grows_with_pages(self):
+        client = APIClient(self.TEST_API_KEY, requests.Session())
+        assert client.transcript_timeout() == (DEFAULT_TIMEOUT, DEFAULT_TIMEOUT)
+        connect, read = client.transcript_timeout(400)
+        assert connect == DEFAULT_TIMEOUT
+        assert read == pytest.approx(DEFAULT_TIMEOUT + 400 * client.TRANSCRIPT_TIMEOUT_PER_PAGE)